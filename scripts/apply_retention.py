@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import engine, init_db
+from src.database.export import DEFAULT_BATCH_SIZE
+from src.database.retention import apply_retention
+from src.monitoring.settings import MonitoringConfig
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize fact_offers days older than the hot window into fact_offers_daily, "
+                    "archive their raw rows to Parquet and delete them from the hot table"
+    )
+    parser.add_argument("--hot-days", type=int, default=MonitoringConfig.RETENTION_HOT_DAYS,
+                        help="Days kept at full (6h) resolution in fact_offers")
+    parser.add_argument("--archive-dir", default=str(MonitoringConfig.RETENTION_ARCHIVE_DIR))
+    parser.add_argument("--max-days", type=int, help="Stop after archiving N days (spread a large backlog)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per cursor fetch / write")
+    args = parser.parse_args()
+
+    try:
+        # fact_offers_daily / fact_offers_archive on first use
+        init_db()
+        print(f"🗄️ Archiving fact_offers older than {args.hot_days} days to {args.archive_dir}")
+        summary = apply_retention(
+            engine, args.hot_days, args.archive_dir, max_days=args.max_days, batch_size=args.batch_size,
+            on_day=lambda day: print(f"   {day['day']}: " + ("⚠️ changed while archiving, skipped" if day["skipped"]
+                                                             else f"{day['rows']} rows -> {day['path']}")),
+        )
+        print(f"✅ {summary['rows']} rows of {summary['days']} days archived before {summary['cutoff']} "
+              f"({summary['skipped']} skipped) in {summary['seconds']:.2f}s")
+    except Exception as e:
+        print(f"❌ Critical error during retention: {e}")
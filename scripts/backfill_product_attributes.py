@@ -0,0 +1,55 @@
+import sys
+import os
+import argparse
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import session_scope
+from src.database.models import DimProduct
+from src.pipeline.attributes import extract_attributes_records
+
+
+def backfill_attributes(batch_size: int = 5000, reparse_all: bool = False):
+    """
+    Fills the precomputed attribute columns of dim_products for existing rows.
+    By default only rows never parsed (model_family and storage_gb both NULL)
+    are processed; --all re-parses the whole table (e.g. after improving patterns).
+    Works in keyset-paginated batches so memory stays flat on the VPS.
+    """
+    updated = 0
+    last_id = 0
+
+    try:
+        # Each batch is committed on its own; a failure rolls back only the current one
+        with session_scope() as session:
+            while True:
+                query = session.query(DimProduct.product_id, DimProduct.title).filter(DimProduct.product_id > last_id)
+                if not reparse_all:
+                    query = query.filter(DimProduct.model_family.is_(None), DimProduct.storage_gb.is_(None))
+                rows = query.order_by(DimProduct.product_id).limit(batch_size).all()
+                if not rows:
+                    break
+
+                # One vectorized pass per batch
+                records = extract_attributes_records(title for _, title in rows)
+                mappings = [dict(product_id=product_id, **attrs) for (product_id, _), attrs in zip(rows, records)]
+                session.bulk_update_mappings(DimProduct, mappings)
+                session.commit()
+
+                updated += len(mappings)
+                last_id = rows[-1][0]
+                print(f"🔄 {updated} products parsed (last product_id={last_id})")
+
+        print(f"✅ Attribute backfill finished! {updated} products updated.")
+
+    except Exception as e:
+        print(f"❌ Critical error during attribute backfill: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill title attributes on dim_products")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--all", action="store_true", help="Re-parse every product, not only unparsed ones")
+    args = parser.parse_args()
+    backfill_attributes(batch_size=args.batch_size, reparse_all=args.all)
@@ -0,0 +1,110 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.pipeline.loader import load_market_data
+from src.pipeline.prices import sanitize_price
+from src.pipeline.storage import CSV_COLUMNS, CSV_ENCODING, CSV_SEP
+
+
+def synthetic_market_csv(path: str, rows: int, seed: int = 42):
+    """Raw-CSV lookalike: ~48 cards per page, 4 cycles a day, repeated SKUs and sellers"""
+    rng = np.random.default_rng(seed)
+    skus = max(1, rows // 40)
+    sku = rng.integers(0, skus, rows)
+    cycle = np.sort(rng.integers(1, max(2, rows // 2000), rows))
+    base_price = rng.uniform(500, 9000, skus)
+    price = base_price[sku] * rng.choice([1.0, 0.97, 1.03], rows)
+    brackets = (price // 10 * 10).astype(int)
+    yes_no = np.array(["Yes", "No", "No "])
+    sellers = np.array([f"Loja {i}" for i in range(300)] + ["N/A"])
+    frame = pd.DataFrame({
+        "extraction_date": (pd.Timestamp("2026-01-01") + pd.to_timedelta(cycle * 6, unit="h")
+                            + pd.to_timedelta(rng.integers(0, 3600, rows), unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+        "cycle_id": cycle,
+        "title": [f"Smartphone Samsung Galaxy A{s % 60} 5G 128GB 4GB RAM Dual SIM Azul" for s in sku],
+        "seller": sellers[sku % len(sellers)],
+        # Dotted thousands like the scraper writes ("1.329.46")
+        "price": [f"{int(p) // 1000}.{int(p) % 1000:03d}.{int(round(p * 100)) % 100:02d}" if p >= 1000 else f"{p:.2f}"
+                  for p in price],
+        "discount": rng.choice(["N/A", "5%", "8%", "10%", "12%"], rows),
+        "installments": rng.choice(["10", "12", "18", "N/A"], rows),
+        "interest_free": rng.choice(["Sem Juros", "Com Juros"], rows),
+        "total_sold_raw": rng.choice(["4.8| +50mil vendidos", "4.4| +50 vendidos", "N/A"], rows),
+        "free_delivery": rng.choice(yes_no, rows),
+        "arrival_estimation": rng.choice(["Standard", "Full", "Chega amanhã"], rows),
+        "is_great_deal": rng.choice(yes_no, rows),
+        "is_bestseller": rng.choice(yes_no, rows),
+        "is_recommended": rng.choice(yes_no, rows),
+        "link": [f"https://www.mercadolivre.com.br/smartphone-samsung/p/MLB{30000000 + s}" for s in sku],
+        "layout_type": rng.choice(["grid", "list"], rows),
+        "price_range_searched": [f"{b}-{b + 10}" for b in brackets],
+        "item_id": 30000000 + sku,
+    }, columns=CSV_COLUMNS)
+    frame.to_csv(path, index=False, sep=CSV_SEP, encoding=CSV_ENCODING)
+
+
+def naive_typed(path: str) -> pd.DataFrame:
+    """What consumers did by hand after a plain read_csv: row-by-row price and flag conversion"""
+    frame = pd.read_csv(path, sep=CSV_SEP, encoding=CSV_ENCODING)
+    frame["price"] = frame["price"].apply(sanitize_price)
+    frame["extraction_date"] = pd.to_datetime(frame["extraction_date"], format="%Y-%m-%d %H:%M:%S")
+    for column in ["free_delivery", "is_great_deal", "is_bestseller", "is_recommended"]:
+        frame[column] = frame[column].astype(str) == "Yes"
+    return frame
+
+
+def measure(label: str, load) -> pd.DataFrame:
+    # Timed and traced in separate runs: tracemalloc slows Python-level allocations down
+    started = time.perf_counter()
+    frame = load()
+    seconds = time.perf_counter() - started
+    del frame
+    tracemalloc.start()
+    frame = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory = frame.memory_usage(deep=True).sum()
+    print(f"   {label:<40} {len(frame):>9} rows {seconds:7.2f}s   frame {memory / 1e6:8.1f} MB   peak {peak / 1e6:8.1f} MB")
+    return frame
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load time and memory: naive read_csv vs the typed loader")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--csv", help="Benchmark an existing raw CSV instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.csv or os.path.join(tmp, "market.csv")
+        if not args.csv:
+            synthetic_market_csv(path, args.rows)
+        print(f"⏱️ CSV loader benchmark: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+        naive = measure("naive read_csv (object dtypes)",
+                        lambda: pd.read_csv(path, sep=CSV_SEP, encoding=CSV_ENCODING))
+        measure("naive read_csv + per-row conversions", lambda: naive_typed(path))
+        typed = measure("typed loader, all columns", lambda: load_market_data(path))
+        measure("typed loader, 4 columns",
+                lambda: load_market_data(path, columns=["extraction_date", "item_id", "seller", "price"]))
+
+        dates = typed["extraction_date"].dropna()
+        if not dates.empty:
+            start, end = dates.quantile(0.75), dates.max()
+            measure("typed loader, 4 columns, last quarter",
+                    lambda: load_market_data(path, columns=["extraction_date", "item_id", "seller", "price"],
+                                             start=start, end=end))
+
+        naive_memory = naive.memory_usage(deep=True).sum()
+        typed_memory = typed.memory_usage(deep=True).sum()
+        print(f"✅ Typed frame uses {typed_memory / naive_memory:.0%} of the naive frame's memory "
+              f"(prices as float64, flags as bool, repetitive text as categories)")
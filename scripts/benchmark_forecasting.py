@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.pipeline.forecasting import BASELINES, PER_SKU_MODELS, ForecastRunner
+
+
+def synthetic_observations(skus: int, cycles: int, seed: int = 42) -> pd.DataFrame:
+    """Sticky random-walk prices with staggered listing starts (no database needed)"""
+    rng = np.random.default_rng(seed)
+    steps = np.where(rng.random((skus, cycles)) < 0.25, rng.normal(0, 0.03, (skus, cycles)), 0.0)
+    prices = (rng.uniform(800, 8000, skus)[:, None] * np.exp(np.cumsum(steps, axis=1))).round(2)
+    starts = rng.integers(0, cycles // 2, skus)
+    product_ids, cycle_ids = np.nonzero(np.arange(cycles)[None, :] >= starts[:, None])
+    return pd.DataFrame({
+        "product_id": product_ids + 1,
+        "cycle_id": cycle_ids + 1,
+        "price": prices[product_ids, cycle_ids],
+    })
+
+
+def run_case(label: str, observations: pd.DataFrame, **runner_kwargs) -> dict:
+    runner = ForecastRunner(**runner_kwargs)
+    report = runner.run(observations)
+    print(f"   {label:<34} {report['skus']:>6} SKUs in {report['seconds']:8.2f}s -> {report['skus_per_second']:>10} SKUs/s")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SKUs/second of the batch forecasting runner")
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--cycles", type=int, default=120)
+    parser.add_argument("--horizon", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--sequential-skus", type=int, default=500,
+                        help="SKUs for the one-process per-SKU case (it is the slow reference)")
+    args = parser.parse_args()
+
+    build_started = time.perf_counter()
+    observations = synthetic_observations(args.skus, args.cycles)
+    print(f"⏱️ Forecast benchmark: {args.skus} SKUs x {args.cycles} cycles "
+          f"({len(observations)} observations, built in {time.perf_counter() - build_started:.2f}s)")
+
+    common = dict(horizon=args.horizon, batch_size=args.batch_size)
+    run_case("vectorized baselines", observations, per_sku_models=(), **common)
+
+    subset = observations[observations["product_id"] <= args.sequential_skus]
+    sequential = run_case("per-SKU models, 1 process", subset, baselines=(), workers=1, **common)
+    pooled = run_case(f"per-SKU models, {args.workers} processes", observations, baselines=(),
+                      workers=args.workers, **common)
+    full = run_case(f"all models, {args.workers} processes", observations, workers=args.workers, **common)
+
+    print(f"   models: baselines={list(BASELINES)} per_sku={list(PER_SKU_MODELS)}")
+    if sequential["skus_per_second"]:
+        print(f"✅ Process pool speed-up on per-SKU models: "
+              f"{pooled['skus_per_second'] / sequential['skus_per_second']:.1f}x")
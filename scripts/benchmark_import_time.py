@@ -0,0 +1,71 @@
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+
+# Path setup to ensure "src" is discoverable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that must stay lazy: importing the scraper should never pull them in
+HEAVY_MODULES = ("pandas", "numpy", "bs4", "requests", "sqlalchemy", "psutil")
+
+
+def measure_cold_import(module: str):
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+    Returns (total_ms, [(self_us, cumulative_us, name), ...], heavy modules loaded).
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(self_us), int(cumulative_us), name))
+    total_us = next((cum for _, cum, name in rows if name == module), 0)
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return total_us / 1000, rows, heavy
+
+
+def run_benchmark(module: str, runs: int, top: int, max_ms: float) -> int:
+    print(f"⏱️ Cold import benchmark for '{module}' ({runs} runs)")
+    timings = []
+    rows, heavy = [], []
+    for _ in range(runs):
+        total_ms, rows, heavy = measure_cold_import(module)
+        timings.append(total_ms)
+
+    median_ms = statistics.median(timings)
+    print(f"   median={median_ms:.1f} ms | min={min(timings):.1f} ms | max={max(timings):.1f} ms")
+    print(f"   Top {top} modules by self time (last run):")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"   {self_us / 1000:8.2f} ms self | {cumulative_us / 1000:8.2f} ms cumulative | {name}")
+
+    exit_code = 0
+    if heavy:
+        print(f"❌ Heavy modules imported eagerly: {heavy}")
+        exit_code = 1
+    if max_ms and median_ms > max_ms:
+        print(f"❌ Median import time {median_ms:.1f} ms exceeds budget of {max_ms:.1f} ms")
+        exit_code = 1
+    if exit_code == 0:
+        print("✅ Import is side-effect free and within budget.")
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track cold-start import cost of the scraper")
+    parser.add_argument("--module", default="src.scraper")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=0.0, help="Fail if the median exceeds this budget")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.module, args.runs, args.top, args.max_ms))
@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+import argparse
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import engine
+from src.monitoring.settings import MonitoringConfig
+from src.pipeline.features import FeatureStore, load_observations
+
+
+def build_features(rebuild: bool = False):
+    """
+    Updates the forecasting feature store from fact_offers.
+    Only cycles newer than the last ingested one are read; --rebuild
+    recomputes everything (backfilled cycles, changed windows).
+    """
+    store = FeatureStore(MonitoringConfig.FEATURE_STORE_DIR)
+    started = time.perf_counter()
+
+    after_cycle_id = 0 if rebuild else store.last_cycle_id
+    observations = load_observations(engine, after_cycle_id=after_cycle_id)
+    print(f"📊 {len(observations)} new observations after cycle {after_cycle_id}")
+
+    rows = store.rebuild(observations) if rebuild else store.update(observations)
+    print(f"✅ Feature store at cycle {store.last_cycle_id}: {rows} feature rows written "
+          f"in {time.perf_counter() - started:.2f}s ({store.root})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental forecasting feature store (data/processed)")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every cycle from scratch")
+    args = parser.parse_args()
+    build_features(rebuild=args.rebuild)
@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import engine
+from src.database.export import DEFAULT_BATCH_SIZE, WRITERS, export_offers
+
+
+def _date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stream fact_offers joined to its dimensions into a Parquet or CSV file (bounded memory)"
+    )
+    parser.add_argument("output", help="Target file, e.g. data/processed/offers_2026_q1.parquet")
+    parser.add_argument("--format", choices=list(WRITERS), help="Defaults to the output file extension")
+    parser.add_argument("--start", type=_date, help="Inclusive extraction_date lower bound (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--end", type=_date, help="Exclusive extraction_date upper bound")
+    parser.add_argument("--models", nargs="*", help='model_family values, e.g. --models "S23 Ultra" A15')
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per cursor fetch / write")
+    args = parser.parse_args()
+
+    print(f"📦 Exporting offers to {args.output} (start={args.start}, end={args.end}, models={args.models}, "
+          f"batch_size={args.batch_size})")
+    report = export_offers(
+        engine, args.output, fmt=args.format, start=args.start, end=args.end, models=args.models,
+        batch_size=args.batch_size,
+        on_batch=lambda progress: print(f"   batch {progress['batch']}: {progress['rows']} rows "
+                                        f"({progress['seconds']:.1f}s)"),
+    )
+    print(f"✅ {report['rows']} rows in {report['batches']} batches written to {report['path']} "
+          f"({report['seconds']:.2f}s)")
@@ -1,140 +1,168 @@
 import pandas as pd
 import sys
 import os
-from datetime import datetime
+import glob
+from sqlalchemy.orm import sessionmaker
 
 # Path setup to ensure "src" is discoverable
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.database.connection import SessionLocal
 from src.database.models import DimProduct, DimSeller, DimScraperMetadata, FactOffer
+from src.database.retention import archived_days
+from src.database.sessions import unit_of_work
+from src.pipeline.identifiers import extract_item_id
+from src.pipeline.loader import load_market_data
+from src.pipeline.attributes import extract_attributes_records
+from src.pipeline.entity_resolution import resolve_canonical_products
+from src.monitoring.settings import MonitoringConfig
+from src.monitoring.stages import stage_timer
 # from src.monitoring.logger import structured_logger (Disabled to avoid AttributeError)
 
-def sanitize_price(value):
+def resolve_item_id(row):
     """
-    Helper function to fix currency formatting issues.
-    Handles:
-    - '1.099.99' -> 1099.99 (Removes first dot)
-    - '1.200,50' -> 1200.50 (Brazilian format)
-    - 'R$ 1000'  -> 1000.0 (Currency symbols)
+    Marketplace item ID for a CSV row: the column written at scrape time when
+    present, otherwise parsed from the link (rows collected before the column existed).
     """
-    if pd.isna(value) or str(value).strip().lower() in ['n/a', 'nan', '']:
-        return 0.0
-    
-    # Convert to string and basic cleaning
-    s = str(value).replace("R$", "").replace("$", "").strip()
-    
-    # Case 1: Brazilian format (1.000,00) -> Convert to 1000.00
-    if "," in s:
-        s = s.replace(".", "").replace(",", ".")
-    
-    # Case 2: Dirty format with multiple dots (1.099.99) -> Remove all dots except the last one
-    elif s.count(".") > 1:
-        # Replaces all dots with empty string, up to the last one
-        s = s.replace(".", "", s.count(".") - 1)
-        
-    try:
-        return float(s)
-    except ValueError:
-        print(f"⚠️ Warning: Could not parse price '{value}', defaulting to 0.0")
-        return 0.0
+    raw = row.get("item_id")
+    if raw is not None and not pd.isna(raw) and str(raw).strip() != "":
+        return int(float(raw))
+    return extract_item_id(str(row["link"]))
 
-def migrate_data():
+def migrate_data(csv_paths=None, db_engine=None):
     """
     Core Migration Logic: CSV -> PostgreSQL.
     Follows BR-03 (Idempotency) and BR-04 (Sanitization).
+    Defaults to the main CSV + worker shards and the configured database.
     """
     csv_path = "data/raw/samsung_market_data.csv"
+    if csv_paths is None:
+        # Distributed workers write one shard each (SCRAPER_SHARD_DIR)
+        shard_paths = sorted(glob.glob(os.path.join(MonitoringConfig.SHARD_DIR, "*.csv")))
+        csv_paths = ([csv_path] if os.path.exists(csv_path) else []) + shard_paths
     
-    if not os.path.exists(csv_path):
+    if not csv_paths:
         print(f"❌ Migration failed: {csv_path} not found")
         return
-    
-    # Start DB Session
-    session = SessionLocal()
+
+    if db_engine is None:
+        from src.database.connection import engine as db_engine
     
     try:
-        # Load and Sanitize Data using Pandas
-        df = pd.read_csv(csv_path, sep=";", encoding='utf-8')
-        print(f"📊 Starting migration of {len(df)} rows...")
+        # Unit of work: one transaction for the whole file, closed on every path
+        with unit_of_work(sessionmaker(bind=db_engine, autoflush=False)) as session:
+            # Typed load: prices, flags and dates already converted (src/pipeline/loader.py)
+            with stage_timer.stage("migration_read_csv"):
+                df = load_market_data(csv_paths)
+
+            # Days already moved to fact_offers_daily + the Parquet archive are not
+            # re-inserted: the next retention run would count them a second time
+            archived = archived_days(db_engine)
+            if archived and len(df):
+                in_archive = df["extraction_date"].dt.date.isin(archived)
+                if in_archive.any():
+                    print(f"🗄️ Skipping {int(in_archive.sum())} rows of {len(archived)} archived days")
+                    df = df[~in_archive]
+            print(f"📊 Starting migration of {len(df)} rows...")
+        
+            # Title attributes parsed once for the whole file (vectorized), used only
+            # when a product is inserted for the first time
+            with stage_timer.stage("migration_attribute_parse"):
+                title_attributes = dict(zip(df.index, extract_attributes_records(df["title"])))
         
-        counter = 0
-        for _, row in df.iterrows():
-            # ======= Dimension: SCRAPER METADATA =======
-            # Check if cycle exists or create it
-            metadata = session.query(DimScraperMetadata).filter_by(cycle_id=row["cycle_id"]).first()
-            if not metadata:
-                metadata = DimScraperMetadata(
-                    cycle_id=row["cycle_id"],
-                    layout_type=row["layout_type"],
-                    price_range_searched=row["price_range_searched"]
-                )
-                session.add(metadata)
-                session.flush() # Sync to get the ID for foreign keys
+            counter = 0
+            # Natural key -> product_id cache, avoids one lookup per repeated SKU
+            product_cache = {}
+            for idx, row in df.iterrows():
+                dimensions_started = stage_timer.start()
+                # ======= Dimension: SCRAPER METADATA =======
+                # Check if cycle exists or create it
+                metadata = session.query(DimScraperMetadata).filter_by(cycle_id=row["cycle_id"]).first()
+                if not metadata:
+                    metadata = DimScraperMetadata(
+                        cycle_id=row["cycle_id"],
+                        layout_type=row["layout_type"],
+                        price_range_searched=row["price_range_searched"]
+                    )
+                    session.add(metadata)
+                    session.flush() # Sync to get the ID for foreign keys
                 
                 
-            # ======= Dimension: SELLER =======
-            # Normalizing Seller name as per Business Rule BR-06
-            seller_name = "Unknown Seller" if pd.isna(row["seller"]) or str(row["seller"]) == "N/A" else str(row["seller"])
-            seller = session.query(DimSeller).filter_by(seller_name=seller_name).first()
-            if not seller:
-                seller = DimSeller(seller_name=seller_name)
-                session.add(seller)
-                session.flush()
+                # ======= Dimension: SELLER =======
+                # Normalizing Seller name as per Business Rule BR-06
+                seller_name = "Unknown Seller" if pd.isna(row["seller"]) or str(row["seller"]) == "N/A" else str(row["seller"])
+                seller = session.query(DimSeller).filter_by(seller_name=seller_name).first()
+                if not seller:
+                    seller = DimSeller(seller_name=seller_name)
+                    session.add(seller)
+                    session.flush()
             
-            # ======= Dimension: PRODUCT =======
-            # Using the Link as the Natural Key (BR-07)
-            product = session.query(DimProduct).filter_by(sku_link=row["link"]).first()
-            if not product:
-                product = DimProduct(
-                    sku_link=row["link"],
-                    title=str(row["title"])
-                )
-                session.add(product)
-                session.flush()
+                # ======= Dimension: PRODUCT =======
+                # Using the marketplace item ID as the Natural Key (BR-07).
+                # The link is only the fallback for rows without an id.
+                item_id = resolve_item_id(row)
+                cache_key = item_id if item_id is not None else row["link"]
+                product = product_cache.get(cache_key)
+                if product is None:
+                    if item_id is not None:
+                        product = session.query(DimProduct).filter_by(item_id=item_id).first()
+                    else:
+                        product = session.query(DimProduct).filter_by(sku_link=row["link"], item_id=None).first()
+                if not product:
+                    product = DimProduct(
+                        item_id=item_id,
+                        sku_link=row["link"],
+                        title=str(row["title"]),
+                        **title_attributes[idx]
+                    )
+                    session.add(product)
+                    session.flush()
+                product_cache[cache_key] = product
                 
-            # ======= Dimension: OFFER =======
-            # Idempotency check: Don't duplicate products in the same cycle (BR-03)
-            existing_offer = session.query(FactOffer).filter_by(
-                product_id=product.product_id,
-                cycle_id=metadata.cycle_id,
-                seller_id=seller.seller_id
-            ).first()
+                stage_timer.stop("migration_dimension_resolution", dimensions_started)
             
-            if not existing_offer:
-                # Sanitizing price to handle format '1.099.99' or '1.000,00'
-                price_value = sanitize_price(row["price"])
-                
-                new_offer = FactOffer(
+                # ======= Dimension: OFFER =======
+                # Idempotency check: Don't duplicate products in the same cycle (BR-03)
+                existing_offer = session.query(FactOffer).filter_by(
                     product_id=product.product_id,
-                    seller_id=seller.seller_id,
                     cycle_id=metadata.cycle_id,
-                    price=price_value, 
-                    discount=str(row["discount"]),
-                    # Safe conversion for installments (handling '10.0' strings)
-                    installments=0 if pd.isna(row["installments"]) or str(row["installments"]) == "N/A" else int(float(row["installments"])),
-                    total_sold_raw=str(row["total_sold_raw"]),
-                    arrival_estimation=str(row["arrival_estimation"]),
-                    interest_free=(str(row["interest_free"]).strip().lower() == "sem juros"),
-                    free_delivery=(str(row["free_delivery"]) == "Yes"),
-                    is_great_deal=(str(row["is_great_deal"]) == "Yes"),
-                    is_bestseller=(str(row["is_bestseller"]) == "Yes"),
-                    is_recommended=(str(row["is_recommended"]) == "Yes"),
-                    extraction_date=datetime.strptime(row["extraction_date"], "%Y-%m-%d %H:%M:%S")
-                )
-                session.add(new_offer)
-                counter += 1
+                    seller_id=seller.seller_id
+                ).first()
+            
+                if not existing_offer:
+                    new_offer = FactOffer(
+                        product_id=product.product_id,
+                        seller_id=seller.seller_id,
+                        cycle_id=metadata.cycle_id,
+                        price=row["price"], # Sanitized by the loader ('1.099.99' / '1.000,00' formats)
+                        discount=str(row["discount"]),
+                        installments=0 if pd.isna(row["installments"]) else int(row["installments"]),
+                        total_sold_raw=str(row["total_sold_raw"]),
+                        arrival_estimation=str(row["arrival_estimation"]),
+                        interest_free=bool(row["interest_free"]),
+                        free_delivery=bool(row["free_delivery"]),
+                        is_great_deal=bool(row["is_great_deal"]),
+                        is_bestseller=bool(row["is_bestseller"]),
+                        is_recommended=bool(row["is_recommended"]),
+                        extraction_date=row["extraction_date"].to_pydatetime()
+                    )
+                    session.add(new_offer)
+                    counter += 1
                 
-        # Commit Transaction
-        session.commit()
+            # Commit Transaction (unit_of_work commits again as a no-op)
+            with stage_timer.stage("migration_commit"):
+                session.commit()
         print(f"✅ Data migration finished! {counter} new offers inserted.")
+
+        # New listings are clustered into canonical products (existing clusters stay as they are)
+        with stage_timer.stage("migration_entity_resolution"):
+            resolution = resolve_canonical_products(db_engine)
+        print(f"🧩 {resolution['assigned']} new products resolved: {resolution['merged']} matched existing "
+              f"products, {resolution['new_clusters']} new canonical products")
+        print(f"⏱️ Stage breakdown: {stage_timer.summary(reset=True)}")
             
     except Exception as e:
-        # Atomic transaction: if one fails, we rollback the whole batch
-        session.rollback()
+        # Atomic transaction: if one fails, the whole batch was rolled back
         print(f"❌ Critical error during migration: {e}")
-    finally:
-        session.close()
         
 if __name__ == "__main__":
     migrate_data()
\ No newline at end of file
@@ -0,0 +1,25 @@
+import sys
+import os
+import argparse
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import engine
+from src.pipeline.entity_resolution import resolve_canonical_products
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster dim_products listings into canonical products (MinHash/LSH)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Forget every assignment and re-cluster the whole table (e.g. after tuning the tokens)")
+    args = parser.parse_args()
+
+    try:
+        summary = resolve_canonical_products(engine, batch_size=args.batch_size, rebuild=args.rebuild)
+        print(f"✅ {summary['assigned']} products resolved in {summary['seconds']:.2f}s: "
+              f"{summary['merged']} matched, {summary['new_clusters']} new canonical products "
+              f"({summary['clusters']} in total)")
+    except Exception as e:
+        print(f"❌ Critical error during entity resolution: {e}")
@@ -0,0 +1,48 @@
+import sys
+import os
+import argparse
+
+# Path setup to ensure "src" is discoverable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.database.connection import engine
+from src.monitoring.settings import MonitoringConfig
+from src.pipeline.forecasting import BASELINES, PER_SKU_MODELS, ForecastRunner, ForecastWriter, load_recent_observations
+
+
+def run_forecasts(horizon: int, workers: int, batch_size: int, lookback_cycles: int, models=None):
+    """
+    Forecasts every SKU from its recent price series in fact_offers and
+    writes the results to fact_forecasts, batch by batch.
+    """
+    observations = load_recent_observations(engine, lookback_cycles)
+    if observations.empty:
+        print("❌ No offers in fact_offers: nothing to forecast")
+        return
+
+    models = models or list(BASELINES) + list(PER_SKU_MODELS)
+    runner = ForecastRunner(
+        horizon=horizon, workers=workers, batch_size=batch_size,
+        baselines=[m for m in models if m in BASELINES],
+        per_sku_models=[m for m in models if m in PER_SKU_MODELS],
+    )
+    origin_cycle_id = int(observations["cycle_id"].max())
+    print(f"📈 Forecasting {observations['product_id'].nunique()} SKUs from cycle {origin_cycle_id} "
+          f"(models={models}, horizon={horizon}, workers={runner.workers})")
+
+    report = runner.run(observations, sink=ForecastWriter(engine, origin_cycle_id))
+    for batch in report["batches"]:
+        print(f"   batch {batch['batch']}: {batch['skus']} SKUs in {batch['seconds']:.2f}s "
+              f"(fit {batch['fit_seconds']:.2f}s, {batch['skus_per_second']} SKUs/s)")
+    print(f"✅ {report['skus']} SKUs forecast in {report['seconds']:.2f}s ({report['skus_per_second']} SKUs/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch price forecasts for every SKU -> fact_forecasts")
+    parser.add_argument("--horizon", type=int, default=MonitoringConfig.FORECAST_HORIZON)
+    parser.add_argument("--workers", type=int, default=MonitoringConfig.FORECAST_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=MonitoringConfig.FORECAST_BATCH_SIZE)
+    parser.add_argument("--lookback-cycles", type=int, default=MonitoringConfig.FORECAST_LOOKBACK_CYCLES)
+    parser.add_argument("--models", nargs="*", choices=list(BASELINES) + list(PER_SKU_MODELS))
+    args = parser.parse_args()
+    run_forecasts(args.horizon, args.workers, args.batch_size, args.lookback_cycles, args.models)
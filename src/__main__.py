@@ -0,0 +1,4 @@
+from src.app import main
+
+# "python -m src" starts the scraper the same way the Docker image does
+main()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+# Ensuring Python finds the "src" folder when running "python src/app.py"
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.monitoring.logger import structured_logger
+from src.monitoring.multiprocess import reset_multiprocess_dir
+from src.monitoring.settings import MonitoringConfig
+
+
+def main():
+    """
+    Process entry point (Docker CMD / "python -m src").
+    The only place that performs process-wide side effects:
+    1. Configures loguru (console + JSON file)
+    2. Starts the Prometheus exporter on MonitoringConfig.METRICS_PORT (the only one:
+       with PROMETHEUS_MULTIPROC_DIR it also serves the metrics of worker processes)
+       and the resource sampler thread (process RSS / CPU / fds / threads / GC)
+    3. Runs the scraper loop (SCRAPER_MODE=TEST -> single run on the junk CSV)
+       or, with SCRAPER_ROLE=coordinator|worker, the distributed crawl (src/distributed.py)
+       or, with SCRAPER_ROLE=query, the read-only query service (src/query_service.py)
+    """
+    structured_logger.configure()
+    # Before the first metric of this process is created (on import)
+    reset_multiprocess_dir()
+    from src.monitoring.metrics import metrics
+    metrics.start_server()
+    from src.monitoring.resources import resource_sampler
+    if MonitoringConfig.RESOURCE_SAMPLER_ENABLED:
+        resource_sampler.start()
+
+    from src.scraper import main_loop, data_raw_dir, DEFAULT_CSV_PATH
+
+    # Checks enviroment variable ONLY to decide how to call the function
+    is_test_env = os.getenv("SCRAPER_MODE") == "TEST"
+    output_file = os.path.join(data_raw_dir, "integration_test_data.csv") if is_test_env else DEFAULT_CSV_PATH
+
+    structured_logger.log_business_event(
+        event_name="scraper_initialization",
+        context={
+            "csv_path": str(output_file),
+            "log_dir": str(MonitoringConfig.LOG_FILE_PATH),
+            "mode": "TEST" if is_test_env else "PRODUCTION",
+            "role": MonitoringConfig.SCRAPER_ROLE
+        }
+    )
+
+    role = MonitoringConfig.SCRAPER_ROLE
+    
+    try:
+        if role in ("coordinator", "worker"):
+            from src.distributed import build_work_queue, run_coordinator, run_worker
+            queue = build_work_queue()
+            structured_logger.log_business_event("distributed_role", role=role, worker_id=queue.worker_id)
+            if role == "coordinator":
+                # Creates crawl_work_queue / cycle columns on first distributed deployment
+                from src.database.connection import init_db
+                init_db()
+                run_coordinator(queue, single_run=is_test_env)
+            else:
+                run_worker(queue, single_run=is_test_env)
+        elif role == "query":
+            from src.query_service import run_query_service
+            run_query_service()
+        elif is_test_env:
+            # Test Mode: Save to junk file and run once
+            # This is the "Key" to getting the Green Checkmark.
+            main_loop(single_run=True, output_file=output_file)
+        else:
+            # Production Mode: Runs forever on the official file (VPS)
+            main_loop(single_run=False)
+
+    except KeyboardInterrupt:
+        structured_logger.log_business_event("scraper_interrupted", reason="KeyboardInterrupt")
+    except Exception as e:
+        structured_logger.log_error(error=e, context={"scope": "main_execution", "fatal": True})
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import os
 from dotenv import load_dotenv
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
+from src.database.pool import InstrumentedQueuePool, instrument_engine, pool_settings
+from src.database.sessions import unit_of_work
 # from src.monitoring.logger import structured_logger (Logger commented out to avoid AttributeError)
 
 # Retriee the Database URL from ou setting enviroment
@@ -18,16 +21,27 @@ DB_PORT = os.getenv("DB_PORT")
 # between the MonitoringConfig and the SQLAlchemy engine
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Pool sized from the configured number of concurrent DB writers
+# (DB_WORKER_CONCURRENCY writers + DB_POOL_RESERVED, see src/database/pool.py)
+DB_WORKER_CONCURRENCY = int(os.getenv("DB_WORKER_CONCURRENCY", "8"))
+DB_POOL_RESERVED = int(os.getenv("DB_POOL_RESERVED", "2"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_SETTINGS = pool_settings(DB_WORKER_CONCURRENCY, DB_POOL_RESERVED)
+
 # Configure the SQLAlchemy Engine
 # We implement a connection pool to manage resources efficienyly on the VPS.
 # pool_pre_ping=True is essential for resilient long-running scraping agents.
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10, # Keeps up to 10 persistent connections
-    max_overflow=20, # Allows 20 addicional connections during peak migration
+    poolclass=InstrumentedQueuePool, # Times every checkout (db_pool_checkout_wait_seconds)
+    pool_size=POOL_SETTINGS["pool_size"], # Persistent connections (10 with the defaults)
+    max_overflow=POOL_SETTINGS["max_overflow"], # Extra connections during bursts
+    pool_timeout=DB_POOL_TIMEOUT, # Seconds a checkout waits before giving up
     pool_pre_ping=True, # Checks if the connection is alive before using it
     echo=False # Set to True to debug raw SQL queries in the console
 )
+# [MONITORING] Pool occupancy and pre-ping failures exported to Prometheus
+instrument_engine(engine)
 
 # Session Factory Setup
 # scopped_session ensures our DB sessions are thread-safe and isolated
@@ -38,18 +52,31 @@ session_factory = sessionmaker(
 )
 SessionLocal = scoped_session(session_factory)
 
+@contextmanager
 def get_db_session():
     """
-    Context manager for database sessions.
-    Ensures the session is properly removed from the scope after use,
+    Context manager for the thread-local (scoped) session.
+    The session is removed from the scope only after the caller's block,
     preventing memory leaks or idle connection buildup on the VPS.
+    Commits are left to the caller; batch writers should use session_scope().
     """
     
     db = SessionLocal()
     try:
-        return db
+        yield db
     finally:
         SessionLocal.remove()
+
+
+def session_scope():
+    """
+    Unit of work for batch writers: a private session (not the scoped one)
+    committed on success, rolled back on error and always closed.
+    
+        with session_scope() as session:
+            session.add_all(rows)
+    """
+    return unit_of_work(session_factory)
         
         
 def init_db():
@@ -59,12 +86,16 @@ def init_db():
     Should be called during the initial setup or the migration script execution.
     """
     from src.database.models import Base
+    from src.database.upgrades import apply_schema_upgrades
     try:
         print("🚀 Initializing datable tables... [event: db_init_start]") 
         
         # This ccommand triggers the creation of all table defined in models.py
         Base.metadata.create_all(bind=engine)
         
+        # Brings tables created by older releases up to date (new columns/indexes)
+        apply_schema_upgrades(engine)
+        
         print("✅ Database tables initialized successfully. [event: db_init_success]")
     except Exception as e:
         # Fixed logger call to handle the exception message correctly
@@ -0,0 +1,158 @@
+import csv
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, select
+
+from src.database.models import DimProduct, DimScraperMetadata, DimSeller, FactOffer
+
+# ==============================================================================
+# STREAMING WAREHOUSE EXPORT (fact_offers x dimensions -> Parquet / CSV)
+# ==============================================================================
+# The star join runs on a server-side cursor (stream_results + yield_per):
+# rows arrive in fixed-size batches and each batch is written out (one Parquet
+# row group / one CSV block) before the next is fetched, so peak memory is one
+# batch whatever the size of the export. Date range and model filters are part
+# of the SQL WHERE clause, never applied client-side.
+
+DEFAULT_BATCH_SIZE = 50_000
+
+EXPORT_COLUMNS = [
+    FactOffer.offer_id, FactOffer.cycle_id, FactOffer.extraction_date, FactOffer.price, FactOffer.discount,
+    FactOffer.installments, FactOffer.interest_free, FactOffer.free_delivery, FactOffer.is_great_deal,
+    FactOffer.is_bestseller, FactOffer.is_recommended, FactOffer.total_sold_raw, FactOffer.arrival_estimation,
+    DimProduct.product_id, DimProduct.item_id, DimProduct.title, DimProduct.model_family, DimProduct.storage_gb,
+    DimProduct.ram_gb, DimProduct.is_5g, DimProduct.is_refurbished, DimProduct.color, DimProduct.sku_link,
+    DimSeller.seller_name,
+    DimScraperMetadata.layout_type, DimScraperMetadata.price_range_searched,
+]
+EXPORT_COLUMN_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+
+def build_export_query(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       models: Optional[Sequence[str]] = None):
+    """Star join with the filters pushed down: start <= extraction_date < end, model_family IN models"""
+    query = (
+        select(*EXPORT_COLUMNS)
+        .join(DimProduct, DimProduct.product_id == FactOffer.product_id)
+        .join(DimSeller, DimSeller.seller_id == FactOffer.seller_id)
+        .join(DimScraperMetadata, DimScraperMetadata.cycle_id == FactOffer.cycle_id)
+        .order_by(FactOffer.offer_id)
+    )
+    if start is not None:
+        query = query.where(FactOffer.extraction_date >= start)
+    if end is not None:
+        query = query.where(FactOffer.extraction_date < end)
+    if models:
+        query = query.where(DimProduct.model_family.in_(list(models)))
+    return query
+
+
+def iter_query_batches(engine, query, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """Lists of at most `batch_size` rows, fetched from a server-side cursor"""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for batch in result.partitions():
+            yield batch
+
+
+def iter_export_batches(engine, start=None, end=None, models=None,
+                        batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    return iter_query_batches(engine, build_export_query(start, end, models), batch_size)
+
+
+# =========== Writers =========== #
+
+def _arrow_schema(columns=EXPORT_COLUMNS):
+    import pyarrow as pa
+    fields = []
+    for column in columns:
+        # BigInteger before Integer (subclass)
+        if isinstance(column.type, BigInteger):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int32()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.key, arrow_type))
+    return pa.schema(fields)
+
+
+class ParquetExportWriter:
+    """One row group per batch, fixed schema (pyarrow)"""
+
+    def __init__(self, path: str, columns=EXPORT_COLUMNS, compression: str = "snappy"):
+        import pyarrow.parquet as pq
+        self.schema = _arrow_schema(columns)
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, batch: List[tuple]):
+        import pyarrow as pa
+        columns = list(zip(*batch))
+        self._writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)], schema=self.schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+class CsvExportWriter:
+    """Same separator / encoding as the raw CSV (';', utf-8-sig)"""
+
+    def __init__(self, path: str):
+        from src.pipeline.storage import CSV_ENCODING, CSV_SEP
+        self._file = open(path, "w", encoding=CSV_ENCODING, newline="")
+        self._writer = csv.writer(self._file, delimiter=CSV_SEP)
+        self._writer.writerow(EXPORT_COLUMN_NAMES)
+
+    def write(self, batch: List[tuple]):
+        self._writer.writerows(batch)
+
+    def close(self):
+        self._file.close()
+
+
+WRITERS: Dict[str, Callable[[str], Any]] = {"parquet": ParquetExportWriter, "csv": CsvExportWriter}
+
+
+def export_offers(engine, output_path: str, fmt: Optional[str] = None, start=None, end=None, models=None,
+                  batch_size: int = DEFAULT_BATCH_SIZE, on_batch: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Streams the filtered star join into `output_path` (format from the extension
+    unless `fmt` is given). Written to a temp file and renamed when complete, so
+    an interrupted export never leaves a truncated file behind.
+    """
+    fmt = fmt or os.path.splitext(output_path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"unsupported export format '{fmt}' (expected one of: {', '.join(WRITERS)})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    started = time.perf_counter()
+    rows = batches = 0
+    writer = WRITERS[fmt](tmp_path)
+    try:
+        for batch in iter_export_batches(engine, start, end, models, batch_size):
+            writer.write(batch)
+            rows += len(batch)
+            batches += 1
+            if on_batch:
+                on_batch({"batch": batches, "rows": rows, "seconds": round(time.perf_counter() - started, 3)})
+        writer.close()
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {"path": output_path, "format": fmt, "rows": rows, "batches": batches,
+            "seconds": round(time.perf_counter() - started, 3)}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Integer, Boolean, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Float, Date, DateTime, Integer, BigInteger, Boolean, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -11,20 +11,42 @@ class DimProduct(Base): # Fixed: Singular name to match logic
     """
     Dimension Table: DIM_PRODUCTS
     Normalizes product data to avoid string redudancy in the Fact Table.
-    The sku_link is the natural key for cross_cycle tracking.
+    The marketplace item_id (MLB prefix stripped) is the natural key for
+    cross_cycle tracking; the URL is kept only as an attribute.
     """
     
     __tablename__ = "dim_products"
     
     product_id = Column(Integer, primary_key=True, autoincrement=True)
-    # Sanitized unique URL - serves as our Natural Key (UK)
-    sku_link = Column(String(2048), unique=True, nullable=False, index=True)
+    # Marketplace ID parsed from the link (/p/MLB32174378 -> 32174378) - Natural Key (UK)
+    item_id = Column(BigInteger, unique=True, nullable=True, index=True)
+    # Sanitized URL (latest seen variant) - attribute only, no longer indexed
+    sku_link = Column(String(2048), nullable=False)
     # The latest title captured for this product
+    # (searched through the Postgres-only title_tsv generated column, see src/database/upgrades.py)
     title = Column(String(500), nullable=False)
     
+    # Precomputed attributes parsed from the title on first insert
+    # (src/pipeline/attributes.py), so segment queries hit indexes instead of LIKE scans
+    model_family = Column(String(50), index=True) # e.g. "A15", "S23 Ultra", "Z Flip 5"
+    storage_gb = Column(Integer)
+    ram_gb = Column(Integer)
+    is_5g = Column(Boolean)
+    is_refurbished = Column(Boolean, index=True)
+    color = Column(String(30))
+    
+    # Cluster of listings that are the same phone (src/pipeline/entity_resolution.py):
+    # product_id of the cluster's founding listing, NULL until resolved
+    canonical_product_id = Column(Integer, index=True)
+    
     # Relationship back to the Fact table for easy joining via ORM 
     offers = relationship("FactOffer", back_populates="product")
     
+    # "S23 Ultra 256GB" style lookups
+    __table_args__ = (
+        Index("idx_product_model_storage", "model_family", "storage_gb"),
+    )
+    
     def __repr__(self):
         return f"<DimProduct(title='{self.title[:30]}...', id={self.product_id})>"
     
@@ -54,10 +76,74 @@ class DimScraperMetadata(Base):
     layout_type = Column(String(50)) # "grid" vs "list"
     price_range_searched = Column(String(100)) # Bracket (e.g., "1000-1050")
     cycle_start = Column(DateTime, default=datetime.now)
+    # Distributed mode: "running" while work items are open, "completed" once the queue drains
+    cycle_status = Column(String(20))
+    cycle_end = Column(DateTime)
     
     offers = relationship("FactOffer", back_populates="metadata_obj") # Fixed back_populates
     
     
+class CrawlWorkItem(Base):
+    """
+    Operational Table: CRAWL_WORK_QUEUE
+    One row per (cycle, price range, page) in distributed mode.
+    Workers lease rows with FOR UPDATE SKIP LOCKED (src/pipeline/work_queue.py).
+    """
+    
+    __tablename__ = "crawl_work_queue"
+    
+    work_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    cycle_id = Column(Integer, ForeignKey("dim_scraper_metadata.cycle_id"), nullable=False)
+    min_price = Column(Integer, nullable=False)
+    max_price = Column(Integer, nullable=False)
+    page_offset = Column(Integer, nullable=False) # ML "_Desde_" offset (1, 49, 97...)
+    page_number = Column(Integer, nullable=False)
+    
+    # Lease state machine: pending -> leased -> done | pending (retry) | failed
+    status = Column(String(20), nullable=False, default="pending")
+    lease_owner = Column(String(255)) # SCRAPER_WORKER_ID of the current/last owner
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    not_before = Column(DateTime) # Retry backoff: not claimable before this instant
+    attempts = Column(Integer, nullable=False, default=0)
+    
+    items_found = Column(Integer)
+    last_error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.now)
+    completed_at = Column(DateTime)
+    
+    __table_args__ = (
+        UniqueConstraint("cycle_id", "min_price", "max_price", "page_offset", name="uq_work_item_page"),
+        Index("idx_work_status_cycle", "status", "cycle_id"),
+        Index("idx_work_lease_expiry", "lease_expires_at"),
+    )
+    
+    
+class ProductEnrichment(Base):
+    """
+    Side Table: PRODUCT_ENRICHMENT
+    Details only found on product pages (src/pipeline/enrichment.py), keyed by
+    the marketplace item_id. Every field has its own fetched_at so each one
+    expires on its own TTL (stock goes stale long before specs do).
+    """
+    
+    __tablename__ = "product_enrichment"
+    
+    item_id = Column(BigInteger, primary_key=True, autoincrement=False) # Same key as dim_products.item_id
+    sku_link = Column(String(2048), nullable=False) # Page the details were read from
+    
+    specs = Column(Text) # JSON object of the specs table ({"Memória interna": "256 GB", ...})
+    specs_fetched_at = Column(DateTime)
+    seller_reputation = Column(String(100)) # e.g. "MercadoLíder Platinum"
+    seller_reputation_fetched_at = Column(DateTime)
+    stock_available = Column(Integer) # Units the buy box reports as available
+    stock_available_fetched_at = Column(DateTime)
+    
+    # Last fetch attempt, successful or not ("ok", "http_error", "error")
+    last_attempt_at = Column(DateTime)
+    last_status = Column(String(20))
+    
+    
 class FactOffer(Base):
     """
     Fact Table: FACT_OFFERS
@@ -102,4 +188,86 @@ class FactOffer(Base):
     # Composite Index for commom analytics (Time Series Performace)
     __table_args__ = ( # Fixed typo from __tabl_args__
         Index("idx_product_extraction", "product_id", "extraction_date"),
-    )
\ No newline at end of file
+    )
+    
+    
+class FactOfferDaily(Base):
+    """
+    Aggregate Table: FACT_OFFERS_DAILY
+    Daily summary per (day, product, seller) of the fact_offers rows moved to the
+    archive by the retention job (src/database/retention.py). The average price is
+    price_sum / offers, so parts of a day archived by separate runs merge by addition.
+    """
+    
+    __tablename__ = "fact_offers_daily"
+    
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("dim_products.product_id"), primary_key=True)
+    seller_id = Column(Integer, ForeignKey("dim_sellers.seller_id"), primary_key=True)
+    
+    offers = Column(Integer, nullable=False) # Snapshots summarized
+    cycles = Column(Integer, nullable=False)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    
+    # Offers carrying each badge
+    great_deal_offers = Column(Integer, nullable=False, default=0)
+    bestseller_offers = Column(Integer, nullable=False, default=0)
+    free_delivery_offers = Column(Integer, nullable=False, default=0)
+    
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_daily_product_day", "product_id", "day"),
+        Index("idx_daily_seller_day", "seller_id", "day"),
+    )
+    
+    
+class FactOfferArchive(Base):
+    """
+    Manifest: FACT_OFFERS_ARCHIVE
+    One row per Parquet file holding raw fact_offers rows removed from the hot
+    table. Readers find the files of a date range here (read_offers(include_archive=True)).
+    """
+    
+    __tablename__ = "fact_offers_archive"
+    
+    archive_id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False, index=True) # extraction_date of every row in the file
+    part = Column(Integer, nullable=False, default=0) # > 0 when late rows of an archived day arrive
+    path = Column(String(255), nullable=False) # Relative to RETENTION_ARCHIVE_DIR
+    rows = Column(Integer, nullable=False)
+    min_offer_id = Column(Integer, nullable=False)
+    max_offer_id = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        UniqueConstraint("day", "part", name="uq_archive_day_part"),
+    )
+    
+    
+class FactForecast(Base):
+    """
+    Fact Table: FACT_FORECASTS
+    Price forecasts per product written by the batch runner (src/pipeline/forecasting.py).
+    One row per (product, model, origin cycle, horizon step); a step is one 6h cycle.
+    """
+    
+    __tablename__ = "fact_forecasts"
+    
+    # BIGINT on Postgres; sqlite only autoincrements an INTEGER primary key
+    forecast_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    product_id = Column(Integer, ForeignKey("dim_products.product_id"), nullable=False)
+    model = Column(String(30), nullable=False) # "naive", "seasonal_naive", "ses", "holt", ...
+    origin_cycle_id = Column(Integer, nullable=False) # Last cycle of the series the model saw
+    horizon = Column(Integer, nullable=False) # Steps ahead of the origin cycle
+    forecast_price = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        UniqueConstraint("product_id", "model", "origin_cycle_id", "horizon", name="uq_forecast_step"),
+        Index("idx_forecast_origin_model", "origin_cycle_id", "model"),
+    )
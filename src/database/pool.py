@@ -0,0 +1,74 @@
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from src.monitoring.metrics import metrics
+
+# ==============================================================================
+# CONNECTION POOL SIZING AND METRICS
+# ==============================================================================
+# The pool is sized from the number of concurrent DB writers instead of fixed
+# numbers, and every checkout/checkin publishes its occupancy to Prometheus,
+# so contention is visible (wait histogram, exhausted checkouts) once loaders
+# run in parallel.
+
+
+def pool_settings(concurrency: int, reserved: int = 2) -> Dict[str, int]:
+    """
+    pool_size keeps one persistent connection per concurrent writer plus a few
+    reserved for short-lived users (coordinator polls, heartbeats, enrichment);
+    overflow lets a burst double the writers before checkouts start to queue.
+    """
+    concurrency = max(1, concurrency)
+    return {"pool_size": concurrency + max(0, reserved), "max_overflow": concurrency}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout (there is no pool event for the wait itself)
+    and refreshes the overflow gauge after every return.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.db_pool_checkout_timeouts_total.inc()
+            raise
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            # Only now is an overflow connection discarded (the "checkin" event is too
+            # early), so the gauge drops back to 0 once a burst is over
+            metrics.db_pool_overflow.set(max(0, self.overflow()))
+
+
+def instrument_engine(engine):
+    """Publishes pool occupancy on checkout/checkin and counts pre-ping failures"""
+    pool = engine.pool
+
+    # "checkin" fires before the connection is back in the queue, so
+    # pool.checkedout() still counts it: the gauge follows the events instead
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(*_):
+        metrics.db_pool_checked_out.inc()
+        metrics.db_pool_overflow.set(max(0, pool.overflow()))
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(*_):
+        metrics.db_pool_checked_out.dec()
+
+    @event.listens_for(engine, "handle_error")
+    def _count_preping_failures(context):
+        if context.is_pre_ping:
+            metrics.db_pool_preping_failures_total.inc()
+
+    metrics.db_pool_size.set(pool.size())
+    return engine
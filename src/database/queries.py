@@ -0,0 +1,169 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# ==============================================================================
+# CANNED READ-ONLY QUERIES (served by src/query_service.py)
+# ==============================================================================
+# Plain SQL shared by dashboards and notebooks. Optional filters use the
+# "(:param IS NULL OR column = :param)" form and the latest cycle is the
+# default, so one statement covers every parameter combination.
+
+LATEST_CYCLE = "(SELECT MAX(cycle_id) FROM fact_offers)"
+
+# Cheap (PK index) marker: changes whenever a cycle lands, offers are appended to it
+# or the retention job moves a day out of fact_offers. The manifest only exists
+# once init_db has run with src/database/retention.py in place (NULL until then).
+DATA_VERSION_SQL = """
+    SELECT (SELECT MAX(cycle_id) FROM dim_scraper_metadata), (SELECT MAX(offer_id) FROM fact_offers), {archive}
+"""
+ARCHIVE_VERSION = "(SELECT MAX(archive_id) FROM fact_offers_archive)"
+
+
+def data_version_sql(has_archive: bool) -> str:
+    return DATA_VERSION_SQL.format(archive=ARCHIVE_VERSION if has_archive else "NULL")
+
+MAX_LIMIT = 1000
+
+
+def _bool(value: str) -> bool:
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"expected a boolean, got '{value}'")
+
+
+class CannedQuery:
+    """
+    One endpoint: SQL plus its parameters as name -> (converter, default).
+    A parameter whose default is `required` must be given by the caller.
+    """
+
+    required = object()
+
+    def __init__(self, name: str, sql: str, params: Dict[str, Tuple[Callable[[str], Any], Any]], description: str):
+        self.name = name
+        self.sql = sql
+        self.params = params
+        self.description = description
+
+    def bind(self, raw: Dict[str, str]) -> Dict[str, Any]:
+        """Validated bind parameters from a query string (ValueError on bad input)"""
+        unknown = set(raw) - set(self.params) - {"format"}
+        if unknown:
+            raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+        bound = {}
+        for name, (convert, default) in self.params.items():
+            if name in raw and raw[name] != "":
+                try:
+                    bound[name] = convert(raw[name])
+                except ValueError as e:
+                    raise ValueError(f"invalid value for '{name}': {e}")
+            elif default is CannedQuery.required:
+                raise ValueError(f"missing required parameter '{name}'")
+            else:
+                bound[name] = default
+        if "limit" in bound:
+            bound["limit"] = max(1, min(bound["limit"], MAX_LIMIT))
+        return bound
+
+
+QUERIES: Dict[str, CannedQuery] = {q.name: q for q in [
+    CannedQuery(
+        "price_history",
+        """
+        SELECT f.cycle_id, MIN(f.extraction_date) AS observed_at,
+               MIN(f.price) AS min_price, AVG(f.price) AS avg_price, MAX(f.price) AS max_price,
+               COUNT(*) AS offers
+        FROM fact_offers f
+        JOIN dim_products p ON p.product_id = f.product_id
+        WHERE p.item_id = :item_id AND f.price > 0
+        GROUP BY f.cycle_id
+        ORDER BY f.cycle_id
+        """,
+        {"item_id": (int, CannedQuery.required)},
+        "Per-cycle min/avg/max price of one SKU (marketplace item_id)",
+    ),
+    CannedQuery(
+        "daily_price_history",
+        """
+        SELECT day, MIN(min_price) AS min_price, SUM(price_sum) / SUM(offers) AS avg_price,
+               MAX(max_price) AS max_price, SUM(offers) AS offers
+        FROM (
+            -- Days moved out of fact_offers by the retention job (src/database/retention.py)
+            SELECT d.day, d.min_price, d.max_price, d.price_sum, d.offers
+            FROM fact_offers_daily d
+            JOIN dim_products p ON p.product_id = d.product_id
+            WHERE p.item_id = :item_id
+            UNION ALL
+            SELECT CAST(f.extraction_date AS DATE), f.price, f.price, f.price, 1
+            FROM fact_offers f
+            JOIN dim_products p ON p.product_id = f.product_id
+            WHERE p.item_id = :item_id AND f.price > 0
+        ) days
+        GROUP BY day
+        ORDER BY day
+        """,
+        {"item_id": (int, CannedQuery.required)},
+        "Per-day min/avg/max price of one SKU over its whole history (archived days included)",
+    ),
+    CannedQuery(
+        "seller_share",
+        f"""
+        SELECT s.seller_name, COUNT(*) AS offers,
+               ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 2) AS share_pct
+        FROM fact_offers f
+        JOIN dim_sellers s ON s.seller_id = f.seller_id
+        JOIN dim_products p ON p.product_id = f.product_id
+        WHERE f.cycle_id = COALESCE(:cycle_id, {LATEST_CYCLE})
+          AND (:model_family IS NULL OR p.model_family = :model_family)
+        GROUP BY s.seller_name
+        ORDER BY offers DESC, s.seller_name
+        LIMIT :limit
+        """,
+        {"cycle_id": (int, None), "model_family": (str, None), "limit": (int, 50)},
+        "Offer share per seller in one cycle (latest by default)",
+    ),
+    CannedQuery(
+        "badge_rates",
+        f"""
+        SELECT f.cycle_id, COUNT(*) AS offers,
+               ROUND(AVG(CASE WHEN f.is_great_deal THEN 1.0 ELSE 0.0 END), 4) AS great_deal_rate,
+               ROUND(AVG(CASE WHEN f.is_bestseller THEN 1.0 ELSE 0.0 END), 4) AS bestseller_rate,
+               ROUND(AVG(CASE WHEN f.is_recommended THEN 1.0 ELSE 0.0 END), 4) AS recommended_rate,
+               ROUND(AVG(CASE WHEN f.free_delivery THEN 1.0 ELSE 0.0 END), 4) AS free_delivery_rate,
+               ROUND(AVG(CASE WHEN f.interest_free THEN 1.0 ELSE 0.0 END), 4) AS interest_free_rate
+        FROM fact_offers f
+        JOIN dim_products p ON p.product_id = f.product_id
+        WHERE f.cycle_id > {LATEST_CYCLE} - :cycles
+          AND (:model_family IS NULL OR p.model_family = :model_family)
+        GROUP BY f.cycle_id
+        ORDER BY f.cycle_id
+        """,
+        {"cycles": (int, 28), "model_family": (str, None)},
+        "Share of offers carrying each badge, per cycle, over the last N cycles",
+    ),
+    CannedQuery(
+        "cheapest_offers",
+        f"""
+        SELECT p.item_id, p.title, p.model_family, p.storage_gb, p.is_refurbished,
+               s.seller_name, f.price, f.extraction_date, p.sku_link
+        FROM fact_offers f
+        JOIN dim_products p ON p.product_id = f.product_id
+        JOIN dim_sellers s ON s.seller_id = f.seller_id
+        WHERE f.cycle_id = COALESCE(:cycle_id, {LATEST_CYCLE})
+          AND f.price > 0
+          AND p.model_family = :model_family
+          AND (:storage_gb IS NULL OR p.storage_gb = :storage_gb)
+          AND (:refurbished IS NULL OR p.is_refurbished = :refurbished)
+        ORDER BY f.price, p.item_id
+        LIMIT :limit
+        """,
+        {"model_family": (str, CannedQuery.required), "storage_gb": (int, None), "refurbished": (_bool, None),
+         "cycle_id": (int, None), "limit": (int, 20)},
+        "Cheapest offers of one model (e.g. model_family=S23 Ultra&storage_gb=256) in a cycle",
+    ),
+]}
+
+
+def get_query(name: str) -> Optional[CannedQuery]:
+    return QUERIES.get(name)
@@ -0,0 +1,197 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, inspect, select, text
+
+from src.database.export import DEFAULT_BATCH_SIZE, ParquetExportWriter, iter_query_batches
+from src.database.models import FactOffer, FactOfferArchive
+
+# ==============================================================================
+# TIERED RETENTION (hot fact_offers -> daily aggregates + Parquet archive)
+# ==============================================================================
+# Analyses older than the hot window only need daily granularity, so each day
+# past it is, in order:
+# 1. streamed to <archive dir>/YYYY/MM/fact_offers_<day>_part<n>.parquet (zstd,
+#    raw fact_offers columns, written to a temp file and renamed);
+# 2. in ONE transaction: summarized into fact_offers_daily, recorded in the
+#    fact_offers_archive manifest and bulk-deleted from fact_offers.
+# The delete is bounded by the exported offer_id range and only runs if the
+# table still holds exactly the exported rows, so nothing leaves the hot table
+# without being in a file. A crash between 1 and 2 leaves an orphan file that
+# the next run overwrites. The hot table (and its indexes) stays at ~HOT_DAYS.
+
+ARCHIVE_COLUMNS = list(FactOffer.__table__.columns)
+ARCHIVE_COLUMN_NAMES = [column.key for column in ARCHIVE_COLUMNS]
+
+DAY_RANGE = "extraction_date >= :start AND extraction_date < :end AND offer_id <= :max_offer_id"
+
+SUMMARIZE_DAY_SQL = """
+    INSERT INTO fact_offers_daily (day, product_id, seller_id, offers, cycles, min_price, max_price, price_sum,
+                                   great_deal_offers, bestseller_offers, free_delivery_offers, first_seen, last_seen)
+    SELECT :day, product_id, seller_id, COUNT(*), COUNT(DISTINCT cycle_id), MIN(price), MAX(price), SUM(price),
+           SUM(CASE WHEN is_great_deal THEN 1 ELSE 0 END),
+           SUM(CASE WHEN is_bestseller THEN 1 ELSE 0 END),
+           SUM(CASE WHEN free_delivery THEN 1 ELSE 0 END),
+           MIN(extraction_date), MAX(extraction_date)
+    FROM fact_offers
+    WHERE {day_range}
+    GROUP BY product_id, seller_id
+    ON CONFLICT (day, product_id, seller_id) DO UPDATE SET
+        offers = fact_offers_daily.offers + excluded.offers,
+        cycles = fact_offers_daily.cycles + excluded.cycles,
+        min_price = {least}(fact_offers_daily.min_price, excluded.min_price),
+        max_price = {greatest}(fact_offers_daily.max_price, excluded.max_price),
+        price_sum = fact_offers_daily.price_sum + excluded.price_sum,
+        great_deal_offers = fact_offers_daily.great_deal_offers + excluded.great_deal_offers,
+        bestseller_offers = fact_offers_daily.bestseller_offers + excluded.bestseller_offers,
+        free_delivery_offers = fact_offers_daily.free_delivery_offers + excluded.free_delivery_offers,
+        first_seen = {least}(fact_offers_daily.first_seen, excluded.first_seen),
+        last_seen = {greatest}(fact_offers_daily.last_seen, excluded.last_seen)
+"""
+
+
+def _summarize_sql(dialect: str) -> str:
+    # Smaller/larger of two values: LEAST/GREATEST on Postgres, scalar MIN/MAX on sqlite
+    least, greatest = ("LEAST", "GREATEST") if dialect == "postgresql" else ("MIN", "MAX")
+    return SUMMARIZE_DAY_SQL.format(day_range=DAY_RANGE, least=least, greatest=greatest)
+
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def archive_day(engine, day: date, archive_dir, batch_size: int = DEFAULT_BATCH_SIZE) -> Optional[Dict]:
+    """Archives, summarizes and deletes the fact_offers rows of one day (None when there are none)"""
+    start, end = _day_bounds(day)
+    with engine.connect() as connection:
+        rows, min_offer_id, max_offer_id = connection.execute(
+            select(func.count(), func.min(FactOffer.offer_id), func.max(FactOffer.offer_id))
+            .where(FactOffer.extraction_date >= start, FactOffer.extraction_date < end)
+        ).one()
+        if not rows:
+            return None
+        part = connection.execute(
+            select(func.count()).select_from(FactOfferArchive).where(FactOfferArchive.day == day)
+        ).scalar()
+
+    relative_path = f"{day:%Y}/{day:%m}/fact_offers_{day.isoformat()}_part{part}.parquet"
+    path = Path(archive_dir) / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    params = {"day": day, "start": start, "end": end, "max_offer_id": max_offer_id}
+
+    query = (
+        select(*ARCHIVE_COLUMNS)
+        .where(FactOffer.extraction_date >= start, FactOffer.extraction_date < end,
+               FactOffer.offer_id <= max_offer_id)
+        .order_by(FactOffer.offer_id)
+    )
+    written = 0
+    writer = ParquetExportWriter(tmp_path, columns=ARCHIVE_COLUMNS, compression="zstd")
+    try:
+        for batch in iter_query_batches(engine, query, batch_size):
+            writer.write(batch)
+            written += len(batch)
+        writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    with engine.begin() as connection:
+        # Same rows as the file, or nothing is deleted (a writer touched the day meanwhile)
+        current = connection.execute(text(f"SELECT COUNT(*) FROM fact_offers WHERE {DAY_RANGE}"), params).scalar()
+        if current != written:
+            os.remove(path)
+            return {"day": day.isoformat(), "rows": 0, "skipped": True}
+        connection.execute(text(_summarize_sql(engine.dialect.name)), params)
+        connection.execute(FactOfferArchive.__table__.insert().values(
+            day=day, part=part, path=relative_path, rows=written, min_offer_id=min_offer_id,
+            max_offer_id=max_offer_id, size_bytes=os.path.getsize(path), created_at=datetime.now()
+        ))
+        connection.execute(text(f"DELETE FROM fact_offers WHERE {DAY_RANGE}"), params)
+    return {"day": day.isoformat(), "rows": written, "path": relative_path, "skipped": False}
+
+
+def apply_retention(engine, hot_days: int, archive_dir, today: Optional[date] = None, max_days: Optional[int] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE, on_day: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Moves every day older than `hot_days` out of fact_offers, oldest first.
+    Each day is its own transaction: the job can be stopped and resumed anytime.
+    """
+    started = time.perf_counter()
+    cutoff = (today or date.today()) - timedelta(days=hot_days)
+    with engine.connect() as connection:
+        oldest = connection.execute(select(func.min(FactOffer.extraction_date))).scalar()
+
+    days: List[Dict] = []
+    day = oldest.date() if oldest is not None else cutoff
+    while day < cutoff and (max_days is None or len(days) < max_days):
+        report = archive_day(engine, day, archive_dir, batch_size)
+        if report is not None:
+            days.append(report)
+            if on_day:
+                on_day(report)
+        # Skips the empty days in one indexed lookup
+        with engine.connect() as connection:
+            following = connection.execute(
+                select(func.min(FactOffer.extraction_date)).where(FactOffer.extraction_date >= _day_bounds(day)[1])
+            ).scalar()
+        if following is None:
+            break
+        day = following.date()
+    return {"cutoff": cutoff.isoformat(), "days": len(days), "rows": sum(d["rows"] for d in days),
+            "skipped": sum(1 for d in days if d["skipped"]), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def archived_days(engine) -> Set[date]:
+    """Days with at least one archive part (empty before the retention tables exist)"""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(FactOfferArchive.__tablename__):
+            return set()
+        return set(connection.execute(select(FactOfferArchive.day).distinct()).scalars())
+
+
+def read_offers(engine, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                include_archive: bool = False, archive_dir=None):
+    """
+    fact_offers rows with start <= extraction_date < end as a DataFrame. With
+    `include_archive`, the archived files of the range (found via the manifest)
+    are read too, filtered on extraction_date, so callers see one continuous history.
+    """
+    import pandas as pd
+
+    conditions = []
+    if start is not None:
+        conditions.append(FactOffer.extraction_date >= start)
+    if end is not None:
+        conditions.append(FactOffer.extraction_date < end)
+    frames = [pd.read_sql(select(*ARCHIVE_COLUMNS).where(*conditions).order_by(FactOffer.offer_id), engine)]
+
+    if include_archive:
+        manifest = select(FactOfferArchive.path).order_by(FactOfferArchive.day, FactOfferArchive.part)
+        if start is not None:
+            manifest = manifest.where(FactOfferArchive.day >= start.date())
+        if end is not None:
+            manifest = manifest.where(FactOfferArchive.day <= end.date())
+        with engine.connect() as connection:
+            paths = connection.execute(manifest).scalars().all()
+        filters = [("extraction_date", op, value) for op, value in ((">=", start), ("<", end)) if value is not None]
+        archive_dir = Path(archive_dir) if archive_dir is not None else _default_archive_dir()
+        frames = [pd.read_parquet(archive_dir / path, filters=filters or None) for path in paths] + frames
+
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=ARCHIVE_COLUMN_NAMES)
+    return pd.concat(frames, ignore_index=True).sort_values(["extraction_date", "offer_id"], ignore_index=True)
+
+
+def _default_archive_dir() -> Path:
+    from src.monitoring.settings import MonitoringConfig
+    return MonitoringConfig.RETENTION_ARCHIVE_DIR
@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+# ==============================================================================
+# PRODUCT TITLE SEARCH (indexes provisioned by src/database/upgrades.py)
+# ==============================================================================
+# Replaces `title ILIKE '%s23 ultra%'` sequential scans with index lookups:
+# - full text: the stored title_tsv column (Portuguese stemming over the
+#   accent-folded title) and its GIN index, queried with prefix terms so
+#   "s23 ult" already matches "S23 Ultra";
+# - trigram (only where pg_trgm is installed): word similarity on the folded
+#   title, for typos the full-text query misses.
+# The MAX_RANKED_CANDIDATES best full-text matches (by ts_rank_cd, a top-N sort
+# over the GIN matches) are kept, then at most as many typo-only trigram
+# matches, so fuzzy hits never push exact ones out. Broad queries ("samsung")
+# are therefore ranked exactly up to that cap; "total" stops there and
+# "total_capped" tells the caller so.
+# Results are ranked, paginated, and carry each product's latest offers.
+
+MAX_TERMS = 8
+MAX_PAGE_SIZE = 100
+MAX_OFFERS_PER_PRODUCT = 10
+MAX_RANKED_CANDIDATES = 2000
+
+SEARCH_SQL = """
+    WITH fulltext AS (
+        SELECT p.product_id, ts_rank_cd(p.title_tsv, to_tsquery('portuguese', :tsquery)) AS text_rank,
+               false AS fuzzy
+        FROM dim_products p
+        WHERE p.title_tsv @@ to_tsquery('portuguese', :tsquery)
+        ORDER BY text_rank DESC, p.product_id
+        LIMIT :candidates
+    ){fuzzy_cte},
+    matches AS (
+        SELECT p.product_id, p.item_id, p.title, p.model_family, p.storage_gb, p.is_refurbished,
+               p.canonical_product_id, p.sku_link, c.text_rank, c.fuzzy
+        FROM ({candidates}) c
+        JOIN dim_products p ON p.product_id = c.product_id
+    ),
+    page AS (
+        SELECT m.product_id, m.item_id, m.title, m.model_family, m.storage_gb, m.is_refurbished,
+               m.canonical_product_id, m.sku_link,
+               m.text_rank{trigram_rank} AS rank,
+               COUNT(*) OVER () AS total,
+               COUNT(*) FILTER (WHERE m.fuzzy) OVER () AS fuzzy_total
+        FROM matches m
+        ORDER BY rank DESC, m.product_id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT page.*, o.cycle_id, o.price, o.seller_name, o.extraction_date
+    FROM page
+    LEFT JOIN LATERAL (
+        SELECT f.cycle_id, f.price, s.seller_name, f.extraction_date
+        FROM fact_offers f
+        JOIN dim_sellers s ON s.seller_id = f.seller_id
+        WHERE f.product_id = page.product_id
+        ORDER BY f.extraction_date DESC
+        LIMIT :offers
+    ) o ON true
+    ORDER BY page.rank DESC, page.product_id, o.extraction_date DESC
+"""
+# Typo matches the full-text query misses, most similar first
+FUZZY_CTE = """,
+    fuzzy AS (
+        SELECT p.product_id, CAST(0 AS REAL) AS text_rank, true AS fuzzy
+        FROM dim_products p
+        WHERE :folded <% search_normalize(p.title)
+          AND NOT (p.title_tsv @@ to_tsquery('portuguese', :tsquery))
+        ORDER BY word_similarity(:folded, search_normalize(p.title)) DESC, p.product_id
+        LIMIT :candidates
+    )"""
+FULLTEXT_CANDIDATES = "SELECT product_id, text_rank, fuzzy FROM fulltext"
+TRIGRAM_CANDIDATES = FULLTEXT_CANDIDATES + " UNION ALL SELECT product_id, text_rank, fuzzy FROM fuzzy"
+TRIGRAM_RANK = " + word_similarity(:folded, search_normalize(m.title))"
+
+PRODUCT_FIELDS = ["product_id", "item_id", "title", "model_family", "storage_gb", "is_refurbished",
+                  "canonical_product_id", "sku_link", "rank"]
+OFFER_FIELDS = ["cycle_id", "price", "seller_name", "extraction_date"]
+
+# engine URL -> pg_trgm installed
+_trigram_support: Dict[str, bool] = {}
+
+
+def search_terms(query: str) -> List[str]:
+    """Accent-folded, lower-case alphanumeric terms (ValueError when there are none)"""
+    folded = unicodedata.normalize("NFKD", query or "").encode("ascii", "ignore").decode("ascii").lower()
+    terms = re.findall(r"[a-z0-9]+", folded)[:MAX_TERMS]
+    if not terms:
+        raise ValueError("the search query has no searchable terms")
+    return terms
+
+
+def prefix_tsquery(terms: List[str]) -> str:
+    """"s23 ult" -> "s23:* & ult:*" (terms are alphanumeric, nothing to escape)"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def has_trigram_support(engine) -> bool:
+    key = str(engine.url)
+    if key not in _trigram_support:
+        with engine.connect() as connection:
+            _trigram_support[key] = connection.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            ).scalar()
+    return _trigram_support[key]
+
+
+def search_products(engine, query: str, page: int = 1, page_size: int = 20,
+                    offers_per_product: int = 3) -> Dict[str, Any]:
+    """
+    Products whose title matches `query`, best first, with their latest offers:
+    {"query", "page", "page_size", "total", "total_capped", "results": [{...product, "latest_offers": [...]}]}
+    `total` is 0 past the last page. With `total_capped`, more products match than
+    were ranked: the results are the best MAX_RANKED_CANDIDATES full-text matches.
+    """
+    terms = search_terms(query)
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    offers_per_product = max(0, min(offers_per_product, MAX_OFFERS_PER_PRODUCT))
+
+    trigram = has_trigram_support(engine)
+    sql = SEARCH_SQL.format(
+        fuzzy_cte=FUZZY_CTE if trigram else "",
+        candidates=TRIGRAM_CANDIDATES if trigram else FULLTEXT_CANDIDATES,
+        trigram_rank=TRIGRAM_RANK if trigram else "",
+    )
+    params = {"tsquery": prefix_tsquery(terms), "folded": " ".join(terms), "limit": page_size,
+              "offset": (page - 1) * page_size, "offers": offers_per_product, "candidates": MAX_RANKED_CANDIDATES}
+
+    with engine.connect() as connection:
+        rows = connection.execution_options(postgresql_readonly=True).execute(text(sql), params).mappings().all()
+
+    results: List[Dict[str, Any]] = []
+    total = fuzzy_total = 0
+    for row in rows:
+        if not results or results[-1]["product_id"] != row["product_id"]:
+            total, fuzzy_total = row["total"], row["fuzzy_total"]
+            results.append({**{field: row[field] for field in PRODUCT_FIELDS}, "latest_offers": []})
+        if row["cycle_id"] is not None:
+            results[-1]["latest_offers"].append({field: row[field] for field in OFFER_FIELDS})
+    return {"query": query, "page": page, "page_size": page_size, "total": total,
+            "total_capped": max(total - fuzzy_total, fuzzy_total) >= MAX_RANKED_CANDIDATES, "results": results}
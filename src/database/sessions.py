@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def unit_of_work(factory):
+    """
+    One session per batch writer: commits when the block succeeds, rolls back
+    on any exception (re-raised) and always returns the connection to the pool.
+    """
+    session = factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,119 @@
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.pipeline.identifiers import UNIFIED_ID_OFFSET
+
+# ==============================================================================
+# IN-PLACE SCHEMA UPGRADES
+# ==============================================================================
+# Base.metadata.create_all() only creates missing tables, it never alters the
+# ones already living on the VPS. Each statement below is idempotent
+# (IF NOT EXISTS / IF EXISTS) so init_db can run them on every deployment.
+
+SCHEMA_UPGRADES: List[str] = [
+    # ======= Marketplace item ID as the product natural key =======
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS item_id BIGINT",
+    # Backfill from the stored URL with the same (case-insensitive) patterns as
+    # src/pipeline/identifiers.py: catalogue ids positive, listing ids negated,
+    # unified listing ids shifted by UNIFIED_ID_OFFSET. Only the first product of
+    # each id gets it, older URL-variant duplicates keep NULL (unique index).
+    f"""
+    UPDATE dim_products p
+    SET item_id = x.item_id
+    FROM (
+        SELECT product_id, item_id,
+               ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY product_id) AS rn
+        FROM (
+            SELECT product_id,
+                   COALESCE(
+                       {UNIFIED_ID_OFFSET} + substring(sku_link FROM '(?i)/up/MLBU-?([0-9]+)')::BIGINT,
+                       substring(sku_link FROM '(?i)/p/MLB-?([0-9]+)')::BIGINT,
+                       -(substring(sku_link FROM '(?i)/MLB-?([0-9]+)')::BIGINT)
+                   ) AS item_id
+            FROM dim_products
+            WHERE item_id IS NULL
+        ) parsed
+        WHERE item_id IS NOT NULL
+    ) x
+    WHERE p.product_id = x.product_id
+      AND x.rn = 1
+      AND NOT EXISTS (SELECT 1 FROM dim_products d WHERE d.item_id = x.item_id)
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_dim_products_item_id ON dim_products (item_id)",
+    # The 2048-char URL is no longer a lookup key: drop its unique index
+    "DROP INDEX IF EXISTS ix_dim_products_sku_link",
+    
+    # ======= Precomputed product attributes (filled by scripts/backfill_product_attributes.py) =======
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS model_family VARCHAR(50)",
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS storage_gb INTEGER",
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS ram_gb INTEGER",
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS is_5g BOOLEAN",
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS is_refurbished BOOLEAN",
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS color VARCHAR(30)",
+    "CREATE INDEX IF NOT EXISTS ix_dim_products_model_family ON dim_products (model_family)",
+    "CREATE INDEX IF NOT EXISTS ix_dim_products_is_refurbished ON dim_products (is_refurbished)",
+    "CREATE INDEX IF NOT EXISTS idx_product_model_storage ON dim_products (model_family, storage_gb)",
+    
+    # ======= Distributed crawl: cycle completion tracked by the work queue =======
+    # (crawl_work_queue itself is a new table, created by create_all)
+    "ALTER TABLE dim_scraper_metadata ADD COLUMN IF NOT EXISTS cycle_status VARCHAR(20)",
+    "ALTER TABLE dim_scraper_metadata ADD COLUMN IF NOT EXISTS cycle_end TIMESTAMP",
+    
+    # ======= Canonical products (filled by scripts/resolve_canonical_products.py / the migration) =======
+    "ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS canonical_product_id INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_dim_products_canonical_product_id ON dim_products (canonical_product_id)",
+    
+    # ======= Title search (src/database/search.py) =======
+    # Accent folding with built-ins only: unaccent() is not IMMUTABLE (and needs
+    # contrib), translate() is, so the expression can be indexed
+    """
+    CREATE OR REPLACE FUNCTION search_normalize(value TEXT) RETURNS TEXT
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT lower(translate(value,
+            'áàâãäåéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ',
+            'aaaaaaeeeeiiiiooooouuuucnAAAAAAEEEEIIIIOOOOOUUUUCN'))
+    $$
+    """,
+    # Portuguese stemming over the folded title ("câmeras" ~ "camera"). Stored, so
+    # ranking reads it instead of re-parsing every matching title (one table rewrite)
+    """
+    ALTER TABLE dim_products ADD COLUMN IF NOT EXISTS title_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('portuguese', search_normalize(title))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_dim_products_title_tsv ON dim_products USING gin (title_tsv)",
+]
+
+# Upgrades that depend on contrib extensions: skipped (with a warning) where
+# the extension is not installed, the features using them degrade gracefully
+OPTIONAL_SCHEMA_UPGRADES: Dict[str, List[str]] = {
+    # Typo-tolerant title search ("galaxi s23 ultr") on top of the full-text index
+    "pg_trgm": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """
+        CREATE INDEX IF NOT EXISTS idx_dim_products_title_trgm
+        ON dim_products USING gin (search_normalize(title) gin_trgm_ops)
+        """,
+    ],
+}
+
+
+def apply_schema_upgrades(engine) -> List[str]:
+    """
+    Runs every upgrade statement in a single transaction, then each optional
+    group in its own. Returns the optional groups that were applied.
+    """
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+
+    applied = []
+    for name, statements in OPTIONAL_SCHEMA_UPGRADES.items():
+        try:
+            with engine.begin() as connection:
+                for statement in statements:
+                    connection.execute(text(statement))
+            applied.append(name)
+        except DBAPIError as e:
+            print(f"⚠️ Optional schema upgrade '{name}' skipped: {str(e.orig).strip()}")
+    return applied
@@ -0,0 +1,157 @@
+import os
+import time
+import logging
+
+from src.monitoring.logger import structured_logger
+from src.monitoring.metrics import metrics, BusinessEventTracker
+from src.monitoring.resources import resource_sampler
+from src.monitoring.settings import MonitoringConfig
+from src.pipeline.dedup import ListingDedupIndex
+from src.pipeline.egress import EgressPool
+from src.pipeline.storage import ensure_csv
+from src.pipeline.targets import price_ranges, PAGE_SIZE, MAX_OFFSET
+from src.pipeline.work_queue import PostgresWorkQueue, LeaseHeartbeat
+from src.scraper import scrape_page, handle_captcha, build_price_alerts, PageOutcome
+
+# ==============================================================================
+# DISTRIBUTED CRAWL (SCRAPER_ROLE=coordinator | worker)
+# ==============================================================================
+# The coordinator publishes each cycle to crawl_work_queue and closes it in
+# dim_scraper_metadata once the queue drains; any number of workers (one host
+# or many) lease (price range, page) items from it. Delivery is at-least-once:
+# a page whose lease expired mid-flight may be written twice, which the
+# migration's (product, cycle, seller) idempotency check already absorbs.
+
+
+def build_work_queue(worker_id: str = None) -> PostgresWorkQueue:
+    # The engine is created on import, so the DB module is loaded only for distributed roles
+    from src.database.connection import engine
+    return PostgresWorkQueue(
+        engine,
+        worker_id=worker_id or MonitoringConfig.WORKER_ID,
+        lease_seconds=MonitoringConfig.WORK_LEASE_SECONDS,
+        max_attempts=MonitoringConfig.WORK_MAX_ATTEMPTS,
+    )
+
+
+def worker_shard_path(worker_id: str) -> str:
+    """Per-worker CSV shard (concurrent appends to one file are not safe across processes)"""
+    safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in worker_id)
+    return os.path.join(MonitoringConfig.SHARD_DIR, f"samsung_market_data_{safe_id}.csv")
+
+
+def run_coordinator(queue: PostgresWorkQueue, ranges=None, poll_seconds: float = None, single_run: bool = False):
+    """Publishes cycles, reclaims expired leases and records cycle completion"""
+    ranges = ranges if ranges is not None else price_ranges
+    poll_seconds = poll_seconds if poll_seconds is not None else MonitoringConfig.WORK_POLL_SECONDS
+
+    while True:
+        cycle_id, resumed = queue.open_cycle(ranges)
+        start_time = time.time()
+        structured_logger.log_business_event(
+            event_name="cycle_started",
+            context={"cycle_id": cycle_id, "resumed": resumed, "role": "coordinator", "ranges": len(ranges)}
+        )
+        BusinessEventTracker.track_scraping_start()
+        resource_sampler.start_cycle(cycle_id)
+
+        while True:
+            reclaimed = queue.reclaim_expired()
+            progress = queue.cycle_progress(cycle_id)
+            metrics.record_work_queue(progress, reclaimed=reclaimed)
+            if reclaimed:
+                structured_logger.log_business_event("work_leases_reclaimed", cycle_id=cycle_id, count=reclaimed)
+            if queue.finalize_cycle(cycle_id):
+                break
+            time.sleep(poll_seconds)
+
+        progress = queue.cycle_progress(cycle_id)
+        metrics.record_work_queue(progress)
+        structured_logger.log_business_event(
+            event_name="cycle_completed",
+            context={
+                "cycle_id": cycle_id,
+                "total_items": progress["items"],
+                "pages_done": progress["done"],
+                "pages_failed": progress["failed"],
+                "duration_minutes": round((time.time() - start_time) / 60, 2),
+                "resources": resource_sampler.end_cycle(),
+            }
+        )
+        BusinessEventTracker.track_scraping_complete(
+            total_items=progress["items"],
+            duration_seconds=time.time() - start_time
+        )
+
+        if single_run:
+            break
+
+        # Same cadence as the standalone loop
+        hours_sleep = 6
+        logging.info(f"Cycle {cycle_id} closed. Next cycle in {hours_sleep} hours...")
+        time.sleep(hours_sleep * 3600)
+
+
+def run_worker(queue: PostgresWorkQueue, output_file: str = None, poll_seconds: float = None,
+               single_run: bool = False):
+    """
+    Claims work items until stopped. In single_run mode the worker exits
+    once no item is pending or leased anywhere in the queue.
+    """
+    import requests
+
+    output_file = output_file or worker_shard_path(queue.worker_id)
+    poll_seconds = poll_seconds if poll_seconds is not None else MonitoringConfig.WORK_POLL_SECONDS
+    ensure_csv(output_file)
+
+    # Per-worker view: duplicates across workers of the same cycle are left to the migration
+    dedup_index = ListingDedupIndex(use_bloom=MonitoringConfig.DEDUP_BLOOM_ENABLED)
+    egress = EgressPool.from_config()
+    alerts = build_price_alerts()
+    current_cycle = None
+    structured_logger.log_business_event("worker_started", worker_id=queue.worker_id, csv_path=output_file)
+
+    while True:
+        item = queue.claim()
+        if item is None:
+            if single_run and not queue.has_open_work():
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        if item.cycle_id != current_cycle:
+            dedup_index.start_cycle()
+            current_cycle = item.cycle_id
+
+        with LeaseHeartbeat(queue, item) as lease:
+            try:
+                outcome = scrape_page(
+                    item.min_price, item.max_price, item.page_offset, item.page_number,
+                    item.cycle_id, dedup_index, output_file, egress=egress, alerts=alerts
+                )
+            except requests.exceptions.RequestException as e_net:
+                structured_logger.log_error(error=e_net, context={"scope": "network_request", "work_id": item.work_id})
+                queue.fail(item, f"{type(e_net).__name__}: {e_net}")
+                continue
+            except Exception as e_gen:
+                structured_logger.log_error(error=e_gen, context={"scope": "work_item", "work_id": item.work_id})
+                queue.fail(item, f"{type(e_gen).__name__}: {e_gen}")
+                continue
+
+        if outcome.status == PageOutcome.CAPTCHA:
+            # Hand the page to another exit before serving the penalty here
+            queue.release(item, "captcha")
+            handle_captcha(outcome, egress)
+            continue
+
+        # 404: the range has no such page (end of pagination), anything else is retried
+        if outcome.status == PageOutcome.HTTP_ERROR and outcome.status_code != 404:
+            queue.fail(item, f"HTTP {outcome.status_code}")
+            continue
+
+        next_offset = item.page_offset + PAGE_SIZE
+        has_next = outcome.status == PageOutcome.OK and next_offset <= MAX_OFFSET
+        if not queue.complete(item, items_found=outcome.items, next_offset=next_offset if has_next else None):
+            structured_logger.log_business_event(
+                "work_lease_lost", work_id=item.work_id, heartbeat_lost=lease.lost, items=outcome.items
+            )
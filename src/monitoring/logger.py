@@ -1,9 +1,112 @@
 import sys
 import json
+import math
+import time
+import random
+import threading
 from loguru import logger
-from  typing import Dict, Any
+from  typing import Dict, Any, List, Optional
 from .settings import MonitoringConfig
 
+
+class RequestLogAggregator:
+    """
+    Per-window accumulator used by the high-throughput logging mode.
+    Keeps request counts and a bounded latency reservoir per status code,
+    sums of aggregated business events, and the time spent inside the logger itself.
+    """
+
+    RESERVOIR_SIZE = 2048
+    # Event fields that are quantities; other numeric fields (page, offset,
+    # estimated_total_pages, attempts...) describe one event and keep their last value
+    SUMMED_COUNTERS = frozenset({"items", "items_count", "new_listings", "rows", "bytes", "retries"})
+
+    def __init__(self, window_seconds: float, rng: Optional[random.Random] = None, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._reset()
+
+    def _reset(self):
+        self.window_start = self._clock()
+        self.status_counts: Dict[int, int] = {}
+        self.latencies: Dict[int, List[float]] = {}
+        self.events: Dict[str, Dict[str, float]] = {}
+        self.logged_requests = 0
+        self.suppressed_requests = 0
+        self.overhead_seconds = 0.0
+        self.calls = 0
+
+    def record_request(self, status_code: int, duration: float, logged: bool):
+        count = self.status_counts.get(status_code, 0) + 1
+        self.status_counts[status_code] = count
+
+        # Reservoir sampling keeps percentiles representative with bounded memory
+        reservoir = self.latencies.setdefault(status_code, [])
+        if len(reservoir) < self.RESERVOIR_SIZE:
+            reservoir.append(duration)
+        else:
+            slot = self._rng.randrange(count)
+            if slot < self.RESERVOIR_SIZE:
+                reservoir[slot] = duration
+
+        if logged:
+            self.logged_requests += 1
+        else:
+            self.suppressed_requests += 1
+
+    def record_event(self, event_name: str, **counters):
+        totals = self.events.setdefault(event_name, {"occurrences": 0})
+        totals["occurrences"] += 1
+        for key, value in counters.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if key in self.SUMMED_COUNTERS:
+                totals[key] = totals.get(key, 0) + value
+            else:
+                totals[f"last_{key}"] = value
+
+    def add_overhead(self, seconds: float):
+        self.overhead_seconds += seconds
+        self.calls += 1
+
+    def is_due(self) -> bool:
+        return self._clock() - self.window_start >= self.window_seconds
+
+    @staticmethod
+    def percentile(sorted_values: List[float], pct: float) -> float:
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_values:
+            return 0.0
+        rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+        return sorted_values[rank]
+
+    def flush(self) -> Dict[str, Any]:
+        """Builds the window summary and starts a new window"""
+        per_status = {}
+        for status_code, count in sorted(self.status_counts.items()):
+            values = sorted(self.latencies.get(status_code, []))
+            per_status[str(status_code)] = {
+                "count": count,
+                "p50_seconds": round(self.percentile(values, 50), 4),
+                "p90_seconds": round(self.percentile(values, 90), 4),
+                "p99_seconds": round(self.percentile(values, 99), 4),
+                "max_seconds": round(values[-1], 4) if values else 0.0,
+            }
+        summary = {
+            "window_seconds": round(self._clock() - self.window_start, 2),
+            "requests_total": sum(self.status_counts.values()),
+            "requests_logged": self.logged_requests,
+            "requests_suppressed": self.suppressed_requests,
+            "per_status": per_status,
+            "events": self.events,
+            "logging_overhead_ms": round(self.overhead_seconds * 1000, 3),
+            "overhead_per_call_us": round(self.overhead_seconds / self.calls * 1e6, 2) if self.calls else 0.0,
+        }
+        self._reset()
+        return summary
+
+
 class StructuredLogger:
     """
     Enterprise Logger for the Scrapper.
@@ -12,7 +115,22 @@ class StructuredLogger:
     
     def __init__(self):
         self.config = MonitoringConfig()
+        self.high_throughput = self.config.LOG_MODE == "high_throughput"
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self._aggregator = RequestLogAggregator(self.config.LOG_SUMMARY_INTERVAL, rng=self._rng)
+        self.configured = False
+        
+    def configure(self):
+        """
+        Installs the console + JSON file handlers. Called explicitly by the process
+        entry point (src/app.py), never at import time, so tests and scripts that
+        import the monitoring package keep loguru's defaults untouched.
+        """
+        if self.configured:
+            return
         self._setup_logger()
+        self.configured = True
         
     def _setup_logger(self):
         """Configures Loguru to remove the default handler and use JSON"""
@@ -51,24 +169,70 @@ class StructuredLogger:
         ).info(f"Event: {event_name}")
         
     
+    def log_aggregated_event(self, event_name: str, **counters):
+        """
+        High-frequency business events (one per page).
+        Standard mode logs them as usual; high-throughput mode only adds the
+        numeric counters to the current window summary.
+        """
+        if not self.high_throughput:
+            self.log_business_event(event_name, **counters)
+            return
+        start = time.perf_counter()
+        with self._lock:
+            self._aggregator.record_event(event_name, **counters)
+            self._aggregator.add_overhead(time.perf_counter() - start)
+        self._maybe_flush()
+
     def log_http_request(self, method: str, url: str, status_code: int, duration: float):
         """
         Logs every request the scraper makes to Mercado Livre.
+        In high-throughput mode successful requests are sampled at LOG_SAMPLE_RATE;
+        errors and slow requests (SLOW_REQUEST_THRESHOLD) are always written.
         """
-        level = "INFO"
-        if status_code >= 400:
-            level = "WARNING"
-        if status_code >= 500:
-            level = "ERROR"
-            
-        logger.bind(
-            event_type="http_client_request",
-            method=method,
-            url=url,
-            status_code=status_code,
-            duration_seconds=round(duration, 4)
-        ).log(level, f"{method} {url} - {status_code} - {duration:.2f}s")
-        
+        start = time.perf_counter()
+        is_slow = duration >= self.config.SLOW_REQUEST_THRESHOLD
+
+        should_log = True
+        if self.high_throughput:
+            should_log = status_code >= 400 or is_slow or self._rng.random() < self.config.LOG_SAMPLE_RATE
+
+        if should_log:
+            level = "INFO"
+            if status_code >= 400 or is_slow:
+                level = "WARNING"
+            if status_code >= 500:
+                level = "ERROR"
+
+            logger.bind(
+                event_type="http_client_request",
+                method=method,
+                url=url,
+                status_code=status_code,
+                duration_seconds=round(duration, 4),
+                slow=is_slow,
+                sampled=self.high_throughput
+            ).log(level, f"{method} {url} - {status_code} - {duration:.2f}s{' (SLOW)' if is_slow else ''}")
+
+        if self.high_throughput:
+            with self._lock:
+                self._aggregator.record_request(status_code, duration, logged=should_log)
+                self._aggregator.add_overhead(time.perf_counter() - start)
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self._aggregator.is_due():
+            self.flush_summary()
+
+    def flush_summary(self):
+        """Emits the aggregated window (counts, latency percentiles, logger overhead)"""
+        if not self.high_throughput:
+            return
+        with self._lock:
+            summary = self._aggregator.flush()
+        if summary["requests_total"] or summary["events"]:
+            self.log_business_event("log_window_summary", **summary)
+
     
     def log_error(self, error: Exception, context: Dict[str, Any] = None):
         """Logs errors with structured stacktrace."""
@@ -1,30 +1,44 @@
 import time
-import psutil
 from typing import Optional
-from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest, start_http_server
+from prometheus_client import Counter, Histogram, Gauge, generate_latest, start_http_server
 from .settings import MonitoringConfig
 from .logger import structured_logger
+from .multiprocess import exporter_registry
 
 class ScraperMetricsCollector:
     """
     Metrics collector specific for Web Scraping.
     Exposes data to Prometheus on the defined port.
+    Metrics live on the default registry; `self.registry` is what the exporter
+    serves (the merged worker files in multiprocess mode, see multiprocess.py).
     """
     
     def __init__(self):
-        self.registry = CollectorRegistry()
+        self.registry = exporter_registry()
+        self._server_started = False
         self._setup_metrics()
         
     def start_server(self):
-        """Starts the metrics server in a separate thread"""
+        """Starts the metrics server in a separate thread (once, in the main process only)"""
+        if self._server_started:
+            return
         try:
-            start_http_server(MonitoringConfig.METRICS_PORT)
-            structured_logger.log_business_event("metrics_server_started", port=MonitoringConfig.METRICS_PORT)
+            start_http_server(MonitoringConfig.METRICS_PORT, registry=self.registry)
+            self._server_started = True
+            structured_logger.log_business_event(
+                "metrics_server_started",
+                port=MonitoringConfig.METRICS_PORT,
+                multiprocess=bool(MonitoringConfig.METRICS_MULTIPROC_DIR)
+            )
         except Exception as e:
             structured_logger.log_error(e, {"context": "starting_metrics_server"})
             
     def _setup_metrics(self):
-        """Defines the metrics we are going to track"""
+        """
+        Defines the metrics we are going to track.
+        Gauges declare how worker values combine in multiprocess mode: "livesum"
+        for per-process amounts, "livemostrecent" for values any process may publish.
+        """
         
         # 1. Business Counters
         self.items_scraped_total = Counter(
@@ -33,6 +47,11 @@ class ScraperMetricsCollector:
             ["category"], # Eg.: "smartphone"
         )
         
+        self.new_listings_total = Counter(
+            "samsung_new_listings_total",
+            "Listings seen for the first time ever (all-time dedup index)"
+        )
+        
         self.cycles_completed_total = Counter(
             "scraper_cycles_completed_total",
             "Total of full scraping cycles completed"
@@ -51,6 +70,26 @@ class ScraperMetricsCollector:
             buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
         )
         
+        # 2.1 Hot Path Breakdown (see src/monitoring/stages.py)
+        self.stage_duration = Histogram(
+            "scraper_stage_duration_seconds",
+            "Wall time spent per pipeline stage",
+            ["stage"], # Eg.: "politeness_sleep", "fetch", "parse_html", "card_extraction", "csv_append"
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+        )
+        
+        self.response_size_bytes = Histogram(
+            "scraper_response_size_bytes",
+            "Size of the HTML payload returned by the target site",
+            buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000)
+        )
+        
+        self.cards_per_page = Histogram(
+            "scraper_cards_per_page",
+            "Product cards found per listing page",
+            buckets=(0, 1, 5, 10, 20, 30, 40, 48, 60)
+        )
+        
         # 3. Robot Health (Crucial)
         self.captcha_detected_total = Counter(
             "scraper_captcha_detected_total",
@@ -63,9 +102,150 @@ class ScraperMetricsCollector:
             ["type"] # Eg.: "NetworkError", "ParseError"
         ) 
         
-        # 4. System Metrics (VPS CPU/RAM)
-        self.system_cpu_usage = Gauge("system_cpu_usage_percent", "CPU usage percent")
-        self.system_memory_usage = Gauge("system_memory_usage_bytes", "Memory usage in bytes")
+        # 2.2 Data Quality (schema validation before the CSV sink)
+        self.rejected_rows_total = Counter(
+            "scraper_rejected_rows_total",
+            "Offer rows rejected by the batch schema validation",
+            ["field", "reason"] # Eg.: ("price", "string_pattern_mismatch"), ("title", "missing")
+        )
+        
+        # 3.0 Page Coverage (retry queue, see src/pipeline/retry.py)
+        self.pages_total = Counter(
+            "scraper_pages_total",
+            "Listing pages by coverage result",
+            ["result"] # "attempted", "succeeded", "retried", "lost"
+        )
+        
+        self.retry_queue_depth = Gauge(
+            "scraper_retry_queue_depth",
+            "Failed pages currently waiting for a retry",
+            multiprocess_mode="livesum"
+        )
+        
+        # 3.1 Distributed Crawl (Postgres work queue, see src/distributed.py)
+        self.work_queue_items = Gauge(
+            "scraper_work_queue_items",
+            "Work items of the current cycle per lease status",
+            ["status"], # "pending", "leased", "done", "failed"
+            multiprocess_mode="livemostrecent"
+        )
+        
+        self.work_leases_reclaimed_total = Counter(
+            "scraper_work_leases_reclaimed_total",
+            "Expired leases returned to the queue by the coordinator"
+        )
+        
+        # 3.2 Egress Pool (one label value per configured exit)
+        self.egress_requests_total = Counter(
+            "scraper_egress_requests_total",
+            "Requests per egress route and outcome",
+            ["route", "outcome"] # outcome: "ok", "captcha", "ban", "error"
+        )
+        
+        self.egress_route_health = Gauge(
+            "scraper_egress_route_health",
+            "EWMA health score per egress route (1.0 = healthy)",
+            ["route"],
+            multiprocess_mode="livemostrecent"
+        )
+        
+        self.enrichment_pages_total = Counter(
+            "scraper_enrichment_pages_total",
+            "Product pages fetched by the enrichment stage",
+            ["result"] # "fetched", "failed"
+        )
+        
+        self.price_alerts_total = Counter(
+            "scraper_price_alerts_total",
+            "Price alerts emitted during the crawl",
+            ["event"] # "price_drop", "price_rise"
+        )
+        
+        self.price_alert_latency = Histogram(
+            "scraper_price_alert_latency_seconds",
+            "Time from the end of a page fetch to the emission of its price alerts",
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+        
+        # Database connection pool (src/database/pool.py)
+        self.db_pool_size = Gauge("db_pool_size", "Configured persistent connections (pool_size)",
+                                  multiprocess_mode="livesum")
+        self.db_pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out",
+                                          multiprocess_mode="livesum")
+        self.db_pool_overflow = Gauge("db_pool_overflow", "Overflow connections open beyond pool_size",
+                                      multiprocess_mode="livesum")
+        
+        self.db_pool_checkout_wait = Histogram(
+            "db_pool_checkout_wait_seconds",
+            "Time to obtain a pooled connection (queue wait + connect + pre-ping)",
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+        )
+        
+        self.db_pool_checkout_timeouts_total = Counter(
+            "db_pool_checkout_timeouts_total",
+            "Checkouts that gave up after pool_timeout (pool exhausted)"
+        )
+        
+        self.db_pool_preping_failures_total = Counter(
+            "db_pool_preping_failures_total",
+            "Stale connections detected by pool_pre_ping (reconnected transparently)"
+        )
+        
+        # Read-only query service (src/query_service.py)
+        self.query_requests_total = Counter(
+            "query_service_requests_total",
+            "Requests served by the query service",
+            ["endpoint", "status"]
+        )
+        
+        self.query_latency = Histogram(
+            "query_service_latency_seconds",
+            "Time to serve a query service request, cache hits and misses apart",
+            ["endpoint", "cache"], # cache: "hit", "miss"
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        )
+        
+        self.query_cache_invalidations_total = Counter(
+            "query_service_cache_invalidations_total",
+            "Result cache flushes caused by a new cycle landing in the warehouse"
+        )
+        
+        # 4. Process Resources (published by src/monitoring/resources.py)
+        self.process_rss_bytes = Gauge("scraper_process_rss_bytes", "Resident memory of the scraper process",
+                                       multiprocess_mode="livesum")
+        self.process_cpu_seconds = Gauge("scraper_process_cpu_seconds", "User + system CPU seconds of the process",
+                                         multiprocess_mode="livesum")
+        self.process_open_fds = Gauge("scraper_process_open_fds", "Open file descriptors of the process",
+                                      multiprocess_mode="livesum")
+        self.process_threads = Gauge("scraper_process_threads", "Threads of the process",
+                                     multiprocess_mode="livesum")
+        
+        self.gc_collections_total = Counter(
+            "scraper_gc_collections_total",
+            "Garbage collector runs per generation",
+            ["generation"]
+        )
+        
+        self.gc_pause_seconds_total = Counter(
+            "scraper_gc_pause_seconds_total",
+            "Time the process spent paused in the garbage collector",
+            ["generation"]
+        )
+        
+        self.cycle_peak_rss_bytes = Gauge("scraper_cycle_peak_rss_bytes", "Peak RSS sampled during the last cycle",
+                                          multiprocess_mode="livemostrecent")
+        
+        self.resource_budget_violations_total = Counter(
+            "scraper_resource_budget_violations_total",
+            "Cycles that exceeded their resource budget",
+            ["resource"] # "rss", "cpu"
+        )
+        
+        # 4.1 System Metrics (VPS CPU/RAM)
+        self.system_cpu_usage = Gauge("system_cpu_usage_percent", "CPU usage percent",
+                                      multiprocess_mode="livemostrecent")
+        self.system_memory_usage = Gauge("system_memory_usage_bytes", "Memory usage in bytes",
+                                         multiprocess_mode="livemostrecent")
         
         
     # =========== Methods to be called in scraper.py =========== #
@@ -80,11 +260,59 @@ class ScraperMetricsCollector:
         # Fixed: Typos corrected (duration)
         self.http_request_duration.observe(duration)
         
+    def record_page_shape(self, response_bytes: int, cards: int):
+        """Records payload size and card count of a fetched page"""
+        self.response_size_bytes.observe(response_bytes)
+        self.cards_per_page.observe(cards)
+        
     def record_item_scraped(self, count: int = 1):
         """Records N items collected"""
         # Fixed: Variable name matches definition (items_scraped_total)
         self.items_scraped_total.labels(category="smartphone").inc(count)
         
+    def record_new_listings(self, count: int = 1):
+        """Records N first-seen listings"""
+        self.new_listings_total.inc(count)
+        
+    def record_rejections(self, rejected: list):
+        """Counts every failed field of every rejected row"""
+        for entry in rejected:
+            for reason in entry["reasons"]:
+                self.rejected_rows_total.labels(field=reason["field"], reason=reason["reason"]).inc()
+        
+    def record_page_result(self, result: str):
+        """Records a page coverage event (attempted/succeeded/retried/lost)"""
+        self.pages_total.labels(result=result).inc()
+        
+    def record_work_queue(self, progress: dict, reclaimed: int = 0):
+        """Publishes the per-status work item counts of the running cycle"""
+        for status in ("pending", "leased", "done", "failed"):
+            self.work_queue_items.labels(status=status).set(progress.get(status, 0))
+        if reclaimed:
+            self.work_leases_reclaimed_total.inc(reclaimed)
+        
+    def record_egress(self, route: str, outcome: str, health: float):
+        """Records one request outcome on an egress route"""
+        self.egress_requests_total.labels(route=route, outcome=outcome).inc()
+        self.egress_route_health.labels(route=route).set(health)
+        
+    def record_enrichment(self, summary: dict):
+        """Records one enrichment stage run"""
+        for result in ("fetched", "failed"):
+            if summary.get(result):
+                self.enrichment_pages_total.labels(result=result).inc(summary[result])
+        
+    def record_price_alerts(self, events: list):
+        """Counts emitted alerts and observes how long they took to arrive"""
+        for event in events:
+            self.price_alerts_total.labels(event=event["event"]).inc()
+            self.price_alert_latency.observe(event["alert_latency_seconds"])
+        
+    def record_query(self, endpoint: str, status: int, cache: str, duration: float):
+        """Records one query service request"""
+        self.query_requests_total.labels(endpoint=endpoint, status=str(status)).inc()
+        self.query_latency.labels(endpoint=endpoint, cache=cache).observe(duration)
+        
     def record_captcha(self):
         """Records a block event"""
         self.captcha_detected_total.inc()
@@ -93,8 +321,23 @@ class ScraperMetricsCollector:
         """"Records an error"""
         self.errors_total.labels(type=error_type).inc()
         
+    def record_process_resources(self, reading: dict, gc_totals: dict, previous_gc: dict):
+        """Publishes one ResourceSampler reading (GC counters grow by the delta since the previous one)"""
+        self.process_rss_bytes.set(reading["rss_bytes"])
+        self.process_cpu_seconds.set(reading["cpu_seconds"])
+        self.process_open_fds.set(reading["open_fds"])
+        self.process_threads.set(reading["threads"])
+        for generation in range(3):
+            collections = gc_totals["collections"][generation] - previous_gc["collections"][generation]
+            pause = gc_totals["pause_seconds"][generation] - previous_gc["pause_seconds"][generation]
+            if collections:
+                self.gc_collections_total.labels(generation=str(generation)).inc(collections)
+                self.gc_pause_seconds_total.labels(generation=str(generation)).inc(pause)
+        
     def update_system_metrics(self):
-        """Called periodically to update CPU/RAM"""
+        """Host-wide CPU/RAM, refreshed by the ResourceSampler next to the process readings"""
+        import psutil
+        # Since the previous call (non-blocking)
         self.system_cpu_usage.set(psutil.cpu_percent())
         # Fixed: .used is a property, not a function call
         self.system_memory_usage.set(psutil.virtual_memory().used)
@@ -118,7 +361,7 @@ class BusinessEventTracker:
     def track_items(count: int):
         metrics.record_item_scraped(count)
         # Log to JSON only as an event summary, no need to log 1 by 1 to save disk space
-        structured_logger.log_business_event("batch_saved", items_count=count)
+        structured_logger.log_aggregated_event("batch_saved", items_count=count)
         
     @staticmethod
     def track_error(e: Exception, context: str):
@@ -131,17 +374,22 @@ class BusinessEventTracker:
         structured_logger.log_business_event("scraping_cycle_started")
         
     @staticmethod
-    def track_scraping_progress(page_number: int, items_found: int, total_pages: int):
-        structured_logger.log_business_event(
+    def track_scraping_progress(page_number: int, items_found: int, total_pages: int, new_listings: int = 0):
+        if new_listings:
+            metrics.record_new_listings(new_listings)
+        structured_logger.log_aggregated_event(
             "page_processed",
             page=page_number,
             items=items_found,
+            new_listings=new_listings,
             estimated_total_pages=total_pages
         )
     
     @staticmethod
     def track_scraping_complete(total_items: int, duration_seconds: float):
         metrics.cycles_completed_total.inc()
+        # High-throughput mode: close the current window with the cycle
+        structured_logger.flush_summary()
         structured_logger.log_business_event(
             "cycle_finished",
             total_items=total_items,
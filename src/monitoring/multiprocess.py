@@ -0,0 +1,103 @@
+import os
+import glob
+import threading
+from typing import Optional
+from prometheus_client import CollectorRegistry, REGISTRY
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+from prometheus_client.mmap_dict import MmapedDict
+from .settings import MonitoringConfig
+
+# ==============================================================================
+# PROMETHEUS MULTIPROCESS MODE (PROMETHEUS_MULTIPROC_DIR)
+# ==============================================================================
+# With PROMETHEUS_MULTIPROC_DIR set, every process (the main one and each fetch /
+# parse / forecasting worker) writes its samples to <dir>/<type>_<pid>.db and the
+# single exporter of the main process merges the files on every scrape:
+# counters, histogram buckets and sums are added up; gauges follow the
+# multiprocess_mode they were declared with (see metrics.py).
+# Files of dead workers would pile up (one set per pool process ever started),
+# so on each scrape their counter / histogram / summary values are folded into
+# <type>_archive.db and the files removed. Totals never go backwards, and
+# their 'live*' gauges are dropped.
+# The directory must be private to one container (pids are checked locally).
+
+ARCHIVED_TYPES = ("counter", "histogram", "summary")
+
+_compaction_lock = threading.Lock()
+
+
+def multiprocess_dir() -> str:
+    return MonitoringConfig.METRICS_MULTIPROC_DIR
+
+
+def reset_multiprocess_dir(path: Optional[str] = None):
+    """
+    Removes the files left by a previous run. Must run before this process
+    creates its first metric (src/app.py imports src.monitoring.metrics afterwards):
+    a restarted container gets the same pid and would resume the old totals.
+    """
+    path = path or multiprocess_dir()
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        os.remove(filename)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def compact_dead_workers(path: Optional[str] = None) -> int:
+    """Folds the files of exited processes into the archive files, returns how many were removed"""
+    path = path or multiprocess_dir()
+    removed = 0
+    with _compaction_lock:
+        dead = {}
+        for filename in glob.glob(os.path.join(path, "*.db")):
+            pid = os.path.basename(filename)[:-3].rsplit("_", 1)[-1]
+            if pid.isdigit() and not _is_alive(int(pid)):
+                dead.setdefault(int(pid), []).append(filename)
+
+        for pid, filenames in dead.items():
+            # 'live*' gauges of the worker
+            mark_process_dead(pid, path)
+            for filename in filenames:
+                typ = os.path.basename(filename).split("_", 1)[0]
+                if typ not in ARCHIVED_TYPES or not os.path.exists(filename):
+                    continue
+                archive = MmapedDict(os.path.join(path, f"{typ}_archive.db"))
+                try:
+                    for key, value, _, _ in MmapedDict.read_all_values_from_file(filename):
+                        current, _ = archive.read_value(key)
+                        archive.write_value(key, current + value, 0.0)
+                finally:
+                    archive.close()
+                os.remove(filename)
+                removed += 1
+    return removed
+
+
+class CompactingMultiProcessCollector(MultiProcessCollector):
+    """MultiProcessCollector that archives the files of dead workers before merging"""
+
+    def collect(self):
+        compact_dead_workers(self._path)
+        return super().collect()
+
+
+def exporter_registry() -> CollectorRegistry:
+    """Registry served by the exporter: the merged worker files in multiprocess mode, else the default one"""
+    path = multiprocess_dir()
+    if not path:
+        return REGISTRY
+    os.makedirs(path, exist_ok=True)
+    registry = CollectorRegistry()
+    CompactingMultiProcessCollector(registry, path)
+    return registry
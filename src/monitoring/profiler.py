@@ -0,0 +1,141 @@
+import io
+import time
+import pstats
+import cProfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Dict, Any
+from .settings import MonitoringConfig
+from .logger import structured_logger
+
+
+class CycleProfiler:
+    """
+    Opt-in CPU and memory profiler for the 24/7 loop (SCRAPER_PROFILE).
+    Each capture writes under logs/profiles/:
+    - <label>.prof : raw cProfile stats (open with snakeviz / pstats)
+    - <label>.txt  : top-N functions, top-N allocation sites and the memory
+                     diff against the previous capture (leak hunting)
+    """
+
+    MODES = MonitoringConfig.PROFILE_MODES
+
+    def __init__(self, mode: str = "off", every_n_pages: int = 50, top_n: int = 25,
+                 output_dir: Path = Path("logs/profiles")):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.every_n_pages = max(1, every_n_pages)
+        self.top_n = top_n
+        self.output_dir = Path(output_dir)
+        self._profile: Optional[cProfile.Profile] = None
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+        self._cycle_id = None
+        self._pages = 0
+        self._segment_start = 0.0
+
+    @classmethod
+    def from_config(cls) -> "CycleProfiler":
+        return cls(
+            mode=MonitoringConfig.PROFILE_MODE,
+            every_n_pages=MonitoringConfig.PROFILE_EVERY_N_PAGES,
+            top_n=MonitoringConfig.PROFILE_TOP_N,
+            output_dir=MonitoringConfig.PROFILE_DIR,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    # =========== Hooks called by main_loop =========== #
+
+    def start_cycle(self, cycle_id: int):
+        if not self.enabled:
+            return
+        self._cycle_id = cycle_id
+        self._pages = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self._start_segment()
+
+    def on_page(self):
+        if not self.enabled or self._profile is None:
+            return
+        self._pages += 1
+        if self.mode == "pages" and self._pages % self.every_n_pages == 0:
+            self.capture(f"cycle{self._cycle_id}_page{self._pages}")
+            self._start_segment()
+
+    def end_cycle(self) -> Optional[Dict[str, Any]]:
+        if not self.enabled or self._profile is None:
+            return None
+        return self.capture(f"cycle{self._cycle_id}_end")
+
+    def stop(self):
+        """Releases the profiler and tracemalloc (used on shutdown/tests)"""
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = None
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # =========== Capture =========== #
+
+    def _start_segment(self):
+        self._profile = cProfile.Profile()
+        self._segment_start = time.perf_counter()
+        self._profile.enable()
+
+    def capture(self, label: str) -> Dict[str, Any]:
+        """Stops the current segment and writes the .prof/.txt pair"""
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._segment_start
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prof_path = self.output_dir / f"{label}_{stamp}.prof"
+        txt_path = self.output_dir / f"{label}_{stamp}.txt"
+
+        self._profile.dump_stats(str(prof_path))
+        cpu_report = io.StringIO()
+        pstats.Stats(self._profile, stream=cpu_report).sort_stats("cumulative").print_stats(self.top_n)
+        self._profile = None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        top_allocations = snapshot.statistics("lineno")[:self.top_n]
+        diff = snapshot.compare_to(self._previous_snapshot, "lineno")[:self.top_n] if self._previous_snapshot else []
+        self._previous_snapshot = snapshot
+
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(f"# Profile {label} | segment {elapsed:.1f}s | pages {self._pages}\n")
+            f.write(f"# Traced memory: current={current / 1e6:.1f} MB peak={peak / 1e6:.1f} MB\n\n")
+            f.write(f"## Top {self.top_n} functions (cumulative time)\n")
+            f.write(cpu_report.getvalue())
+            f.write(f"\n## Top {self.top_n} allocation sites\n")
+            for stat in top_allocations:
+                f.write(f"{stat}\n")
+            f.write("\n## Memory diff vs previous capture\n")
+            if not diff:
+                f.write("(first capture, no baseline yet)\n")
+            for stat in diff:
+                f.write(f"{stat}\n")
+
+        result = {
+            "label": label,
+            "profile_path": str(prof_path),
+            "summary_path": str(txt_path),
+            "segment_seconds": round(elapsed, 2),
+            "traced_memory_mb": round(current / 1e6, 2),
+            "traced_peak_mb": round(peak / 1e6, 2),
+            "top_growth": str(diff[0]) if diff else None,
+        }
+        structured_logger.log_business_event("profile_captured", **result)
+        return result
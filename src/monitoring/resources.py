@@ -0,0 +1,180 @@
+import gc
+import os
+import time
+import threading
+from typing import Optional, Dict, Any, List
+from .settings import MonitoringConfig
+from .logger import structured_logger
+from .metrics import metrics
+
+
+class GcPauseTracker:
+    """
+    gc.callbacks hook: collections and pause time per generation.
+    The callback may fire inside any allocation, even while a metrics lock is
+    held, so it only updates plain counters; the sampler publishes them.
+    """
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pause_seconds = [0.0, 0.0, 0.0]
+        self.max_pause_seconds = 0.0
+        self._started_at = None
+        self._installed = False
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._started_at = time.perf_counter()
+        elif self._started_at is not None:
+            pause = time.perf_counter() - self._started_at
+            self._started_at = None
+            generation = info["generation"]
+            self.collections[generation] += 1
+            self.pause_seconds[generation] += pause
+            if pause > self.max_pause_seconds:
+                self.max_pause_seconds = pause
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def totals(self) -> Dict[str, Any]:
+        return {"collections": list(self.collections), "pause_seconds": list(self.pause_seconds),
+                "max_pause_seconds": self.max_pause_seconds}
+
+
+class ResourceSampler:
+    """
+    Background thread publishing the scraper process's own resources every
+    `interval` seconds: RSS, CPU seconds, open file descriptors, threads and
+    GC collections/pauses (host-wide CPU/RAM gauges are refreshed as well).
+    Between start_cycle() and end_cycle() it keeps the peaks of the cycle and
+    checks them against the budgets (0 = no budget): peak RSS in MB and CPU
+    seconds spent by the process during the cycle. A violation is logged and
+    counted, so a leak in the 24/7 loop shows up cycles before an OOM kill.
+    """
+
+    def __init__(self, interval: float = 15.0, rss_budget_mb: float = 0.0, cpu_budget_seconds: float = 0.0):
+        self.interval = max(0.1, interval)
+        self.rss_budget_mb = rss_budget_mb
+        self.cpu_budget_seconds = cpu_budget_seconds
+        self.gc_tracker = GcPauseTracker()
+        self._process = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._published_gc = self.gc_tracker.totals()
+        self._cycle: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_config(cls) -> "ResourceSampler":
+        return cls(
+            interval=MonitoringConfig.RESOURCE_SAMPLE_SECONDS,
+            rss_budget_mb=MonitoringConfig.RESOURCE_BUDGET_RSS_MB,
+            cpu_budget_seconds=MonitoringConfig.RESOURCE_BUDGET_CPU_SECONDS,
+        )
+
+    # =========== Sampling =========== #
+
+    def sample(self) -> Dict[str, Any]:
+        """Reads the process counters, publishes them and updates the cycle peaks"""
+        if self._process is None:
+            import psutil
+            self._process = psutil.Process(os.getpid())
+            self.gc_tracker.install()
+        process = self._process
+        with process.oneshot():
+            cpu = process.cpu_times()
+            reading = {
+                "rss_bytes": process.memory_info().rss,
+                "cpu_seconds": cpu.user + cpu.system,
+                "open_fds": process.num_fds() if hasattr(process, "num_fds") else process.num_handles(),
+                "threads": process.num_threads(),
+            }
+        gc_totals = self.gc_tracker.totals()
+        metrics.record_process_resources(reading, gc_totals, self._published_gc)
+        metrics.update_system_metrics()
+
+        with self._lock:
+            self._published_gc = gc_totals
+            if self._cycle is not None:
+                peaks = self._cycle["peaks"]
+                for key in ("rss_bytes", "open_fds", "threads"):
+                    peaks[key] = max(peaks.get(key, 0), reading[key])
+        return reading
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                structured_logger.log_error(e, {"context": "resource_sampler"})
+
+    def start(self):
+        """Starts the daemon sampling thread (called once by src/app.py)"""
+        if self._thread is not None:
+            return
+        self.sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.gc_tracker.uninstall()
+
+    # =========== Hooks called by the cycle loops =========== #
+
+    def start_cycle(self, cycle_id: int):
+        reading = self.sample()
+        with self._lock:
+            self._cycle = {"cycle_id": cycle_id, "started": reading, "gc": self._published_gc,
+                           "peaks": {key: reading[key] for key in ("rss_bytes", "open_fds", "threads")}}
+
+    def end_cycle(self) -> Optional[Dict[str, Any]]:
+        """Per-cycle usage for the cycle_completed event (None without start_cycle)"""
+        if self._cycle is None:
+            return None
+        reading = self.sample()
+        with self._lock:
+            cycle, self._cycle = self._cycle, None
+        gc_totals = self.gc_tracker.totals()
+        usage = {
+            "peak_rss_mb": round(cycle["peaks"]["rss_bytes"] / 1024 ** 2, 1),
+            "end_rss_mb": round(reading["rss_bytes"] / 1024 ** 2, 1),
+            "rss_growth_mb": round((reading["rss_bytes"] - cycle["started"]["rss_bytes"]) / 1024 ** 2, 1),
+            "cpu_seconds": round(reading["cpu_seconds"] - cycle["started"]["cpu_seconds"], 2),
+            "peak_open_fds": cycle["peaks"]["open_fds"],
+            "peak_threads": cycle["peaks"]["threads"],
+            "gc_collections": [now - before for now, before in zip(gc_totals["collections"], cycle["gc"]["collections"])],
+            "gc_pause_seconds": round(sum(gc_totals["pause_seconds"]) - sum(cycle["gc"]["pause_seconds"]), 4),
+        }
+        usage["budget_violations"] = self._check_budgets(cycle["cycle_id"], usage)
+        metrics.cycle_peak_rss_bytes.set(cycle["peaks"]["rss_bytes"])
+        return usage
+
+    def _check_budgets(self, cycle_id: int, usage: Dict[str, Any]) -> List[str]:
+        checks = [("rss", usage["peak_rss_mb"], self.rss_budget_mb),
+                  ("cpu", usage["cpu_seconds"], self.cpu_budget_seconds)]
+        violations = []
+        for resource, used, budget in checks:
+            if budget and used > budget:
+                violations.append(resource)
+                metrics.resource_budget_violations_total.labels(resource=resource).inc()
+                structured_logger.log_business_event(
+                    "resource_budget_exceeded", cycle_id=cycle_id, resource=resource, used=used, budget=budget
+                )
+        return violations
+
+
+# Process-wide instance: the thread is only started by src/app.py
+resource_sampler = ResourceSampler.from_config()
@@ -1,4 +1,5 @@
 import os 
+import socket
 from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
@@ -9,6 +10,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_choice(name: str, default: str, choices) -> str:
+    """Enumerated setting: a typo fails the container at startup, not mid-cycle"""
+    value = os.getenv(name, default)
+    if value not in choices:
+        raise ValueError(f"Invalid {name}='{value}', expected one of {choices}")
+    return value
+
+
 class MonitoringConfig:
     """
     Centralized configuration for the Samsung Scraper monitoring and database.
@@ -30,10 +39,42 @@ class MonitoringConfig:
     
     # ======== Metrics Configuration (Prometheus) ========
     METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9090"))
-    
+    # prometheus_client multiprocess mode (src/monitoring/multiprocess.py): set it when
+    # metrics are updated from worker processes. Must be an env var (read by
+    # prometheus_client at import) pointing to a directory private to the container.
+    METRICS_MULTIPROC_DIR: str = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
     # Performace Alerts: Warning threshhold for slow requests
     # If a page takes longer than 10s to download, generate a warning
-    SLOW_REQUEST_THRESHOLD: float = 10.0
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "10.0"))
+    
+    # ======== High-Throughput Logging ========
+    # "standard": one log line per HTTP request / page (default, pilot phase)
+    # "high_throughput": successful requests are sampled, errors and slow requests
+    # are always kept, and per-window summaries replace per-page events.
+    LOG_MODE: str = _env_choice("LOG_MODE", "standard", ("standard", "high_throughput"))
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.05"))
+    LOG_SUMMARY_INTERVAL: float = float(os.getenv("LOG_SUMMARY_INTERVAL", "60"))
+    
+    # Per-stage latency histograms (sleep, fetch, parse, extraction, sinks).
+    # When disabled, stage() returns a shared no-op context manager.
+    STAGE_TIMING_ENABLED: bool = os.getenv("STAGE_TIMING_ENABLED", "1") == "1"
+    
+    # ======== Resource Sampler (src/monitoring/resources.py) ========
+    # Process RSS / CPU / fds / threads / GC published every N seconds. Budgets are
+    # per cycle (0 = none): peak RSS in MB and CPU seconds spent by the process.
+    RESOURCE_SAMPLER_ENABLED: bool = os.getenv("SCRAPER_RESOURCE_SAMPLER", "1") == "1"
+    RESOURCE_SAMPLE_SECONDS: float = float(os.getenv("SCRAPER_RESOURCE_SAMPLE_SECONDS", "15"))
+    RESOURCE_BUDGET_RSS_MB: float = float(os.getenv("SCRAPER_RESOURCE_BUDGET_RSS_MB", "0"))
+    RESOURCE_BUDGET_CPU_SECONDS: float = float(os.getenv("SCRAPER_RESOURCE_BUDGET_CPU_SECONDS", "0"))
+    
+    # ======== Profiling Mode (opt-in, set next to SCRAPER_MODE) ========
+    # "off" | "cycle" (one capture per cycle) | "pages" (one capture every N pages)
+    PROFILE_MODES = ("off", "cycle", "pages")
+    PROFILE_MODE: str = _env_choice("SCRAPER_PROFILE", "off", PROFILE_MODES)
+    PROFILE_EVERY_N_PAGES: int = int(os.getenv("SCRAPER_PROFILE_EVERY_N_PAGES", "50"))
+    PROFILE_TOP_N: int = int(os.getenv("SCRAPER_PROFILE_TOP_N", "25"))
+    PROFILE_DIR: Path = Path(os.getenv("SCRAPER_PROFILE_DIR", "logs/profiles"))
     
     @classmethod
     def get_log_config(cls) -> Dict[str, Any]:
@@ -60,4 +101,89 @@ class MonitoringConfig:
         """
         if not cls.DB_USER or not cls.DB_PASSWORD:
             return ""
-        return f"postgresql://{cls.DB_USER}:{cls.DB_PASSWORD}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
\ No newline at end of file
+        return f"postgresql://{cls.DB_USER}:{cls.DB_PASSWORD}@{cls.DB_HOST}:{cls.DB_PORT}/{cls.DB_NAME}"
+
+    # ======== SCRAPER STATE (Checkpointing) ========
+    # Durable checkpoint rewritten atomically after every page, so a restarted
+    # container resumes the in-flight cycle instead of starting over at cycle 1.
+    CHECKPOINT_PATH: Path = Path(os.getenv("SCRAPER_CHECKPOINT_PATH", "data/state/scraper_checkpoint.json"))
+    
+    # All-time index of hashed listing keys ("have we ever seen this SKU?")
+    DEDUP_INDEX_PATH: Path = Path(os.getenv("SCRAPER_DEDUP_INDEX_PATH", "data/state/seen_listings.idx"))
+    DEDUP_BLOOM_ENABLED: bool = os.getenv("SCRAPER_DEDUP_BLOOM", "1") == "1"
+    
+    # Rows rejected by the offer schema (src/pipeline/validation.py), one JSONL per day
+    QUARANTINE_DIR: Path = Path(os.getenv("SCRAPER_QUARANTINE_DIR", "data/quarantine"))
+    
+    # Forecasting features (src/pipeline/features.py), updated incrementally per cycle
+    FEATURE_STORE_DIR: Path = Path(os.getenv("FEATURE_STORE_DIR", "data/processed/features"))
+    
+    # ======== BATCH FORECASTING (src/pipeline/forecasting.py) ========
+    # Steps are 6h cycles: horizon 4 = next 24h. Lookback bounds the series read per run.
+    FORECAST_HORIZON: int = int(os.getenv("FORECAST_HORIZON", "4"))
+    FORECAST_LOOKBACK_CYCLES: int = int(os.getenv("FORECAST_LOOKBACK_CYCLES", "120"))
+    FORECAST_WORKERS: int = int(os.getenv("FORECAST_WORKERS", str(os.cpu_count() or 1)))
+    FORECAST_BATCH_SIZE: int = int(os.getenv("FORECAST_BATCH_SIZE", "2000"))
+    
+    # ======== RETENTION (src/database/retention.py, scripts/apply_retention.py) ========
+    # fact_offers rows older than HOT_DAYS are summarized into fact_offers_daily,
+    # written to one zstd Parquet file per day under ARCHIVE_DIR and deleted.
+    RETENTION_HOT_DAYS: int = int(os.getenv("RETENTION_HOT_DAYS", "90"))
+    RETENTION_ARCHIVE_DIR: Path = Path(os.getenv("RETENTION_ARCHIVE_DIR", "data/archive/fact_offers"))
+    
+    # ======== RETRY QUEUE (src/pipeline/retry.py) ========
+    # Failed pages are deferred instead of abandoning the range: full-jitter
+    # exponential backoff uniform(0, min(MAX_DELAY, BASE_DELAY * 2^attempt)).
+    RETRY_BASE_DELAY: float = float(os.getenv("SCRAPER_RETRY_BASE_DELAY", "30"))
+    RETRY_MAX_DELAY: float = float(os.getenv("SCRAPER_RETRY_MAX_DELAY", "900"))
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("SCRAPER_RETRY_MAX_ATTEMPTS", "4"))
+    
+    # ======== DISTRIBUTED CRAWL (Postgres work queue) ========
+    # "standalone": one process runs every range (default)
+    # "coordinator": publishes each cycle's work items, reclaims expired leases, closes cycles
+    # "worker": claims (price range, page) items with FOR UPDATE SKIP LOCKED
+    SCRAPER_ROLE: str = os.getenv("SCRAPER_ROLE", "standalone")
+    WORKER_ID: str = os.getenv("SCRAPER_WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+    WORK_LEASE_SECONDS: int = int(os.getenv("SCRAPER_WORK_LEASE_SECONDS", "120"))
+    WORK_MAX_ATTEMPTS: int = int(os.getenv("SCRAPER_WORK_MAX_ATTEMPTS", "3"))
+    WORK_POLL_SECONDS: float = float(os.getenv("SCRAPER_WORK_POLL_SECONDS", "10"))
+    # Each worker appends to its own CSV shard (no cross-process appends on one file)
+    SHARD_DIR: Path = Path(os.getenv("SCRAPER_SHARD_DIR", "data/raw/shards"))
+    
+    # ======== EGRESS POOL (src/pipeline/egress.py) ========
+    # Comma-separated exits: "direct", "source:<local ip>" or proxy URLs
+    # (e.g. "direct,http://user:pw@10.0.0.2:3128"). Empty keeps the single-IP random sleep.
+    EGRESS_ROUTES: str = os.getenv("SCRAPER_EGRESS_ROUTES", "")
+    EGRESS_RATE_PER_MINUTE: float = float(os.getenv("SCRAPER_EGRESS_RATE_PER_MINUTE", "15"))
+    EGRESS_BURST: int = int(os.getenv("SCRAPER_EGRESS_BURST", "1"))
+    EGRESS_CAPTCHA_COOLDOWN: float = float(os.getenv("SCRAPER_EGRESS_CAPTCHA_COOLDOWN", "900"))
+    EGRESS_JITTER_SECONDS: float = float(os.getenv("SCRAPER_EGRESS_JITTER_SECONDS", "1.0"))
+    
+    # ======== QUERY SERVICE (src/query_service.py, SCRAPER_ROLE=query) ========
+    # Read-only HTTP endpoints over the star schema. Cached results are dropped
+    # as soon as a new cycle (or new offers) land; the check runs at most every
+    # QUERY_VERSION_CHECK_SECONDS. Results larger than the entry cap are streamed uncached.
+    QUERY_HOST: str = os.getenv("QUERY_HOST", "0.0.0.0")
+    QUERY_PORT: int = int(os.getenv("QUERY_PORT", "8080"))
+    QUERY_CACHE_MAX_ENTRIES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+    QUERY_CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024)))
+    QUERY_VERSION_CHECK_SECONDS: float = float(os.getenv("QUERY_VERSION_CHECK_SECONDS", "5"))
+
+    # ======== PRICE ALERTS (src/pipeline/price_alerts.py) ========
+    # Opt-in. Each validated card is compared with its SKU's last known price
+    # (warm-started from the warehouse when DB_* is set) and drops/rises past the
+    # thresholds are appended to a daily JSONL stream seconds after the fetch.
+    PRICE_ALERTS_ENABLED: bool = os.getenv("SCRAPER_PRICE_ALERTS", "0") == "1"
+    PRICE_ALERTS_DIR: Path = Path(os.getenv("SCRAPER_PRICE_ALERTS_DIR", "data/alerts"))
+    PRICE_ALERT_DROP_THRESHOLD: float = float(os.getenv("SCRAPER_PRICE_ALERT_DROP", "0.05"))
+    PRICE_ALERT_RISE_THRESHOLD: float = float(os.getenv("SCRAPER_PRICE_ALERT_RISE", "0.05"))
+    
+    # ======== PRODUCT ENRICHMENT (src/pipeline/enrichment.py) ========
+    # Opt-in, needs the database. After each standalone cycle, product pages are
+    # fetched for SKUs never enriched or with a field past its TTL, at most QUOTA
+    # per cycle, through the same politeness sleep / egress budget as listings.
+    ENRICHMENT_ENABLED: bool = os.getenv("SCRAPER_ENRICHMENT", "0") == "1"
+    ENRICHMENT_QUOTA: int = int(os.getenv("SCRAPER_ENRICHMENT_QUOTA", "200"))
+    ENRICHMENT_TTL_SPECS_HOURS: float = float(os.getenv("SCRAPER_ENRICHMENT_TTL_SPECS_HOURS", "720"))
+    ENRICHMENT_TTL_SELLER_HOURS: float = float(os.getenv("SCRAPER_ENRICHMENT_TTL_SELLER_HOURS", "168"))
+    ENRICHMENT_TTL_STOCK_HOURS: float = float(os.getenv("SCRAPER_ENRICHMENT_TTL_STOCK_HOURS", "24"))
@@ -0,0 +1,105 @@
+import time
+from functools import wraps
+from typing import Dict, Any
+from .settings import MonitoringConfig
+from .metrics import metrics
+
+
+class _NoopStage:
+    """Shared do-nothing context manager returned while stage timing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _TimedStage:
+    __slots__ = ("_timer", "_name", "_start")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self._timer = timer
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._timer.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class StageTimer:
+    """
+    Lightweight stage-timing surface for the scrape hot path.
+    Usage:
+        with stage_timer.stage("fetch"): ...
+        @stage_timer.timed("csv_append")
+    Each stage feeds scraper_stage_duration_seconds{stage} and a running
+    per-stage total that can be attached to cycle/migration summaries.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[str, Any] = {}
+        self._totals: Dict[str, list] = {}
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NOOP_STAGE
+        return _TimedStage(self, name)
+
+    def timed(self, name: str):
+        """Decorator form of stage(); the enabled flag is checked per call"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _TimedStage(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def start(self) -> float:
+        """Manual form for blocks that cannot be wrapped: pair with stop()"""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, name: str, started: float):
+        if self.enabled:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float):
+        child = self._histograms.get(name)
+        if child is None:
+            # Resolve the labeled child once, .labels() is the expensive part
+            child = self._histograms[name] = metrics.stage_duration.labels(stage=name)
+        child.observe(seconds)
+        total = self._totals.get(name)
+        if total is None:
+            self._totals[name] = [seconds, 1]
+        else:
+            total[0] += seconds
+            total[1] += 1
+
+    def summary(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Seconds and call count per stage since the last reset"""
+        result = {
+            name: {"seconds": round(total, 3), "calls": calls}
+            for name, (total, calls) in sorted(self._totals.items(), key=lambda item: -item[1][0])
+        }
+        if reset:
+            self._totals = {}
+        return result
+
+
+# Global singleton instance
+stage_timer = StageTimer(enabled=MonitoringConfig.STAGE_TIMING_ENABLED)
@@ -0,0 +1,123 @@
+import re
+from typing import Dict, Any, List, Iterable
+
+import pandas as pd
+
+# ==============================================================================
+# COMPILED TITLE PATTERNS
+# ==============================================================================
+# Applied to lower-cased, accent-stripped titles, e.g.
+# "smartphone samsung galaxy a15 5g 128gb 4gb ram dual sim azul claro"
+
+FOLDABLE_PATTERN = re.compile(r"\bz\s*(?P<fold>flip|fold)\s*(?P<fold_num>\d{1,2})(?!\d)")
+NOTE_PATTERN = re.compile(r"\bnote\s*(?P<note_num>\d{1,2})(?!\d)\s*(?P<note_variant>ultra|plus|\+)?")
+SERIES_PATTERN = re.compile(
+    r"\b(?P<series>[asmf])\s?(?P<num>\d{1,3})(?!\d)(?!\s*(?:gb|tb|mp|mah|hz|w|g)\b)"
+    r"\s*(?P<variant>ultra|plus|fe|lite|edge|\+)?"
+)
+RAM_PATTERN = re.compile(
+    r"(?P<ram_a>\d{1,2})\s*(?:gb)?\s*(?:de\s+)?(?:memoria\s+)?ram\b"
+    r"|\bram\s*(?:de\s+)?(?P<ram_b>\d{1,2})\s*gb"
+)
+STORAGE_PATTERN = re.compile(r"(?P<size>\d{1,4})\s*(?P<unit>gb|tb)\b(?!\s*(?:de\s+)?(?:memoria\s+)?ram\b)")
+FIVE_G_PATTERN = re.compile(r"\b5g\b")
+REFURBISHED_PATTERN = re.compile(r"recondicionad|seminovo|\bvitrine\b|\busado\b|refurbished")
+COLOR_PATTERN = re.compile(
+    r"\b(?P<color>preto|branco|azul|verde|cinza|prata|violeta|lilas|rosa|dourado|grafite|creme|"
+    r"amarelo|vermelho|lavanda|menta|bege|roxo|titanio|marinho|laranja|coral|bronze)\b"
+)
+
+# Storage sizes a phone can actually ship with (filters "4gb" RAM and noise)
+VALID_STORAGE_GB = {16, 32, 64, 128, 256, 512, 1024, 2048}
+# An unlabeled GB value this small is RAM ("128gb 8gb Preto")
+MAX_RAM_GB = 24
+
+ATTRIBUTE_COLUMNS = ["model_family", "storage_gb", "ram_gb", "is_5g", "is_refurbished", "color"]
+
+
+def _normalize_titles(titles: pd.Series) -> pd.Series:
+    return (
+        titles.fillna("").astype(str)
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower()
+    )
+
+
+def _model_family(text: pd.Series) -> pd.Series:
+    """Normalized family label: 'A15', 'S23 Ultra', 'Z Flip 5', 'Note 20 Ultra'"""
+    variant_names = {"+": "Plus", "fe": "FE"}
+
+    def _variant(values: pd.Series) -> pd.Series:
+        return values.map(lambda v: "" if pd.isna(v) else " " + variant_names.get(v, v.title()))
+
+    series = text.str.extract(SERIES_PATTERN)
+    family = series["series"].str.upper() + series["num"] + _variant(series["variant"])
+
+    note = text.str.extract(NOTE_PATTERN)
+    note_family = "Note " + note["note_num"] + _variant(note["note_variant"])
+
+    fold = text.str.extract(FOLDABLE_PATTERN)
+    fold_family = "Z " + fold["fold"].str.title() + " " + fold["fold_num"]
+
+    # Foldables and Notes win over the generic series pattern ("z flip5" has no a/s/m/f match anyway)
+    result = family.astype(object)
+    result[note_family.notna()] = note_family
+    result[fold_family.notna()] = fold_family
+    return result
+
+
+def _gb_values(text: pd.Series) -> pd.Series:
+    """Every size mention not labeled as RAM, in GB, indexed by title position"""
+    matches = text.str.extractall(STORAGE_PATTERN)
+    if matches.empty:
+        return pd.Series(dtype="int64")
+    sizes = matches["size"].astype(int) * matches["unit"].map({"gb": 1, "tb": 1024})
+    return sizes.droplevel("match")
+
+
+def _storage_gb(text: pd.Series, sizes: pd.Series) -> pd.Series:
+    sizes = sizes[sizes.isin(VALID_STORAGE_GB)]
+    return sizes.groupby(level=0).max().reindex(text.index).astype("Int64")
+
+
+def _ram_gb(text: pd.Series, sizes: pd.Series) -> pd.Series:
+    ram = text.str.extract(RAM_PATTERN)
+    explicit = pd.to_numeric(ram["ram_a"], errors="coerce").fillna(pd.to_numeric(ram["ram_b"], errors="coerce"))
+    implicit = sizes[sizes <= MAX_RAM_GB].groupby(level=0).min().reindex(text.index)
+    return explicit.fillna(implicit).astype("Int64")
+
+
+def extract_attributes_frame(titles: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized attribute extraction for a whole batch of titles.
+    Returns one row per title (same index) with ATTRIBUTE_COLUMNS.
+    """
+    text = _normalize_titles(titles)
+    sizes = _gb_values(text)
+    return pd.DataFrame({
+        "model_family": _model_family(text),
+        "storage_gb": _storage_gb(text, sizes),
+        "ram_gb": _ram_gb(text, sizes),
+        "is_5g": text.str.contains(FIVE_G_PATTERN),
+        "is_refurbished": text.str.contains(REFURBISHED_PATTERN),
+        "color": text.str.extract(COLOR_PATTERN)["color"],
+    }, index=titles.index)
+
+
+def extract_attributes_records(titles: Iterable[str]) -> List[Dict[str, Any]]:
+    """Same as extract_attributes_frame, as plain-Python dicts ready for ORM models (NaN -> None)"""
+    frame = extract_attributes_frame(pd.Series(list(titles), dtype=object))
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+    for record in records:
+        for key in ("storage_gb", "ram_gb"):
+            if record[key] is not None:
+                record[key] = int(record[key])
+        for key in ("is_5g", "is_refurbished"):
+            record[key] = bool(record[key])
+    return records
+
+
+def extract_attributes(title: str) -> Dict[str, Any]:
+    """Single-title convenience wrapper"""
+    return extract_attributes_records([title])[0]
@@ -0,0 +1,161 @@
+import os
+import json
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class CycleCheckpoint:
+    """
+    Durable progress marker for a scraping cycle.
+    Records which price ranges are finished, where the in-flight range stopped
+    and the dedup state, so a restarted container resumes the same cycle.
+    """
+
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+
+    def __init__(self, cycle_id: int, status: str = STATUS_RUNNING, started_at: Optional[str] = None,
+                 completed_ranges: Optional[List[str]] = None, range_progress: Optional[Dict[str, Dict[str, int]]] = None,
+                 total_items: int = 0, dedup_state: Any = None, pending_retries: Optional[List[Dict[str, Any]]] = None,
+                 coverage: Optional[Dict[str, int]] = None):
+        self.cycle_id = cycle_id
+        self.status = status
+        self.started_at = started_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.completed_ranges = completed_ranges or []
+        # In-flight ranges: {"1200-1249": {"next_offset": 97, "page_number": 3}}
+        self.range_progress = range_progress or {}
+        self.total_items = total_items
+        self.dedup_state = dedup_state
+        # Failed pages still waiting in the retry queue (src/pipeline/retry.py)
+        self.pending_retries = pending_retries or []
+        # CycleCoverage counters so far: {"attempted": .., "succeeded": .., "retried": .., "lost": ..}
+        self.coverage = coverage or {}
+
+    @staticmethod
+    def range_key(min_price: int, max_price: int) -> str:
+        return f"{min_price}-{max_price}"
+
+    def is_range_completed(self, min_price: int, max_price: int) -> bool:
+        return self.range_key(min_price, max_price) in self.completed_ranges
+
+    def resume_position(self, min_price: int, max_price: int) -> Tuple[int, int]:
+        """Returns (offset, page_number) where pagination must restart for a range"""
+        progress = self.range_progress.get(self.range_key(min_price, max_price))
+        if not progress:
+            return 1, 1
+        return progress["next_offset"], progress["page_number"]
+
+    def mark_page_done(self, min_price: int, max_price: int, next_offset: int, next_page_number: int, items: int):
+        self.range_progress[self.range_key(min_price, max_price)] = {
+            "next_offset": next_offset,
+            "page_number": next_page_number,
+        }
+        self.total_items += items
+
+    def mark_range_done(self, min_price: int, max_price: int):
+        key = self.range_key(min_price, max_price)
+        self.range_progress.pop(key, None)
+        if key not in self.completed_ranges:
+            self.completed_ranges.append(key)
+
+    def mark_cycle_done(self):
+        self.status = self.STATUS_COMPLETED
+        self.range_progress = {}
+        self.dedup_state = None
+        self.pending_retries = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cycle_id": self.cycle_id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "completed_ranges": self.completed_ranges,
+            "range_progress": self.range_progress,
+            "total_items": self.total_items,
+            "dedup_state": self.dedup_state,
+            "pending_retries": self.pending_retries,
+            "coverage": self.coverage,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CycleCheckpoint":
+        return cls(
+            cycle_id=int(data["cycle_id"]),
+            status=data.get("status", cls.STATUS_RUNNING),
+            started_at=data.get("started_at"),
+            completed_ranges=list(data.get("completed_ranges", [])),
+            range_progress=dict(data.get("range_progress", {})),
+            total_items=int(data.get("total_items", 0)),
+            dedup_state=data.get("dedup_state"),
+            pending_retries=list(data.get("pending_retries", [])),
+            coverage=dict(data.get("coverage", {})),
+        )
+
+
+class CheckpointStore:
+    """
+    Persists CycleCheckpoint objects as JSON.
+    Writes go to a temp file in the same directory, are fsync'ed and then
+    os.replace()'d over the target, so a crash never leaves a torn checkpoint.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Optional[CycleCheckpoint]:
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return CycleCheckpoint.from_dict(json.load(f))
+        except (ValueError, KeyError, TypeError):
+            # A corrupt checkpoint must never block the scraper: start fresh.
+            return None
+
+    def save(self, checkpoint: CycleCheckpoint):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint_", suffix=".tmp", dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(checkpoint.to_dict(), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def last_cycle_id_in_csv(csv_path: str) -> int:
+    """
+    Highest cycle_id already written to the raw CSV (0 if none).
+    Used when no checkpoint exists yet, so new cycle ids never collide with old rows.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+    import pandas as pd
+    try:
+        ids = pd.read_csv(csv_path, sep=";", usecols=["cycle_id"], encoding="utf-8-sig")["cycle_id"]
+    except (ValueError, pd.errors.EmptyDataError):
+        return 0
+    ids = pd.to_numeric(ids, errors="coerce").dropna()
+    return int(ids.max()) if not ids.empty else 0
+
+
+def resolve_starting_cycle(store: CheckpointStore, csv_path: str) -> CycleCheckpoint:
+    """
+    Decides which cycle the scraper should run on startup:
+    - An in-flight checkpoint is resumed as-is.
+    - A completed checkpoint starts the following cycle.
+    - Without a checkpoint, continue after the last cycle_id present in the CSV.
+    """
+    checkpoint = store.load()
+    if checkpoint and checkpoint.status == CycleCheckpoint.STATUS_RUNNING:
+        return checkpoint
+    if checkpoint:
+        return CycleCheckpoint(cycle_id=checkpoint.cycle_id + 1)
+    return CycleCheckpoint(cycle_id=last_cycle_id_in_csv(csv_path) + 1)
@@ -0,0 +1,279 @@
+import os
+import math
+import base64
+import hashlib
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+
+def normalize_link(link: str) -> str:
+    """
+    Canonical form of a listing URL used for deduplication.
+    Drops query string/fragment (tracking params), case of scheme/host and trailing slashes.
+    """
+    clean = link.strip().split("?")[0].split("#")[0].rstrip("/")
+    scheme, sep, rest = clean.partition("://")
+    if not sep:
+        return clean
+    host, slash, path = rest.partition("/")
+    return f"{scheme.lower()}://{host.lower()}{slash}{path}"
+
+
+def hash_key(key: str) -> int:
+    """Stable 64-bit hash (blake2b). 0 is reserved as the empty-slot marker."""
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def hash_link(link: str) -> int:
+    return hash_key(normalize_link(link))
+
+
+class HashSet64:
+    """
+    Open-addressing set of 64-bit hashes stored in a flat array('Q').
+    Costs 8 bytes per slot (~16 bytes per entry at the max load factor)
+    instead of a full URL string object per entry in a Python set.
+    """
+
+    MAX_LOAD = 0.5
+    FILE_MAGIC = b"SMHS64v1"
+
+    def __init__(self, capacity: int = 1024):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, h: int) -> bool:
+        slots, mask = self._slots, self._mask
+        i = h & mask
+        while True:
+            current = slots[i]
+            if current == h:
+                return True
+            if current == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, h: int) -> bool:
+        """Inserts a hash. Returns True if it was not present yet."""
+        if (self._count + 1) > len(self._slots) * self.MAX_LOAD:
+            self._grow()
+        slots, mask = self._slots, self._mask
+        i = h & mask
+        while True:
+            current = slots[i]
+            if current == h:
+                return False
+            if current == 0:
+                slots[i] = h
+                self._count += 1
+                return True
+            i = (i + 1) & mask
+
+    def clear(self):
+        self._slots = array("Q", bytes(len(self._slots) * 8))
+        self._count = 0
+
+    def values(self) -> Iterable[int]:
+        return (h for h in self._slots if h)
+
+    def memory_bytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(len(old) * 16))
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for h in old:
+            if h:
+                self.add(h)
+
+    # =========== Serialization =========== #
+
+    def to_bytes(self) -> bytes:
+        packed = array("Q", self.values())
+        return packed.tobytes()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "HashSet64":
+        packed = array("Q")
+        packed.frombytes(raw)
+        hs = cls(capacity=int(len(packed) / cls.MAX_LOAD) + 1)
+        for h in packed:
+            hs.add(h)
+        return hs
+
+    def save(self, path: Path):
+        """Atomic write: MAGIC header + packed little-endian uint64 hashes"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".hashset_", suffix=".tmp", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.FILE_MAGIC)
+                f.write(self.to_bytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "HashSet64":
+        with open(path, "rb") as f:
+            raw = f.read()
+        if not raw.startswith(cls.FILE_MAGIC):
+            raise ValueError(f"{path} is not a HashSet64 file")
+        return cls.from_bytes(raw[len(cls.FILE_MAGIC):])
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter over precomputed 64-bit hashes (double hashing).
+    Used in front of the all-time index: a negative answer proves a listing is new.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        n_bits = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._n_bits = max(n_bits, 64)
+        self._n_hashes = max(1, round(self._n_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self._n_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h: int):
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        n_bits = self._n_bits
+        return [(h1 + i * h2) % n_bits for i in range(self._n_hashes)]
+
+    def add(self, h: int):
+        bits = self._bits
+        for pos in self._positions(h):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, h: int) -> bool:
+        bits = self._bits
+        for pos in self._positions(h):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class ListingDedupIndex:
+    """
+    Two views over hashed listing keys:
+    - cycle: "already collected in this cycle?" (cleared by start_cycle)
+    - all_time: "have we EVER seen this listing?" (persisted to disk)
+    An optional Bloom filter fronts the all-time view for cheap first-seen checks:
+    the exact index is only probed on a possible hit, listings the filter proves
+    new are buffered and merged into it in batches.
+    """
+
+    # New hashes buffered before they are merged into the exact all-time index
+    PENDING_LIMIT = 4096
+
+    def __init__(self, all_time: Optional[HashSet64] = None, use_bloom: bool = True, bloom_capacity: int = 100_000):
+        self.cycle = HashSet64()
+        self.all_time = all_time or HashSet64()
+        self.use_bloom = use_bloom
+        self.bloom = None
+        self._pending = array("Q")
+        # New all-time entries since the last save
+        self.unsaved = 0
+        if use_bloom:
+            self._rebuild_bloom(max(bloom_capacity, len(self.all_time) * 2))
+
+    def _rebuild_bloom(self, capacity: int):
+        self._merge_pending()
+        self.bloom = BloomFilter(capacity=capacity)
+        for h in self.all_time.values():
+            self.bloom.add(h)
+
+    def start_cycle(self):
+        self.cycle.clear()
+
+    def observe(self, key: str) -> Tuple[bool, bool]:
+        """
+        Registers a listing key (normalized link or item id).
+        Returns (duplicate_in_cycle, first_seen_ever).
+        """
+        h = hash_key(key)
+        if not self.cycle.add(h):
+            return True, False
+        return False, self._observe_all_time(h)
+
+    def _observe_all_time(self, h: int) -> bool:
+        if self.bloom is None:
+            return self._count_new(self.all_time.add(h))
+        if self.bloom.might_contain(h):
+            # Possible false positive: confirm against the exact index (and the buffer)
+            if h in self.all_time or h in self._pending:
+                return False
+        self._pending.append(h)
+        self.bloom.add(h)
+        if self.bloom.count > self.bloom.capacity:
+            self._rebuild_bloom(self.bloom.capacity * 2)
+        elif len(self._pending) >= self.PENDING_LIMIT:
+            self._merge_pending()
+        return self._count_new(True)
+
+    def _count_new(self, is_new: bool) -> bool:
+        if is_new:
+            self.unsaved += 1
+        return is_new
+
+    def _merge_pending(self):
+        for h in self._pending:
+            self.all_time.add(h)
+        self._pending = array("Q")
+
+    # =========== Persistence =========== #
+
+    def cycle_state(self) -> str:
+        """Compact (base64) snapshot of the per-cycle view, stored in the checkpoint"""
+        return base64.b64encode(self.cycle.to_bytes()).decode("ascii")
+
+    def restore_cycle_state(self, state):
+        if not state:
+            return
+        if isinstance(state, list):
+            # Legacy checkpoints stored the raw links: same keys as the scraper's observe()
+            from .identifiers import listing_key
+            for link in state:
+                self.cycle.add(hash_key(listing_key(link)))
+            return
+        self.cycle = HashSet64.from_bytes(base64.b64decode(state))
+
+    def save(self, path: Path):
+        self._merge_pending()
+        self.all_time.save(path)
+        self.unsaved = 0
+
+    @classmethod
+    def load(cls, path: Path, use_bloom: bool = True) -> "ListingDedupIndex":
+        """Loads the all-time view; a missing or unreadable file starts empty."""
+        all_time = None
+        if path and Path(path).exists():
+            try:
+                all_time = HashSet64.load(path)
+            except (OSError, ValueError):
+                all_time = None
+        return cls(all_time=all_time, use_bloom=use_bloom)
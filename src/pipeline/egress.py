@@ -0,0 +1,264 @@
+import time
+import random
+import threading
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# ==============================================================================
+# EGRESS POOL (SCRAPER_EGRESS_ROUTES)
+# ==============================================================================
+# Every exit (direct, HTTP/SOCKS proxy or local source address) gets its own
+# token-bucket rate budget, captcha/ban history and health score. Requests go
+# to the healthiest route that has budget left, so total throughput grows with
+# the number of exits while each one stays under what the target tolerates.
+
+
+class TokenBucket:
+    """Classic token bucket: `rate_per_minute` refill, up to `burst` tokens banked"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate_per_second)
+        self._last = now
+
+    def seconds_until_available(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate_per_second
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class EgressRoute:
+    """
+    One exit. Health is an EWMA of request outcomes (1.0 = always fine);
+    captchas and bans (403/429) also put the route in an exponential cooldown.
+    """
+
+    HEALTH_ALPHA = 0.2
+    BAN_STATUS_CODES = (403, 429)
+
+    def __init__(self, name: str, proxy_url: Optional[str] = None, source_address: Optional[str] = None,
+                 rate_per_minute: float = 15, burst: int = 1, captcha_cooldown: float = 900,
+                 ban_cooldown: float = 120, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.proxy_url = proxy_url
+        self.source_address = source_address
+        self.bucket = TokenBucket(rate_per_minute, burst=burst, clock=clock)
+        self.captcha_cooldown = captcha_cooldown
+        self.ban_cooldown = ban_cooldown
+        self._clock = clock
+        self._session = None
+
+        self.health = 1.0
+        self.cooldown_until = 0.0
+        self.consecutive_blocks = 0
+        self.requests = 0
+        self.failures = 0
+        self.captchas = 0
+        self.bans = 0
+
+    # =========== Scheduling =========== #
+
+    def cooldown_remaining(self) -> float:
+        return max(0.0, self.cooldown_until - self._clock())
+
+    def seconds_until_ready(self) -> float:
+        return max(self.cooldown_remaining(), self.bucket.seconds_until_available())
+
+    # =========== Outcome bookkeeping =========== #
+
+    def _score(self, value: float):
+        self.health = self.HEALTH_ALPHA * value + (1 - self.HEALTH_ALPHA) * self.health
+
+    def _block(self, base_seconds: float):
+        self.consecutive_blocks += 1
+        self.cooldown_until = self._clock() + base_seconds * 2 ** (self.consecutive_blocks - 1)
+
+    def record(self, status_code: Optional[int] = None, captcha: bool = False, error: bool = False) -> str:
+        """Updates health/cooldown and returns the outcome label ("ok", "captcha", "ban", "error")"""
+        self.requests += 1
+        if captcha:
+            self.captchas += 1
+            self._score(0.0)
+            self._block(self.captcha_cooldown)
+            return "captcha"
+        if status_code in self.BAN_STATUS_CODES:
+            self.bans += 1
+            self._score(0.0)
+            self._block(self.ban_cooldown)
+            return "ban"
+        if error or status_code is None or status_code >= 500:
+            self.failures += 1
+            self._score(0.0)
+            return "error"
+        self.consecutive_blocks = 0
+        self._score(1.0)
+        return "ok"
+
+    # =========== HTTP =========== #
+
+    @property
+    def session(self):
+        """requests.Session bound to this exit (created on first use)"""
+        if self._session is None:
+            import requests
+            session = requests.Session()
+            if self.proxy_url:
+                session.proxies = {"http": self.proxy_url, "https": self.proxy_url}
+            if self.source_address:
+                adapter = _source_address_adapter(self.source_address)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def stats(self) -> dict:
+        return {
+            "route": self.name,
+            "health": round(self.health, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "captchas": self.captchas,
+            "bans": self.bans,
+            "cooldown_seconds": round(self.cooldown_remaining(), 1),
+        }
+
+    def __repr__(self):
+        return f"<EgressRoute(name='{self.name}', health={self.health:.2f})>"
+
+
+def _source_address_adapter(source_address: str):
+    """HTTPAdapter whose connections bind to a local IP (multi-IP VPS)"""
+    from requests.adapters import HTTPAdapter
+
+    class SourceAddressAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["source_address"] = (source_address, 0)
+            super().init_poolmanager(*args, **kwargs)
+
+        def proxy_manager_for(self, *args, **kwargs):
+            kwargs["source_address"] = (source_address, 0)
+            return super().proxy_manager_for(*args, **kwargs)
+
+    return SourceAddressAdapter()
+
+
+def _socks_available() -> bool:
+    # requests only speaks SOCKS through PySocks (requests[socks])
+    import importlib.util
+    return importlib.util.find_spec("socks") is not None
+
+
+def parse_route_spec(spec: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    "direct"                   -> ("direct", None, None)
+    "http://user:pw@h:3128"    -> ("h:3128", "http://user:pw@h:3128", None)
+    "source:10.0.0.5"          -> ("source:10.0.0.5", None, "10.0.0.5")
+    Returns (name, proxy_url, source_address); credentials never end up in the name.
+    """
+    spec = spec.strip()
+    if spec == "direct":
+        return "direct", None, None
+    if spec.startswith("source:"):
+        return spec, None, spec[len("source:"):]
+    parts = urlsplit(spec)
+    if parts.scheme in ("socks5", "socks5h") and not _socks_available():
+        # Fail when the pool is configured, not on the first request through the route
+        raise ValueError(f"Egress route '{parts.hostname}' is a SOCKS proxy but PySocks is not installed "
+                         f"(pip install 'requests[socks]')")
+    if parts.scheme in ("http", "https", "socks5", "socks5h") and parts.hostname:
+        return f"{parts.hostname}:{parts.port or ''}".rstrip(":"), spec, None
+    raise ValueError(f"Invalid egress route '{spec}' (expected direct, source:<ip> or a proxy URL)")
+
+
+class EgressPool:
+    """
+    Routes each request to the healthiest exit with budget left.
+    acquire() blocks (via `sleep`) until some route has a token and is not
+    cooling down, so the pool also replaces the fixed politeness sleep.
+    """
+
+    def __init__(self, routes: List[EgressRoute], jitter_seconds: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        if not routes:
+            raise ValueError("EgressPool needs at least one route")
+        names = [r.name for r in routes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate egress route names: {names}")
+        self.routes = routes
+        self.jitter_seconds = jitter_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> Optional["EgressPool"]:
+        """Pool described by SCRAPER_EGRESS_ROUTES, or None (legacy single-IP pacing)"""
+        from src.monitoring.settings import MonitoringConfig
+        specs = [s for s in MonitoringConfig.EGRESS_ROUTES.split(",") if s.strip()]
+        if not specs:
+            return None
+        routes = []
+        for spec in specs:
+            name, proxy_url, source_address = parse_route_spec(spec)
+            routes.append(EgressRoute(
+                name, proxy_url=proxy_url, source_address=source_address,
+                rate_per_minute=MonitoringConfig.EGRESS_RATE_PER_MINUTE,
+                burst=MonitoringConfig.EGRESS_BURST,
+                captcha_cooldown=MonitoringConfig.EGRESS_CAPTCHA_COOLDOWN,
+            ))
+        return cls(routes, jitter_seconds=MonitoringConfig.EGRESS_JITTER_SECONDS)
+
+    def _try_acquire(self) -> Tuple[Optional[EgressRoute], float]:
+        with self._lock:
+            ready = [r for r in self.routes if r.seconds_until_ready() == 0]
+            if ready:
+                # Healthiest first; least used breaks ties so equal routes share the load
+                route = max(ready, key=lambda r: (r.health, -r.requests))
+                route.bucket.take()
+                return route, 0.0
+            return None, min(r.seconds_until_ready() for r in self.routes)
+
+    def acquire(self) -> Tuple[EgressRoute, float]:
+        """Returns (route, seconds waited)"""
+        waited = 0.0
+        while True:
+            route, wait = self._try_acquire()
+            if route is not None:
+                break
+            self._sleep(wait)
+            waited += wait
+        if self.jitter_seconds:
+            jitter = self._rng.uniform(0, self.jitter_seconds)
+            self._sleep(jitter)
+            waited += jitter
+        return route, waited
+
+    def has_spare_budget(self) -> bool:
+        """True if some route could serve a request right now without waiting"""
+        with self._lock:
+            return any(r.seconds_until_ready() == 0 for r in self.routes)
+
+    def report(self, route: EgressRoute, status_code: Optional[int] = None, captcha: bool = False,
+               error: bool = False) -> str:
+        with self._lock:
+            return route.record(status_code=status_code, captcha=captcha, error=error)
+
+    def stats(self) -> List[dict]:
+        return [r.stats() for r in self.routes]
@@ -0,0 +1,208 @@
+import re
+import json
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# ==============================================================================
+# PRODUCT DETAIL ENRICHMENT (TTL CACHE KEYED BY SKU)
+# ==============================================================================
+# Listing cards carry only a thin slice of each product; specs, seller
+# reputation and stock live on the product page. Pages are fetched only for
+# SKUs that were never enriched or have a field past its TTL, new SKUs first,
+# and at most `quota` per cycle. The fetch callable is provided by the scraper
+# so product pages go through the same politeness sleep / egress budget.
+
+# Field -> default TTL. Each field has its own <field>_fetched_at column.
+DEFAULT_TTLS: Dict[str, timedelta] = {
+    "specs": timedelta(days=30),
+    "seller_reputation": timedelta(days=7),
+    "stock_available": timedelta(hours=24),
+}
+
+STOCK_PATTERN = re.compile(r"(\d[\d.]*)\s+disponíve", re.IGNORECASE)
+LOAD_CHUNK_SIZE = 1000
+
+
+class EnrichmentBlocked(Exception):
+    """The site answered a product page with a captcha: stop enriching this cycle"""
+
+
+# =========== Parsing (offline, no network) =========== #
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def parse_specs(soup) -> Optional[Dict[str, str]]:
+    """Specs table rows (<th>name</th><td>value</td>) as a dict, None if the page has none"""
+    specs = {}
+    for row in soup.select("tr"):
+        name, value = row.find("th"), row.find("td")
+        if name and value:
+            key = _clean(name.get_text())
+            if key:
+                specs[key] = _clean(value.get_text())
+    return specs or None
+
+
+def parse_seller_reputation(soup) -> Optional[str]:
+    tag = soup.select_one(".ui-seller-data-status__title, .ui-pdp-seller__status-title")
+    return _clean(tag.get_text()) if tag else None
+
+
+def parse_stock(soup) -> Optional[int]:
+    """"(+50 disponíveis)" -> 50, "Último disponível!" -> 1"""
+    tag = soup.select_one(".ui-pdp-buybox__quantity__available, .ui-pdp-stock-information__title")
+    if not tag:
+        return None
+    text = tag.get_text()
+    match = STOCK_PATTERN.search(text)
+    if match:
+        return int(match.group(1).replace(".", ""))
+    return 1 if "último" in text.lower() else None
+
+
+def parse_product_page(page) -> Dict[str, Any]:
+    """Detail fields from a product page (HTML string or BeautifulSoup)"""
+    if isinstance(page, (str, bytes)):
+        from bs4 import BeautifulSoup
+        page = BeautifulSoup(page, "html.parser")
+    return {
+        "specs": parse_specs(page),
+        "seller_reputation": parse_seller_reputation(page),
+        "stock_available": parse_stock(page),
+    }
+
+
+# =========== Staleness =========== #
+
+def stale_fields(record: Optional[Dict[str, Any]], now: datetime,
+                 ttls: Dict[str, timedelta] = DEFAULT_TTLS) -> List[str]:
+    """
+    Fields that need a fetch: all of them for an unknown SKU, else those whose
+    fetched_at is missing or older than their TTL. A failed fetch is not
+    retried before the shortest TTL has passed (dead pages do not eat the quota).
+    """
+    if record is None:
+        return list(ttls)
+    last_attempt = record.get("last_attempt_at")
+    if record.get("last_status") not in (None, "ok") and last_attempt and now - last_attempt < min(ttls.values()):
+        return []
+    stale = []
+    for field, ttl in ttls.items():
+        fetched_at = record.get(f"{field}_fetched_at")
+        if fetched_at is None or now - fetched_at >= ttl:
+            stale.append(field)
+    return stale
+
+
+def select_due(candidates: Iterable[Tuple[int, str]], records: Dict[int, Dict[str, Any]], now: datetime,
+               quota: int, ttls: Dict[str, timedelta] = DEFAULT_TTLS) -> List[Tuple[int, str]]:
+    """Up to `quota` (item_id, link) pairs to fetch: new SKUs first, then the stalest cached ones"""
+    due = []
+    for item_id, link in candidates:
+        record = records.get(item_id)
+        if not stale_fields(record, now, ttls):
+            continue
+        if record is None:
+            oldest = datetime.min
+        else:
+            oldest = min((record.get(f"{f}_fetched_at") or datetime.min) for f in ttls)
+        due.append((record is not None, oldest, item_id, link))
+    return [(item_id, link) for _, _, item_id, link in heapq.nsmallest(quota, due)]
+
+
+# =========== Cache (product_enrichment side table) =========== #
+
+class EnrichmentCache:
+    """product_enrichment rows as plain dicts (SQLAlchemy Core, so sqlite works in tests)"""
+
+    def __init__(self, engine):
+        from src.database.models import ProductEnrichment
+        self.engine = engine
+        self.table = ProductEnrichment.__table__
+
+    def ensure_table(self):
+        self.table.create(self.engine, checkfirst=True)
+
+    def load(self, item_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        from sqlalchemy import select
+        item_ids = list(item_ids)
+        records = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(item_ids), LOAD_CHUNK_SIZE):
+                chunk = item_ids[start:start + LOAD_CHUNK_SIZE]
+                for row in connection.execute(select(self.table).where(self.table.c.item_id.in_(chunk))):
+                    records[row.item_id] = dict(row._mapping)
+        return records
+
+    def store(self, item_id: int, link: str, now: datetime, details: Optional[Dict[str, Any]] = None,
+              status: str = "ok"):
+        """Writes a fetch result: with `details` every field and its fetched_at, else only the attempt"""
+        values = {"sku_link": link, "last_attempt_at": now, "last_status": status}
+        if details is not None:
+            for field, value in details.items():
+                if field == "specs" and value is not None:
+                    value = json.dumps(value, ensure_ascii=False)
+                values[field] = value
+                values[f"{field}_fetched_at"] = now
+        with self.engine.begin() as connection:
+            updated = connection.execute(
+                self.table.update().where(self.table.c.item_id == item_id).values(**values)
+            ).rowcount
+            if not updated:
+                connection.execute(self.table.insert().values(item_id=item_id, **values))
+
+
+# =========== Stage =========== #
+
+class EnrichmentStage:
+    """
+    Runs once per cycle over the SKUs the cycle wrote.
+    `fetch(link)` returns the parsed page (or HTML), None for a non-200 answer,
+    and raises EnrichmentBlocked on a captcha.
+    """
+
+    def __init__(self, cache: EnrichmentCache, fetch: Callable[[str], Any], quota: int = 200,
+                 ttls: Optional[Dict[str, timedelta]] = None, clock: Callable[[], datetime] = datetime.now):
+        self.cache = cache
+        self.fetch = fetch
+        self.quota = quota
+        self.ttls = ttls or DEFAULT_TTLS
+        self._clock = clock
+
+    @classmethod
+    def from_config(cls, cache: EnrichmentCache, fetch: Callable[[str], Any]) -> "EnrichmentStage":
+        from src.monitoring.settings import MonitoringConfig
+        ttls = {
+            "specs": timedelta(hours=MonitoringConfig.ENRICHMENT_TTL_SPECS_HOURS),
+            "seller_reputation": timedelta(hours=MonitoringConfig.ENRICHMENT_TTL_SELLER_HOURS),
+            "stock_available": timedelta(hours=MonitoringConfig.ENRICHMENT_TTL_STOCK_HOURS),
+        }
+        return cls(cache, fetch, quota=MonitoringConfig.ENRICHMENT_QUOTA, ttls=ttls)
+
+    def run(self, candidates: Dict[int, str]) -> Dict[str, Any]:
+        """Fetches the due SKUs among `candidates` ({item_id: link}) and returns a summary"""
+        records = self.cache.load(candidates)
+        due = select_due(candidates.items(), records, self._clock(), self.quota, self.ttls)
+        summary = {"candidates": len(candidates), "due": len(due), "fetched": 0, "failed": 0, "blocked": False}
+
+        for item_id, link in due:
+            try:
+                page = self.fetch(link)
+            except EnrichmentBlocked:
+                summary["blocked"] = True
+                break
+            except Exception as e:
+                self.cache.store(item_id, link, self._clock(), status="error")
+                summary["failed"] += 1
+                summary.setdefault("last_error", f"{type(e).__name__}: {e}")
+                continue
+            if page is None:
+                self.cache.store(item_id, link, self._clock(), status="http_error")
+                summary["failed"] += 1
+                continue
+            self.cache.store(item_id, link, self._clock(), details=parse_product_page(page))
+            summary["fetched"] += 1
+        return summary
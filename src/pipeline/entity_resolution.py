@@ -0,0 +1,197 @@
+import re
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.pipeline.attributes import COLOR_PATTERN, extract_attributes_records
+
+# ==============================================================================
+# CANONICAL PRODUCTS (MinHash / LSH over normalized title tokens)
+# ==============================================================================
+# The same phone is listed under many sku_links with seller-specific titles.
+# Each listing gets a MinHash signature of its normalized title tokens; LSH
+# banding turns "similar signatures" into exact bucket lookups, so a new
+# listing is compared only with the clusters sharing a band with it instead of
+# the whole catalogue. Buckets are also blocked by the parsed model family, so
+# "A15 128GB" never even meets "A25 128GB". A candidate is accepted when the
+# estimated Jaccard similarity reaches MIN_SIMILARITY and its parsed attributes
+# (storage, RAM, 5G, refurbished) do not conflict. Colour is ignored on purpose:
+# colours of one model are the same product for price comparisons.
+# A cluster is identified by the product_id of the listing that founded it
+# (dim_products.canonical_product_id).
+
+MINHASH_PERMUTATIONS = 128
+# 32 bands x 4 rows: pairs become candidates from a Jaccard of ~(1/32)**(1/4) = 0.42
+LSH_BANDS = 32
+MIN_SIMILARITY = 0.5
+
+MERSENNE_PRIME = (1 << 31) - 1 # Keeps a * hash + b inside uint64
+HASH_SEED = 20260201 # Fixed: signatures must be reproducible across runs
+
+# Words every listing shares (or marketing noise) carry no identity
+STOPWORDS = {
+    "smartphone", "celular", "samsung", "galaxy", "telefone", "aparelho", "dual", "sim", "chip", "chips",
+    "tela", "de", "da", "do", "com", "e", "cor", "versao", "nacional", "novo", "nova", "lacrado", "original",
+    "garantia", "nf", "nota", "fiscal", "memoria", "interna", "camera", "bateria", "cores", "gb", "ram",
+    "android", "octa", "core", "pronta", "entrega", "envio", "imediato", "claro", "escuro", # Colour shades
+}
+UNIT_PATTERN = re.compile(r"(\d+)\s*(gb|tb)\b")
+RAM_TOKEN_PATTERN = re.compile(r"(\d+gb)\s*(?:de\s+)?(?:memoria\s+)?ram\b|\bram\s*(?:de\s+)?(\d+gb)")
+SCREEN_PATTERN = re.compile(r"\d+[.,]\d+\s*(?:\"|''|pol(?:egadas)?\b)?")
+TOKEN_PATTERN = re.compile(r"[a-z0-9+]+")
+
+# Attributes that must agree (when both listings have them) for a merge;
+# model_family is enforced by the bucket blocking already
+IDENTITY_ATTRIBUTES = ("storage_gb", "ram_gb", "is_5g", "is_refurbished")
+
+RESOLUTION_COLUMNS_SQL = "SELECT product_id, title FROM dim_products"
+
+
+def title_tokens(title: str) -> Set[str]:
+    """
+    Identity-bearing tokens of a title:
+    "Samsung Galaxy A06 Dual SIM 128 GB branco 4 GB RAM" -> {"a06", "128gb", "ram4gb"}
+    """
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode("ascii").lower()
+    text = UNIT_PATTERN.sub(r"\1\2", text)
+    # RAM size becomes its own token, so it never reads as a storage size
+    text = RAM_TOKEN_PATTERN.sub(lambda m: f" ram{m.group(1) or m.group(2)} ", text)
+    text = SCREEN_PATTERN.sub(" ", text)
+    text = COLOR_PATTERN.sub(" ", text)
+    return {token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS}
+
+
+class MinHasher:
+    """Vectorized MinHash: one universal hash (a * x + b mod p) per permutation"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = HASH_SEED):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) % MERSENNE_PRIME for t in tokens), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint32)
+        return ((hashes[:, None] * self.a[None, :] + self.b[None, :]) % MERSENNE_PRIME).min(axis=0).astype(np.uint32)
+
+
+def _compatible(left: Dict[str, Any], right: Dict[str, Any]) -> bool:
+    for key in IDENTITY_ATTRIBUTES:
+        a, b = left.get(key), right.get(key)
+        if a is not None and b is not None and a != b:
+            return False
+    return True
+
+
+class CanonicalIndex:
+    """
+    LSH index of cluster representatives (the founding listing of each
+    cluster, so clusters do not drift by chaining similar-looking members).
+    """
+
+    def __init__(self, hasher: Optional[MinHasher] = None, bands: int = LSH_BANDS,
+                 min_similarity: float = MIN_SIMILARITY):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError(f"{self.hasher.num_perm} permutations cannot be split in {bands} bands")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.min_similarity = min_similarity
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._attributes: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray, attributes: Dict[str, Any]) -> List[bytes]:
+        block = (attributes.get("model_family") or "").encode("utf-8") + b"|"
+        return [block + signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, canonical_id: int, signature: np.ndarray, attributes: Dict[str, Any]):
+        self._signatures[canonical_id] = signature
+        self._attributes[canonical_id] = attributes
+        for bucket, key in zip(self._buckets, self._band_keys(signature, attributes)):
+            bucket.setdefault(key, []).append(canonical_id)
+
+    def match(self, signature: np.ndarray, attributes: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """Best compatible cluster at or above min_similarity, from the LSH candidates only"""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature, attributes)):
+            candidates.update(bucket.get(key, ()))
+        candidates = sorted(c for c in candidates if _compatible(self._attributes[c], attributes))
+        if not candidates:
+            return None
+        similarities = (np.stack([self._signatures[c] for c in candidates]) == signature).mean(axis=1)
+        best = int(np.argmax(similarities)) # Ties go to the oldest cluster (lowest id)
+        if similarities[best] < self.min_similarity:
+            return None
+        return candidates[best], float(similarities[best])
+
+    def assign(self, product_id: int, title: str, attributes: Dict[str, Any]) -> Tuple[int, bool]:
+        """(canonical_id, founded_new_cluster) for one listing"""
+        signature = self.hasher.signature(title_tokens(title))
+        found = self.match(signature, attributes)
+        if found is not None:
+            return found[0], False
+        self.add(product_id, signature, attributes)
+        return product_id, True
+
+
+# =========== Warehouse stage =========== #
+
+def resolve_canonical_products(engine, batch_size: int = 5000, rebuild: bool = False,
+                               index: Optional[CanonicalIndex] = None) -> Dict[str, Any]:
+    """
+    Assigns dim_products.canonical_product_id to every product that has none.
+    The index is loaded from the existing representatives (canonical_product_id
+    = product_id), then new products are resolved in keyset-paginated batches.
+    rebuild=True clears every assignment first and clusters the whole table.
+    """
+    from sqlalchemy import text
+
+    started = time.perf_counter()
+    index = index or CanonicalIndex()
+    assigned = founded = 0
+
+    with engine.begin() as connection:
+        if rebuild:
+            connection.execute(text("UPDATE dim_products SET canonical_product_id = NULL"))
+        representatives = connection.execute(text(
+            f"{RESOLUTION_COLUMNS_SQL} WHERE canonical_product_id = product_id ORDER BY product_id"
+        )).all()
+    for (product_id, title), attributes in zip(representatives, extract_attributes_records(t for _, t in representatives)):
+        index.add(product_id, index.hasher.signature(title_tokens(title)), attributes)
+
+    update = text("UPDATE dim_products SET canonical_product_id = :canonical_id WHERE product_id = :product_id")
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                text(f"{RESOLUTION_COLUMNS_SQL} WHERE canonical_product_id IS NULL AND product_id > :last_id "
+                     "ORDER BY product_id LIMIT :limit"),
+                {"last_id": last_id, "limit": batch_size},
+            ).all()
+            if not rows:
+                break
+            mappings = []
+            for (product_id, title), attributes in zip(rows, extract_attributes_records(t for _, t in rows)):
+                canonical_id, is_new = index.assign(product_id, title, attributes)
+                founded += is_new
+                mappings.append({"canonical_id": canonical_id, "product_id": product_id})
+            connection.execute(update, mappings)
+        assigned += len(rows)
+        last_id = rows[-1][0]
+
+    return {
+        "assigned": assigned,
+        "new_clusters": founded,
+        "merged": assigned - founded,
+        "clusters": len(index),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
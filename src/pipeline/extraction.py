@@ -0,0 +1,132 @@
+from typing import Dict, Tuple, List, Any
+
+# ==============================================================================
+# LISTING PAGE EXTRACTION
+# ==============================================================================
+# Pure functions over BeautifulSoup nodes. No bs4 import needed here: the
+# caller parses the page and hands over the tags.
+
+
+def find_cards(soup) -> Tuple[List[Any], str]:
+    """Hybrid Selector Strategy (Grid vs List Layouts). Returns (cards, layout_type)."""
+    cards = soup.find_all("div", class_="poly-card__content")
+    layout_type = "grid"
+    
+    if not cards:
+        cards = soup.find_all("li", class_="ui-search-layout__item")
+        layout_type = "list"
+    return cards, layout_type
+
+
+def extract_link(card) -> str:
+    """1. Link (Primary Key): href without query string/fragment, "N/A" when missing"""
+    link_tag = card.find("a", class_="poly-component__title") or card.find("a", class_="ui-search-link") or card.find("a")
+    link_raw = link_tag.get("href", "") if link_tag else "N/A"
+    return link_raw.split("?")[0].split("#")[0]
+
+
+def parse_card_fields(card) -> Dict[str, str]:
+    """
+    DATA EXTRACTION of every offer attribute except the link.
+    Values keep the raw CSV conventions ("Yes"/"No", "N/A", "1.329.46").
+    """
+    # 2. Title
+    title_tag = card.find("h3", class_="poly-component__title-wrapper") or card.find("h2", class_="ui-search-item__title")
+    title_text = title_tag.get_text(strip=True) if title_tag else "N/A"
+    
+    # 3. Seller 
+    seller_tag = card.find("span", class_="poly-component__seller") or card.find("span", class_="poly-component__brand") or card.find("p", class_="ui-search-official-store-label")
+    seller_text = seller_tag.get_text(strip=True) if seller_tag else "N/A"
+    
+    # 4. Price 
+    price_tag = card.find("span", class_="andes-money-amount__fraction")    
+    cents_tag = card.find("span", class_="andes-money-amount__cents")
+    
+    price_value = price_tag.get_text(strip=True) if price_tag else "0"
+    # Correction: cents_tag em vez de cents_text
+    cents_value = cents_tag.get_text(strip=True) if cents_tag else "00"
+    price_full = f"{price_value}.{cents_value}"
+    
+    # 5. Discount 
+    discount_tag = card.find("span", class_="andes-money-amount__discount")
+    discount_text = discount_tag.get_text(strip=True).split(" ")[0] if discount_tag else "N/A"
+    
+    # 6. Installments & Interest 
+    installment_tag = card.find("span", class_="poly-price__installments") or card.find("span", class_="ui-search-item__group__element ui-search-installments") 
+    installment_qty = "N/A"
+    interest_free = "N/A"
+    
+    if installment_tag:
+        # Correction: separator=" " (evita texto colado) e strip=True (typo 'stripe')
+        full_installments_text = installment_tag.get_text(separator=" ", strip=True)
+    
+        interest_free = "Sem Juros" if "sem juros" in full_installments_text.lower() else "Com Juros" 
+    
+        if "x" in full_installments_text.lower():
+            # Split by "x" and gets the last word of the first part
+            installment_qty = full_installments_text.lower().split("x")[0].split()[-1]
+        else:
+            installment_qty = "1"
+    
+    # 7. Total Sold
+    sold_text = "N/A"    
+    for span in card.find_all("span"):
+        if "vendidos" in span.get_text().lower():
+            sold_text = span.get_text(strip=True)
+            break
+    
+    
+    # 8. Delivery & Shipping
+    
+    # 8.1 Free Delivery
+    free_delivery = "No"
+    shipping_tag = card.find("div", class_="poly-component-shipping") or card.find("p", class_="ui-search-item__shipping")
+    if shipping_tag:
+        if "grátis" in shipping_tag.get_text(strip=True).lower():
+            free_delivery = "Yes"
+    
+    # (8.2 & 8.3 & 8.4) === Delivered === (Today, Tomorrow, or Days of Week)
+    # unified variable to makes the analysis easier leater on: "shipping_arrival_estimation"
+    arrival_estimation = "Standard"
+    
+    # Today Check
+    if card.find("span", class_="poly-shipping--same_day"):
+        arrival_estimation = "Today"
+    # Tomorrow Check
+    elif card.find("span", class_="poly-shipping--next_day"):
+        arrival_estimation = "Tomorrow"
+    else:
+        # Day of Week Check 
+        # The "Mercardo Livre" use classes as poly-shipping--monday, poly-shipping--tuesday, etc.
+        week_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+        for day in week_days:
+            day_tag = card.find("span", class_=f"poly-shipping--{day}")
+            if day_tag:
+                # Get text of which day in a week
+                arrival_text = day_tag.get_text(strip=True)
+                arrival_estimation = f"DayWeek {day} ({arrival_text})"
+                break
+    
+    # 9. Highlights (Checking Text Content)
+    # The class "poly-component__highlight" is generic. We must check the text inside.
+    highlight_tag = card.find("span", class_="poly-component__highlight")
+    highlight_text = highlight_tag.get_text(strip=True).upper() if highlight_tag else ""
+    
+    is_great_deal = "Yes" if "IMPERDÍVEL" in highlight_text or "OFERTA" in highlight_text else "No"
+    is_bestseller = "Yes" if "MAIS VENDIDO" in highlight_text else "No"
+    is_recommended = "Yes" if "RECOMENDADO" in highlight_text else "No"
+        
+    return {
+        "title" : title_text,
+        "seller": seller_text,
+        "price": price_full,
+        "discount": discount_text,
+        "installments": installment_qty,
+        "interest_free": interest_free,
+        "total_sold_raw": sold_text,
+        "free_delivery": free_delivery,
+        "arrival_estimation": arrival_estimation,
+        "is_great_deal": is_great_deal,
+        "is_bestseller": is_bestseller,
+        "is_recommended": is_recommended,
+    }
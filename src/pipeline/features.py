@@ -0,0 +1,212 @@
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# FORECASTING FEATURE STORE (data/processed/features)
+# ==============================================================================
+# Per-product window features (lags, rolling mean/std, days since the last
+# price change) kept as append-only parquet parts. Each update only reads the
+# newly ingested cycles plus a small per-product tail of the previous ones
+# (state_<cycle>.parquet), so generation time grows with the new data, not the
+# history. manifest.json is the commit point: parts and state files it does not
+# list are ignored, so a crash mid-update leaves the previous version intact.
+
+# Window sizes are in observations (one per cycle, ~4 per day with 6h cycles)
+LAGS: Tuple[int, ...] = (1, 4, 28)
+ROLLING_WINDOWS: Tuple[int, ...] = (4, 28)
+
+# Rows of history a product needs to extend its windows exactly
+TAIL_SIZE = max(max(LAGS), max(ROLLING_WINDOWS) - 1)
+
+# Window continuation file of stores written before state_<cycle>.parquet
+LEGACY_STATE = "state.parquet"
+
+OBSERVATION_COLUMNS = ["product_id", "cycle_id", "observed_at", "price"]
+FEATURE_COLUMNS = (
+    [f"price_lag_{lag}" for lag in LAGS]
+    + [f"price_mean_{w}" for w in ROLLING_WINDOWS]
+    + [f"price_std_{w}" for w in ROLLING_WINDOWS]
+    + ["days_since_change"]
+)
+
+# One observation per (product, cycle): the best (lowest) valid offer price
+OBSERVATIONS_SQL = """
+    SELECT product_id, cycle_id, MAX(extraction_date) AS observed_at, MIN(price) AS price
+    FROM fact_offers
+    WHERE cycle_id > %(after_cycle_id)s AND price > 0
+    GROUP BY product_id, cycle_id
+"""
+
+
+def load_observations(engine, after_cycle_id: int = 0) -> pd.DataFrame:
+    """Per-(product, cycle) prices of the cycles after `after_cycle_id` (only new data is read)"""
+    return pd.read_sql(OBSERVATIONS_SQL, engine, params={"after_cycle_id": int(after_cycle_id)},
+                       parse_dates=["observed_at"])
+
+
+def compute_features(observations: pd.DataFrame,
+                     tail: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Features for `observations`, continuing each product's windows from `tail`
+    (the last TAIL_SIZE rows per product of a previous run, with their change_at).
+    Returns (features of the new rows only, new tail). Vectorized per group.
+    """
+    new = observations[OBSERVATION_COLUMNS].copy()
+    new["observed_at"] = pd.to_datetime(new["observed_at"])
+    new["change_at"] = pd.NaT
+    new["_is_new"] = True
+    if tail is not None and len(tail):
+        old = tail[OBSERVATION_COLUMNS + ["change_at"]].copy()
+        old["_is_new"] = False
+        frame = pd.concat([old, new], ignore_index=True)
+    else:
+        frame = new
+    frame = frame.sort_values(["product_id", "observed_at", "cycle_id"], kind="mergesort", ignore_index=True)
+    prices = frame.groupby("product_id", sort=False)["price"]
+
+    for lag in LAGS:
+        frame[f"price_lag_{lag}"] = prices.shift(lag)
+    for window in ROLLING_WINDOWS:
+        rolling = prices.rolling(window, min_periods=1)
+        frame[f"price_mean_{window}"] = rolling.mean().reset_index(level=0, drop=True)
+        frame[f"price_std_{window}"] = rolling.std().reset_index(level=0, drop=True)
+
+    # Price changes of the new rows; tail rows keep the change_at computed back then
+    previous = frame["price_lag_1"]
+    changed = frame["_is_new"] & (previous.isna() | (frame["price"] != previous))
+    frame["change_at"] = frame["change_at"].mask(changed, frame["observed_at"])
+    frame["change_at"] = frame.groupby("product_id", sort=False)["change_at"].ffill()
+    frame["days_since_change"] = (frame["observed_at"] - frame["change_at"]) / np.timedelta64(1, "D")
+
+    features = frame.loc[frame["_is_new"], OBSERVATION_COLUMNS + FEATURE_COLUMNS].reset_index(drop=True)
+    new_tail = (
+        frame.groupby("product_id", sort=False).tail(TAIL_SIZE)[OBSERVATION_COLUMNS + ["change_at"]]
+        .reset_index(drop=True)
+    )
+    return features, new_tail
+
+
+class FeatureStore:
+    """
+    Parquet feature store under `root`:
+    - parts/features_<first>_<last>.parquet: feature rows of the cycles ingested by one update
+    - state_<last>.parquet: last TAIL_SIZE observations per product (window continuation)
+    - manifest.json: last ingested cycle, the committed parts and the current state file
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+        self.parts_dir = os.path.join(self.root, "parts")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+
+    # =========== Manifest / state =========== #
+
+    def manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"last_cycle_id": 0, "parts": [], "state": None, "updated_at": None}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def last_cycle_id(self) -> int:
+        return self.manifest()["last_cycle_id"]
+
+    def _state_path(self, manifest: Dict) -> Optional[str]:
+        # Stores written before the manifest named its state used a fixed state.parquet
+        name = manifest.get("state", LEGACY_STATE if manifest["parts"] else None)
+        return os.path.join(self.root, name) if name else None
+
+    def _load_tail(self, manifest: Dict) -> Optional[pd.DataFrame]:
+        path = self._state_path(manifest)
+        return pd.read_parquet(path) if path and os.path.exists(path) else None
+
+    def _remove_state(self, manifest: Dict):
+        path = self._state_path(manifest)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def _write_parquet(frame: pd.DataFrame, path: str):
+        tmp_path = f"{path}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _commit(self, manifest: Dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    # =========== Writes =========== #
+
+    def update(self, observations: pd.DataFrame) -> int:
+        """
+        Appends the features of cycles newer than the last ingested one.
+        Returns the number of feature rows written (0 if nothing new).
+        """
+        manifest = self.manifest()
+        observations = observations[observations["cycle_id"] > manifest["last_cycle_id"]]
+        if observations.empty:
+            return 0
+        features, tail = compute_features(observations, self._load_tail(manifest))
+
+        first_cycle, last_cycle = int(observations["cycle_id"].min()), int(observations["cycle_id"].max())
+        part_name = f"features_{first_cycle:07d}_{last_cycle:07d}.parquet"
+        state_name = f"state_{last_cycle:07d}.parquet"
+        os.makedirs(self.parts_dir, exist_ok=True)
+        self._write_parquet(features, os.path.join(self.parts_dir, part_name))
+        self._write_parquet(tail, os.path.join(self.root, state_name))
+
+        previous = dict(manifest)
+        manifest["parts"] = manifest["parts"] + [part_name]
+        manifest["state"] = state_name
+        manifest["last_cycle_id"] = last_cycle
+        manifest["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._commit(manifest)
+        # The old state goes only once the manifest no longer points to it
+        self._remove_state(previous)
+        return len(features)
+
+    def rebuild(self, observations: pd.DataFrame) -> int:
+        """Full recompute (backfills of already ingested cycles, window changes)"""
+        for name in self.manifest()["parts"]:
+            path = os.path.join(self.parts_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        manifest = self.manifest()
+        self._commit({"last_cycle_id": 0, "parts": [], "state": None, "updated_at": None})
+        self._remove_state(manifest)
+        return self.update(observations)
+
+    # =========== Reads =========== #
+
+    def read_features(self, product_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        parts = [os.path.join(self.parts_dir, name) for name in self.manifest()["parts"]]
+        if not parts:
+            return pd.DataFrame(columns=OBSERVATION_COLUMNS + FEATURE_COLUMNS)
+        filters = [("product_id", "in", list(product_ids))] if product_ids is not None else None
+        frame = pd.concat([pd.read_parquet(path, filters=filters) for path in parts], ignore_index=True)
+        return frame.sort_values(["product_id", "observed_at", "cycle_id"], kind="mergesort", ignore_index=True)
+
+    def training_frame(self, as_of: Optional[datetime] = None, horizon: int = 1,
+                       product_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Point-in-time correct frame: feature rows observed at or before `as_of`
+        (features only look backwards) with `target_price` = the product's price
+        `horizon` observations later. Rows whose target was not yet observed at
+        `as_of` are dropped, so no label leaks from after the cut-off.
+        """
+        frame = self.read_features(product_ids)
+        if as_of is not None:
+            frame = frame[frame["observed_at"] <= pd.Timestamp(as_of)]
+        grouped = frame.groupby("product_id", sort=False)
+        frame = frame.assign(
+            target_price=grouped["price"].shift(-horizon),
+            target_observed_at=grouped["observed_at"].shift(-horizon),
+        )
+        return frame.dropna(subset=["target_price"]).reset_index(drop=True)
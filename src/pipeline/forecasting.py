@@ -0,0 +1,230 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# BATCH FORECASTING (ALL SKUS PER RUN)
+# ==============================================================================
+# Price series are pivoted into one (products x cycles) matrix. Lightweight
+# baselines run as numpy operations over every SKU at once; heavier per-SKU
+# models are fanned out over a process pool in chunks. Forecasts are written
+# to fact_forecasts, one row per (product, model, origin cycle, horizon step).
+
+SEASONAL_PERIOD = 4 # 6h cycles -> daily seasonality
+MOVING_AVERAGE_WINDOW = 28 # ~1 week of cycles
+SES_ALPHA = 0.3
+
+
+def price_matrix(observations: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (product_ids, cycle_ids, values) from per-(product, cycle) prices.
+    Gaps after a product's first listing carry its last price forward;
+    cycles before it stay NaN.
+    """
+    wide = observations.pivot_table(index="product_id", columns="cycle_id", values="price", aggfunc="min")
+    wide = wide.sort_index().sort_index(axis=1).ffill(axis=1)
+    return wide.index.to_numpy(), wide.columns.to_numpy(), wide.to_numpy(dtype=float)
+
+
+# =========== Vectorized baselines (every SKU at once) =========== #
+
+def _repeat(level: np.ndarray, horizon: int) -> np.ndarray:
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def naive_forecast(values: np.ndarray, horizon: int) -> np.ndarray:
+    """Last observed price"""
+    return _repeat(values[:, -1], horizon)
+
+
+def moving_average_forecast(values: np.ndarray, horizon: int, window: int = MOVING_AVERAGE_WINDOW) -> np.ndarray:
+    """Mean of the last `window` cycles (NaNs before the first listing are skipped)"""
+    return _repeat(np.nanmean(values[:, -window:], axis=1), horizon)
+
+
+def seasonal_naive_forecast(values: np.ndarray, horizon: int, period: int = SEASONAL_PERIOD) -> np.ndarray:
+    """Price of the same slot one period earlier (falls back to the last price)"""
+    last = values[:, -1]
+    n_cycles = values.shape[1]
+    if n_cycles < period:
+        return _repeat(last, horizon)
+    steps = [values[:, n_cycles - period + (h % period)] for h in range(horizon)]
+    forecast = np.stack(steps, axis=1)
+    return np.where(np.isnan(forecast), last[:, None], forecast)
+
+
+def ses_forecast(values: np.ndarray, horizon: int, alpha: float = SES_ALPHA) -> np.ndarray:
+    """Simple exponential smoothing: one pass over the cycles, vectorized over SKUs"""
+    level = np.full(values.shape[0], np.nan)
+    for column in values.T:
+        smoothed = alpha * column + (1 - alpha) * level
+        level = np.where(np.isnan(level), column, np.where(np.isnan(column), level, smoothed))
+    return _repeat(level, horizon)
+
+
+BASELINES: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "naive": naive_forecast,
+    "moving_average": moving_average_forecast,
+    "seasonal_naive": seasonal_naive_forecast,
+    "ses": ses_forecast,
+}
+
+
+# =========== Per-SKU models (process pool) =========== #
+
+# (alpha, beta) grid, evaluated all at once per SKU
+HOLT_ALPHAS, HOLT_BETAS = (grid.ravel() for grid in np.meshgrid(np.linspace(0.1, 0.9, 9), np.linspace(0.05, 0.5, 10)))
+# Shorter series give a trend that is mostly noise: they keep the last price
+HOLT_MIN_CYCLES = 2 * SEASONAL_PERIOD
+
+
+def holt_forecast(series: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Holt's linear trend with (alpha, beta) picked by a grid search on the
+    one-step-ahead squared error. CPU bound per SKU, hence the process pool.
+    """
+    if len(series) < HOLT_MIN_CYCLES:
+        return np.repeat(series[-1], horizon)
+    level = np.full(HOLT_ALPHAS.shape, series[0])
+    trend = np.full(HOLT_ALPHAS.shape, series[1] - series[0])
+    sse = np.zeros(HOLT_ALPHAS.shape)
+    for price in series[1:]:
+        predicted = level + trend
+        sse += (price - predicted) ** 2
+        new_level = HOLT_ALPHAS * price + (1 - HOLT_ALPHAS) * predicted
+        trend = HOLT_BETAS * (new_level - level) + (1 - HOLT_BETAS) * trend
+        level = new_level
+    best = np.argmin(sse)
+    return np.maximum(level[best] + trend[best] * np.arange(1, horizon + 1), 0.0)
+
+
+PER_SKU_MODELS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "holt": holt_forecast,
+}
+
+
+def _fit_chunk(model: str, horizon: int, chunk: List[Tuple[int, np.ndarray]]) -> List[Tuple[int, np.ndarray]]:
+    """Pool task: one model over a chunk of SKUs (module level so it pickles)"""
+    fit = PER_SKU_MODELS[model]
+    return [(product_id, fit(series, horizon)) for product_id, series in chunk]
+
+
+# =========== Runner =========== #
+
+class ForecastRunner:
+    """
+    Forecasts every SKU in batches of `batch_size`: baselines as matrix
+    operations, per-SKU models over `workers` processes (in-process when 1).
+    Each batch is handed to `sink(frame)` as soon as it is done, and its
+    timing is kept in the run report.
+    """
+
+    def __init__(self, horizon: int = 4, workers: int = 1, batch_size: int = 2000,
+                 baselines: Sequence[str] = tuple(BASELINES), per_sku_models: Sequence[str] = tuple(PER_SKU_MODELS),
+                 chunk_size: int = 50):
+        self.horizon = horizon
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.baselines = list(baselines)
+        self.per_sku_models = list(per_sku_models)
+        self.chunk_size = chunk_size
+
+    def _long_frame(self, model: str, product_ids: np.ndarray, forecasts: np.ndarray) -> pd.DataFrame:
+        n_products = len(product_ids)
+        return pd.DataFrame({
+            "product_id": np.repeat(product_ids, self.horizon),
+            "model": model,
+            "horizon": np.tile(np.arange(1, self.horizon + 1), n_products),
+            "forecast_price": forecasts.reshape(-1),
+        })
+
+    def _per_sku(self, model: str, product_ids: np.ndarray, values: np.ndarray, executor) -> np.ndarray:
+        # Each series starts at the product's first listing
+        series = [(pid, row[~np.isnan(row)]) for pid, row in zip(product_ids, values)]
+        chunks = [series[i:i + self.chunk_size] for i in range(0, len(series), self.chunk_size)]
+        if executor is None:
+            results = [_fit_chunk(model, self.horizon, chunk) for chunk in chunks]
+        else:
+            results = executor.map(_fit_chunk, [model] * len(chunks), [self.horizon] * len(chunks), chunks)
+        by_product = {pid: forecast for chunk in results for pid, forecast in chunk}
+        return np.stack([by_product[pid] for pid in product_ids])
+
+    def forecast_batch(self, product_ids: np.ndarray, values: np.ndarray, executor=None) -> pd.DataFrame:
+        frames = [self._long_frame(name, product_ids, BASELINES[name](values, self.horizon))
+                  for name in self.baselines]
+        frames += [self._long_frame(name, product_ids, self._per_sku(name, product_ids, values, executor))
+                   for name in self.per_sku_models]
+        return pd.concat(frames, ignore_index=True)
+
+    def run(self, observations: pd.DataFrame, sink: Optional[Callable[[pd.DataFrame], None]] = None) -> Dict:
+        started = time.perf_counter()
+        product_ids, cycle_ids, values = price_matrix(observations)
+        report = {"skus": len(product_ids), "origin_cycle_id": int(cycle_ids[-1]) if len(cycle_ids) else None,
+                  "workers": self.workers, "batches": []}
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 and self.per_sku_models else None
+        try:
+            for start in range(0, len(product_ids), self.batch_size):
+                batch_started = time.perf_counter()
+                batch_ids = product_ids[start:start + self.batch_size]
+                frame = self.forecast_batch(batch_ids, values[start:start + self.batch_size], executor)
+                fit_seconds = time.perf_counter() - batch_started
+                if sink is not None:
+                    sink(frame)
+                seconds = time.perf_counter() - batch_started
+                report["batches"].append({
+                    "batch": len(report["batches"]) + 1,
+                    "skus": len(batch_ids),
+                    "fit_seconds": round(fit_seconds, 4),
+                    "seconds": round(seconds, 4),
+                    "skus_per_second": round(len(batch_ids) / seconds, 1) if seconds else None,
+                })
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        total = time.perf_counter() - started
+        report["seconds"] = round(total, 4)
+        report["skus_per_second"] = round(len(product_ids) / total, 1) if total else None
+        return report
+
+
+# =========== Storage (fact_forecasts) =========== #
+
+LATEST_CYCLE_SQL = "SELECT MAX(cycle_id) FROM fact_offers"
+
+
+def load_recent_observations(engine, lookback_cycles: int) -> pd.DataFrame:
+    """Per-(product, cycle) prices of the last `lookback_cycles` cycles"""
+    from sqlalchemy import text
+    from src.pipeline.features import load_observations
+    with engine.connect() as connection:
+        latest = connection.execute(text(LATEST_CYCLE_SQL)).scalar() or 0
+    return load_observations(engine, after_cycle_id=max(0, latest - lookback_cycles))
+
+
+class ForecastWriter:
+    """Batch sink into fact_forecasts; re-running an origin cycle replaces its rows"""
+
+    def __init__(self, engine, origin_cycle_id: int):
+        from src.database.models import FactForecast
+        self.engine = engine
+        self.table = FactForecast.__table__
+        self.origin_cycle_id = origin_cycle_id
+        self.created_at = datetime.now()
+
+    def __call__(self, frame: pd.DataFrame):
+        rows = frame.assign(origin_cycle_id=self.origin_cycle_id, created_at=self.created_at)
+        records = rows.astype({"product_id": int, "horizon": int}).to_dict("records")
+        with self.engine.begin() as connection:
+            connection.execute(
+                self.table.delete().where(
+                    self.table.c.origin_cycle_id == self.origin_cycle_id,
+                    self.table.c.product_id.in_([int(pid) for pid in frame["product_id"].unique()]),
+                )
+            )
+            connection.execute(self.table.insert(), records)
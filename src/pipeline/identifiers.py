@@ -0,0 +1,54 @@
+import re
+from typing import Optional
+
+from .dedup import normalize_link
+
+# Catalogue product pages: https://www.mercadolivre.com.br/<slug>/p/MLB32174378
+CATALOG_ID_PATTERN = re.compile(r"/p/MLB-?(\d+)", re.IGNORECASE)
+# Individual seller listings: https://produto.mercadolivre.com.br/MLB-3456789012-<slug>
+LISTING_ID_PATTERN = re.compile(r"/MLB-?(\d+)", re.IGNORECASE)
+# Unified listings (several sellers, one page): https://www.mercadolivre.com.br/<slug>/up/MLBU3686334040
+UNIFIED_ID_PATTERN = re.compile(r"/up/MLBU-?(\d+)", re.IGNORECASE)
+# Unified ids are a third id space, shifted past any catalogue id (same offset in
+# the item_id backfill, src/database/upgrades.py)
+UNIFIED_ID_OFFSET = 10 ** 15
+
+
+def extract_item_id(link: str) -> Optional[int]:
+    """
+    Extracts the marketplace ID embedded in a Mercado Livre URL as a BIGINT.
+    The "MLB" site prefix is dropped. Catalogue ids (/p/MLB...), listing ids
+    (/MLB-...) and unified listing ids (/up/MLBU...) are separate id spaces on the
+    marketplace, so listing ids are stored negated and unified ids shifted by
+    UNIFIED_ID_OFFSET to keep one collision-free integer key.
+    Returns None when the URL carries no id (e.g. "N/A").
+    """
+    if not link or not isinstance(link, str):
+        return None
+    match = UNIFIED_ID_PATTERN.search(link)
+    if match:
+        return UNIFIED_ID_OFFSET + int(match.group(1))
+    match = CATALOG_ID_PATTERN.search(link)
+    if match:
+        return int(match.group(1))
+    match = LISTING_ID_PATTERN.search(link)
+    if match:
+        return -int(match.group(1))
+    return None
+
+
+def format_item_id(item_id: int) -> str:
+    """Inverse of extract_item_id for display: 32174378 -> 'MLB32174378'"""
+    if item_id >= UNIFIED_ID_OFFSET:
+        return f"MLBU{item_id - UNIFIED_ID_OFFSET}"
+    return f"MLB{item_id}" if item_id >= 0 else f"MLB-{-item_id}"
+
+
+def listing_key(link: str, item_id: Optional[int] = None) -> str:
+    """
+    Dedup key for a listing: the marketplace id when available (so URL variants
+    collapse), otherwise the normalized link.
+    """
+    if item_id is None:
+        item_id = extract_item_id(link)
+    return format_item_id(item_id) if item_id is not None else normalize_link(link)
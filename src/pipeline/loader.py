@@ -0,0 +1,170 @@
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.pipeline.prices import sanitize_prices
+from src.pipeline.storage import CSV_COLUMNS, CSV_ENCODING, CSV_SEP
+
+# ==============================================================================
+# TYPED RAW CSV LOADER (data/raw/samsung_market_data.csv + shards)
+# ==============================================================================
+# A plain read_csv gives object columns everywhere: "1.329.46" price strings,
+# "Yes"/"No " flags and the same seller / layout / bracket strings repeated on
+# every row. This loader reads with explicit dtypes (categoricals for the
+# repetitive columns), converts prices, flags and dates once per chunk and can
+# prune columns and filter an extraction date range while streaming, so only
+# the selected rows and columns are ever held in memory.
+
+# Low-cardinality text kept as pandas categoricals
+CATEGORY_COLUMNS = [
+    "seller", "discount", "total_sold_raw", "arrival_estimation", "layout_type", "price_range_searched",
+]
+# "Yes" / "No" flags written by the parser
+YES_NO_COLUMNS = ["free_delivery", "is_great_deal", "is_bestseller", "is_recommended"]
+
+# Dtypes used by read_csv. Converted columns are read as categories first, so
+# their conversion runs once per distinct value instead of once per row.
+# Ids are parsed as float64 (C fast path, exact below 2**53) and cast to
+# nullable integers afterwards: parsing straight to Int64 is ~3x slower.
+READ_DTYPES = {
+    **{column: "category" for column in CATEGORY_COLUMNS},
+    **{column: "category" for column in YES_NO_COLUMNS},
+    "interest_free": "category",
+    "price": "category",
+    "installments": "category",
+    "extraction_date": "object", # Nearly unique per row: to_datetime directly
+    "cycle_id": "float64",
+    "item_id": "float64",
+    "title": "object",
+    "link": "object",
+}
+INTEGER_COLUMNS = {"cycle_id": "Int32", "item_id": "Int64"}
+
+EXTRACTION_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_CHUNKSIZE = 200_000
+
+PathArg = Union[str, os.PathLike, Sequence[Union[str, os.PathLike]]]
+
+
+def _on_categories(series: pd.Series, convert) -> pd.Series:
+    """Applies `convert` to the distinct values of a categorical and maps the codes back"""
+    # The extra last slot converts the missing value: code -1 picks it up in take()
+    values = convert(pd.Series(series.cat.categories.tolist() + [None], dtype="object"))
+    return values.take(series.cat.codes.to_numpy()).set_axis(series.index)
+
+
+def _yes_no(values: pd.Series) -> pd.Series:
+    return values.astype("string").str.strip().eq("Yes").fillna(False).astype(bool)
+
+
+def _interest_free(values: pd.Series) -> pd.Series:
+    return values.astype("string").str.strip().str.lower().eq("sem juros").fillna(False).astype(bool)
+
+
+def _installments(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values.astype("string"), errors="coerce").round().astype("Int16")
+
+
+CONVERTERS = {
+    "price": sanitize_prices,
+    "installments": _installments,
+    "interest_free": _interest_free,
+    **{column: _yes_no for column in YES_NO_COLUMNS},
+}
+
+
+def _typed(chunk: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    for column, convert in CONVERTERS.items():
+        if column in chunk.columns:
+            chunk[column] = _on_categories(chunk[column], convert)
+    if "extraction_date" in chunk.columns:
+        chunk["extraction_date"] = pd.to_datetime(chunk["extraction_date"], format=EXTRACTION_DATE_FORMAT,
+                                                  errors="coerce")
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype(dtype)
+    # Files written before a column existed (e.g. item_id) get it as missing values
+    for column in columns:
+        if column not in chunk.columns:
+            dtype = INTEGER_COLUMNS.get(column, READ_DTYPES.get(column, "object"))
+            chunk[column] = pd.Series(None, index=chunk.index, dtype=dtype)
+    return chunk[columns]
+
+
+def _as_list(paths: PathArg) -> List[str]:
+    if isinstance(paths, (str, os.PathLike)):
+        return [os.fspath(paths)]
+    return [os.fspath(p) for p in paths]
+
+
+def iter_market_data(
+    paths: PathArg,
+    columns: Optional[Iterable[str]] = None,
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams typed chunks of one or more raw CSVs.
+    - columns: subset to load (default: every column of CSV_COLUMNS)
+    - start / end: keep rows with start <= extraction_date < end
+    Prices come back as float64 (0.0 when unparseable), flags as bool,
+    extraction_date as datetime64, installments / cycle_id / item_id as
+    nullable integers and the repetitive text columns as categoricals.
+    """
+    columns = list(columns) if columns is not None else list(CSV_COLUMNS)
+    unknown = [c for c in columns if c not in CSV_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown column(s): {', '.join(unknown)}")
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    needed = set(columns) | ({"extraction_date"} if start is not None or end is not None else set())
+
+    for path in _as_list(paths):
+        reader = pd.read_csv(
+            path, sep=CSV_SEP, encoding=CSV_ENCODING, usecols=lambda c: c in needed,
+            dtype={c: t for c, t in READ_DTYPES.items() if c in needed}, chunksize=chunksize,
+        )
+        for chunk in reader:
+            chunk = _typed(chunk, sorted(needed, key=CSV_COLUMNS.index))
+            if start is not None:
+                chunk = chunk[chunk["extraction_date"] >= start]
+            if end is not None:
+                chunk = chunk[chunk["extraction_date"] < end]
+            if len(chunk):
+                yield chunk[columns].reset_index(drop=True)
+
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat that keeps categoricals categorical when chunks saw different values"""
+    if len(chunks) == 1:
+        return chunks[0]
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([chunk[column] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_market_data(
+    paths: PathArg,
+    columns: Optional[Iterable[str]] = None,
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """Typed DataFrame of the raw CSV(s), see iter_market_data for the parameters"""
+    columns = list(columns) if columns is not None else list(CSV_COLUMNS)
+    chunks = list(iter_market_data(paths, columns, start, end, chunksize))
+    return concat_chunks(chunks) if chunks else empty_market_data(columns)
+
+
+def empty_market_data(columns: Iterable[str]) -> pd.DataFrame:
+    """Zero-row frame with the dtypes of a loaded one (header-only files, empty date ranges)"""
+    columns = list(columns)
+    empty = pd.DataFrame({column: pd.Series(dtype=READ_DTYPES.get(column, "object")) for column in columns})
+    return _typed(empty, columns)
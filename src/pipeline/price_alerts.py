@@ -0,0 +1,163 @@
+import os
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.pipeline.prices import sanitize_price
+
+# ==============================================================================
+# IN-CRAWL PRICE ALERTS
+# ==============================================================================
+# Every validated card is compared against the last known price of its SKU
+# (item_id) as soon as its page is parsed. Moves past the drop/rise thresholds
+# are emitted right away to an append-only JSONL stream (or a local queue), so
+# consumers see them seconds after the fetch instead of after the migration.
+# The index is warm-started from the warehouse and follows the crawl after that.
+
+# Best price of each SKU in the last cycle it was seen in
+LAST_KNOWN_PRICES_SQL = """
+    SELECT p.item_id, MIN(f.price) AS price, MAX(f.extraction_date) AS seen_at
+    FROM fact_offers f
+    JOIN dim_products p ON p.product_id = f.product_id
+    JOIN (
+        SELECT product_id, MAX(cycle_id) AS cycle_id FROM fact_offers GROUP BY product_id
+    ) last_cycle ON last_cycle.product_id = f.product_id AND last_cycle.cycle_id = f.cycle_id
+    WHERE p.item_id IS NOT NULL AND f.price > 0
+    GROUP BY p.item_id
+"""
+
+
+class PriceIndex:
+    """item_id -> (last price, seen_at as 'YYYY-MM-DD HH:MM:SS')"""
+
+    def __init__(self, prices: Optional[Dict[int, Tuple[float, str]]] = None):
+        self._prices = prices or {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def get(self, item_id: int) -> Optional[Tuple[float, str]]:
+        return self._prices.get(item_id)
+
+    def observe(self, item_id: int, price: float, seen_at: str) -> Optional[Tuple[float, str]]:
+        """Records the new price and returns the previous one (None for a new SKU)"""
+        previous = self._prices.get(item_id)
+        self._prices[item_id] = (price, seen_at)
+        return previous
+
+    @classmethod
+    def load_from_warehouse(cls, engine) -> "PriceIndex":
+        from sqlalchemy import text
+        with engine.connect() as connection:
+            rows = connection.execute(text(LAST_KNOWN_PRICES_SQL))
+            return cls({
+                # str()[:19]: datetimes (Postgres) and aggregate strings (sqlite) alike
+                int(item_id): (float(price), str(seen_at)[:19] if seen_at else None)
+                for item_id, price, seen_at in rows
+            })
+
+
+# =========== Sinks =========== #
+
+class JsonlAlertSink:
+    """Append-only JSONL stream (one file per day), flushed on every page batch"""
+
+    def __init__(self, directory: str):
+        self.directory = str(directory)
+
+    def path_for_today(self) -> str:
+        return os.path.join(self.directory, f"price_alerts_{datetime.now().strftime('%Y%m%d')}.jsonl")
+
+    def emit(self, events: List[Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path_for_today(), "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class QueueAlertSink:
+    """In-process consumers: events are put on a queue.Queue (or anything with put())"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def emit(self, events: List[Dict[str, Any]]):
+        for event in events:
+            self.queue.put(event)
+
+
+# =========== Stage =========== #
+
+class PriceAlertStage:
+    """
+    Compares a page batch against the index and emits price_drop / price_rise
+    events whose relative change reaches the thresholds. Every event carries
+    `alert_latency_seconds`: time from the end of the page fetch to emission.
+    """
+
+    def __init__(self, index: PriceIndex, sink, drop_threshold: float = 0.05, rise_threshold: float = 0.05,
+                 clock: Callable[[], float] = time.time):
+        self.index = index
+        self.sink = sink
+        self.drop_threshold = drop_threshold
+        self.rise_threshold = rise_threshold
+        self._clock = clock
+
+    def _event(self, row: Dict[str, Any], previous: Tuple[float, str], price: float) -> Optional[Dict[str, Any]]:
+        old_price, previous_seen_at = previous
+        if old_price <= 0:
+            return None
+        change = (price - old_price) / old_price
+        if change <= -self.drop_threshold:
+            event_name = "price_drop"
+        elif change >= self.rise_threshold:
+            event_name = "price_rise"
+        else:
+            return None
+        return {
+            "event": event_name,
+            "item_id": row["item_id"],
+            "title": row.get("title"),
+            "seller": row.get("seller"),
+            "link": row.get("link"),
+            "cycle_id": row.get("cycle_id"),
+            "old_price": old_price,
+            "new_price": price,
+            "change_pct": round(change * 100, 2),
+            "previous_seen_at": previous_seen_at,
+            "fetched_at": row.get("extraction_date"),
+        }
+
+    def process(self, rows: Iterable[Dict[str, Any]], fetched_at: float) -> List[Dict[str, Any]]:
+        """Checks one page of validated rows; `fetched_at` is the epoch time the page arrived"""
+        events = []
+        for row in rows:
+            item_id = row.get("item_id")
+            if item_id in (None, ""):
+                continue
+            price = sanitize_price(row.get("price"))
+            if price <= 0:
+                continue
+            previous = self.index.observe(item_id, price, row.get("extraction_date"))
+            if previous is not None:
+                event = self._event(row, previous, price)
+                if event is not None:
+                    events.append(event)
+        if events:
+            emitted_at = self._clock()
+            for event in events:
+                event["alert_latency_seconds"] = round(emitted_at - fetched_at, 4)
+            self.sink.emit(events)
+        return events
+
+    @classmethod
+    def from_config(cls, engine=None) -> "PriceAlertStage":
+        """JSONL stage from MonitoringConfig; warm-started from `engine` when given"""
+        from src.monitoring.settings import MonitoringConfig
+        index = PriceIndex.load_from_warehouse(engine) if engine is not None else PriceIndex()
+        return cls(
+            index, JsonlAlertSink(MonitoringConfig.PRICE_ALERTS_DIR),
+            drop_threshold=MonitoringConfig.PRICE_ALERT_DROP_THRESHOLD,
+            rise_threshold=MonitoringConfig.PRICE_ALERT_RISE_THRESHOLD,
+        )
@@ -0,0 +1,50 @@
+import math
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def sanitize_price(value):
+    """
+    Helper function to fix currency formatting issues.
+    Handles:
+    - '1.099.99' -> 1099.99 (Removes first dot)
+    - '1.200,50' -> 1200.50 (Brazilian format)
+    - 'R$ 1000'  -> 1000.0 (Currency symbols)
+    Shared by the CSV migration and the in-crawl price alerts (no pandas needed).
+    """
+    if _is_missing(value) or str(value).strip().lower() in ['n/a', 'nan', '']:
+        return 0.0
+
+    # Convert to string and basic cleaning
+    s = str(value).replace("R$", "").replace("$", "").strip()
+
+    # Case 1: Brazilian format (1.000,00) -> Convert to 1000.00
+    if "," in s:
+        s = s.replace(".", "").replace(",", ".")
+
+    # Case 2: Dirty format with multiple dots (1.099.99) -> Remove all dots except the last one
+    elif s.count(".") > 1:
+        # Replaces all dots with empty string, up to the last one
+        s = s.replace(".", "", s.count(".") - 1)
+
+    try:
+        return float(s)
+    except ValueError:
+        print(f"⚠️ Warning: Could not parse price '{value}', defaulting to 0.0")
+        return 0.0
+
+
+def sanitize_prices(values):
+    """
+    Vectorized sanitize_price for a pandas Series of raw strings (same rules,
+    unparseable values become 0.0 silently). Returns a float64 Series.
+    """
+    import pandas as pd
+    s = values.astype("string").str.replace("R$", "", regex=False).str.replace("$", "", regex=False).str.strip()
+    brazilian = s.str.contains(",", regex=False, na=False)
+    # Brazilian format drops every dot; the dirty format keeps only the last one
+    s = s.where(~brazilian, s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    s = s.where(brazilian, s.str.replace(r"\.(?=.*\.)", "", regex=True))
+    return pd.to_numeric(s, errors="coerce").fillna(0.0).astype("float64")
@@ -0,0 +1,140 @@
+import time
+import heapq
+import random
+import itertools
+from typing import Callable, Dict, List, Optional
+
+
+class PageTask:
+    """
+    One listing page to (re)fetch. `resume_range` marks the page where a range's
+    pagination stopped (circuit breaker): when its retry succeeds, the range
+    continues from the next page.
+    """
+
+    def __init__(self, min_price: int, max_price: int, offset: int, page_number: int,
+                 attempts: int = 0, resume_range: bool = False, reason: Optional[str] = None):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.offset = offset
+        self.page_number = page_number
+        self.attempts = attempts
+        self.resume_range = resume_range
+        self.reason = reason
+
+    def to_dict(self) -> Dict:
+        return {
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "offset": self.offset,
+            "page_number": self.page_number,
+            "attempts": self.attempts,
+            "resume_range": self.resume_range,
+            "reason": self.reason,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PageTask":
+        return cls(**data)
+
+    def __repr__(self):
+        return (f"<PageTask(range={self.min_price}-{self.max_price}, offset={self.offset}, "
+                f"attempts={self.attempts})>")
+
+
+class RetryQueue:
+    """
+    Min-heap of failed pages ordered by due time.
+    Backoff is exponential with full jitter: uniform(0, min(max_delay, base * 2^attempt)),
+    so retries of pages that failed together do not hit the site together.
+    """
+
+    def __init__(self, base_delay: float = 30, max_delay: float = 900, max_attempts: int = 4,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._heap = []
+        self._sequence = itertools.count() # FIFO among equal due times
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def backoff(self, attempts: int) -> float:
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def push(self, task: PageTask, reason: str) -> bool:
+        """Schedules a failed page. False when it ran out of attempts (the page is lost)."""
+        task.attempts += 1
+        task.reason = reason
+        if task.attempts >= self.max_attempts:
+            return False
+        heapq.heappush(self._heap, (self._clock() + self.backoff(task.attempts), next(self._sequence), task))
+        return True
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest retry is due (0 if overdue), None if empty"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._clock())
+
+    def pop_due(self) -> Optional[PageTask]:
+        if self._heap and self._heap[0][0] <= self._clock():
+            return heapq.heappop(self._heap)[2]
+        return None
+
+    def wait_next(self) -> Optional[PageTask]:
+        """Sleeps until the earliest retry is due and returns it (None if empty)"""
+        wait = self.next_due_in()
+        if wait is None:
+            return None
+        if wait:
+            self._sleep(wait)
+        return heapq.heappop(self._heap)[2]
+
+    def resumes_range(self, min_price: int, max_price: int) -> bool:
+        """True while a deferred page still has to pick a stopped range's pagination back up"""
+        return any(task.resume_range and (task.min_price, task.max_price) == (min_price, max_price)
+                   for _, _, task in self._heap)
+
+    def to_list(self) -> List[Dict]:
+        return [task.to_dict() for _, _, task in sorted(self._heap)]
+
+    def restore(self, tasks: Optional[List[Dict]]):
+        """Re-schedules tasks persisted in a checkpoint; they are due immediately"""
+        for data in tasks or []:
+            heapq.heappush(self._heap, (self._clock(), next(self._sequence), PageTask.from_dict(data)))
+
+
+class CycleCoverage:
+    """
+    True page coverage of a cycle:
+    - attempted: distinct pages requested
+    - succeeded: pages that ended with a usable answer (cards, or end of range)
+    - retried: extra attempts served from the retry queue
+    - lost: pages given up after max attempts or on non-retryable errors
+    """
+
+    def __init__(self, attempted: int = 0, succeeded: int = 0, retried: int = 0, lost: int = 0):
+        self.attempted = attempted
+        self.succeeded = succeeded
+        self.retried = retried
+        self.lost = lost
+
+    def counters(self) -> Dict[str, int]:
+        """Raw counters (checkpoint format, accepted back by __init__)"""
+        return {"attempted": self.attempted, "succeeded": self.succeeded, "retried": self.retried, "lost": self.lost}
+
+    def as_dict(self) -> Dict[str, float]:
+        ratio = self.succeeded / self.attempted if self.attempted else 1.0
+        return {
+            "pages_attempted": self.attempted,
+            "pages_succeeded": self.succeeded,
+            "pages_retried": self.retried,
+            "pages_lost": self.lost,
+            "coverage_ratio": round(ratio, 4),
+        }
@@ -0,0 +1,80 @@
+import os
+import tempfile
+from typing import List
+
+from src.monitoring.stages import stage_timer
+
+# Canonical column order of data/raw/samsung_market_data.csv
+CSV_COLUMNS: List[str] = [
+    "extraction_date", "cycle_id", "title", "seller", "price", "discount", "installments",
+    "interest_free", "total_sold_raw", "free_delivery", "arrival_estimation", "is_great_deal",
+    "is_bestseller", "is_recommended", "link", "layout_type", "price_range_searched",
+    "item_id",
+]
+
+CSV_SEP = ";"
+CSV_ENCODING = "utf-8-sig"
+
+
+def ensure_csv(output_file: str):
+    """Creates the CSV with the full header if it does not exist yet"""
+    if os.path.exists(output_file):
+        return
+    import pandas as pd
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    pd.DataFrame(columns=CSV_COLUMNS).to_csv(output_file, index=False, sep=CSV_SEP, encoding=CSV_ENCODING)
+
+
+def read_csv_header(output_file: str) -> List[str]:
+    with open(output_file, "r", encoding=CSV_ENCODING) as f:
+        first_line = f.readline().strip()
+    return first_line.split(CSV_SEP) if first_line else []
+
+
+def _evolve_header(output_file: str, header: List[str]) -> List[str]:
+    """
+    Rewrites the CSV once with new columns appended to the header (old rows get
+    empty values), so rows written before a schema change stay aligned.
+    """
+    import pandas as pd
+    new_header = header + [c for c in CSV_COLUMNS if c not in header]
+    directory = os.path.dirname(output_file) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".csv_evolve_", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        first = True
+        for chunk in pd.read_csv(output_file, sep=CSV_SEP, encoding=CSV_ENCODING, dtype=str,
+                                 keep_default_na=False, chunksize=50_000):
+            chunk.reindex(columns=new_header).to_csv(
+                tmp_path, mode="w" if first else "a", header=first, index=False,
+                sep=CSV_SEP, encoding=CSV_ENCODING if first else "utf-8"
+            )
+            first = False
+        if first:
+            pd.DataFrame(columns=new_header).to_csv(tmp_path, index=False, sep=CSV_SEP, encoding=CSV_ENCODING)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return new_header
+
+
+@stage_timer.timed("csv_append")
+def append_batch(batch_data: List[dict], output_file: str) -> int:
+    """
+    Appends a page of parsed offers to the raw CSV (append mode, persistency).
+    Columns are aligned to the existing header; the header is extended once
+    if the batch carries columns the file does not know yet.
+    Returns the number of rows written.
+    """
+    if not batch_data:
+        return 0
+    import pandas as pd
+    ensure_csv(output_file)
+    header = read_csv_header(output_file)
+    df = pd.DataFrame(batch_data)
+    if any(col not in header for col in df.columns):
+        header = _evolve_header(output_file, header)
+    df.reindex(columns=header).to_csv(output_file, mode="a", index=False, sep=CSV_SEP, encoding="utf-8", header=False)
+    return len(df)
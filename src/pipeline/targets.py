@@ -0,0 +1,65 @@
+import random
+from typing import List, Tuple
+
+# ==============================================================================
+# SCRAPING CONFIGURATION
+# ==============================================================================
+
+# Rotational User Agents (To avoid SOFT BANS!)
+user_agents = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0"
+]
+
+# Items per listing page and ML pagination ceiling (~2000 items per search)
+PAGE_SIZE = 48
+MAX_OFFSET = 2000
+
+SEARCH_BASE_URL = (
+    "https://lista.mercadolivre.com.br/"
+    "celulares-telefones/"
+    "celulares-smartphones/"
+    "samsung/"
+)
+
+
+def get_random_header():
+    return {
+        "User-Agent" : random.choice(user_agents),
+        "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Referer": "https://www.google.com/"
+    }
+
+
+def build_price_ranges() -> List[Tuple[int, int]]:
+    """
+    Price Range Configuration (Granular strategy for 10k records)
+    Focus: Mobile Phones (Starting from 0 BRL to 20000 BRL)
+    """
+    ranges = []
+
+    # Low/Mid Range (High density of products) - STEP 50
+    for p in range(0, 2500, 50):
+        ranges.append((p, p + 49))
+
+    # High Range (e.g: S22, S23, S24) - STEP 100
+    for p in range(2500, 6000, 100):
+        ranges.append((p, p + 99))
+
+    # Premium/Foldables - STEP 500
+    for p in range(6000, 20000, 500):
+        ranges.append((p, p + 499))
+
+    return ranges
+
+
+price_ranges = build_price_ranges()
+
+
+def build_page_url(min_price: int, max_price: int, offset: int) -> str:
+    """Pagination URL Construction: offset 1 is the first page, then +48 per page"""
+    if offset == 1:
+        return f"{SEARCH_BASE_URL}samsung_PriceRange_{min_price}-{max_price}_NoIndex_True"
+    return f"{SEARCH_BASE_URL}samsung_PriceRange_{min_price}-{max_price}_Desde_{offset}_NoIndex_True"
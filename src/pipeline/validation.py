@@ -0,0 +1,112 @@
+import os
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# ==============================================================================
+# BATCH SCHEMA VALIDATION (GARBAGE REJECTION)
+# ==============================================================================
+# A whole page of parsed offers is validated in ONE pydantic-core call
+# (TypeAdapter over List[TypedDict]). Constraints are declarative (patterns,
+# literals, lengths) so validation stays in Rust: no per-row Python validators.
+# The raw rows are what gets written (CSV conventions unchanged); the schema
+# only decides which rows are kept and why the others were rejected.
+
+# Rust regex (no lookarounds). "0.00" = missing price tag, "N/A" = missing link.
+PRICE_PATTERN = r"^[1-9][0-9.]*\.[0-9]{2}$"
+LINK_PATTERN = r"^https?://[^\s]+$"
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$"
+INSTALLMENTS_PATTERN = r"^(N/A|[0-9]{1,2})$"
+RANGE_PATTERN = r"^[0-9]+-[0-9]+$"
+
+
+def _build_adapter():
+    """Built on first use: keeps pydantic off the scraper import path"""
+    from typing import Literal, Union
+    from typing_extensions import Annotated, TypedDict
+    from pydantic import ConfigDict, Field, TypeAdapter, StringConstraints
+
+    YesNo = Literal["Yes", "No"]
+
+    class OfferRecord(TypedDict):
+        __pydantic_config__ = ConfigDict(extra="ignore", strict=True)
+
+        extraction_date: Annotated[str, StringConstraints(pattern=DATE_PATTERN)]
+        cycle_id: Annotated[int, Field(ge=1)]
+        title: Annotated[str, StringConstraints(min_length=5, max_length=500)]
+        seller: Annotated[str, StringConstraints(max_length=255)]
+        price: Annotated[str, StringConstraints(pattern=PRICE_PATTERN)]
+        discount: Annotated[str, StringConstraints(max_length=50)]
+        installments: Annotated[str, StringConstraints(pattern=INSTALLMENTS_PATTERN)]
+        interest_free: Literal["Sem Juros", "Com Juros", "N/A"]
+        total_sold_raw: Annotated[str, StringConstraints(max_length=100)]
+        free_delivery: YesNo
+        arrival_estimation: Annotated[str, StringConstraints(max_length=255)]
+        is_great_deal: YesNo
+        is_bestseller: YesNo
+        is_recommended: YesNo
+        link: Annotated[str, StringConstraints(pattern=LINK_PATTERN, max_length=2048)]
+        layout_type: Literal["grid", "list"]
+        price_range_searched: Annotated[str, StringConstraints(pattern=RANGE_PATTERN)]
+        item_id: Union[int, Literal[""]]
+
+    return TypeAdapter(List[OfferRecord])
+
+
+class OfferBatchValidator:
+    """
+    Splits a page batch into (valid_rows, rejected) in a single validation call.
+    Each rejected entry is {"row": ..., "reasons": [{"field", "reason", "message"}]}
+    where `reason` is the pydantic error type (missing, string_pattern_mismatch,
+    literal_error, string_too_short, ...).
+    """
+
+    def __init__(self):
+        self._adapter = None
+
+    @property
+    def adapter(self):
+        if self._adapter is None:
+            self._adapter = _build_adapter()
+        return self._adapter
+
+    def validate_batch(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        if not rows:
+            return rows, []
+        from pydantic import ValidationError
+        try:
+            self.adapter.validate_python(rows)
+            return rows, []
+        except ValidationError as e:
+            reasons: Dict[int, List[Dict[str, str]]] = {}
+            for err in e.errors(include_url=False, include_context=False, include_input=False):
+                loc = err["loc"]
+                field = str(loc[1]) if len(loc) > 1 else "__row__"
+                reasons.setdefault(loc[0], []).append({"field": field, "reason": err["type"], "message": err["msg"]})
+        valid = [row for idx, row in enumerate(rows) if idx not in reasons]
+        rejected = [{"row": rows[idx], "reasons": reasons[idx]} for idx in sorted(reasons)]
+        return valid, rejected
+
+
+class QuarantineWriter:
+    """Appends rejected rows as JSON lines (one file per day) for later inspection"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for_today(self) -> str:
+        return os.path.join(self.directory, f"rejected_offers_{datetime.now().strftime('%Y%m%d')}.jsonl")
+
+    def write(self, rejected: List[Dict[str, Any]], context: Optional[Dict[str, Any]] = None) -> str:
+        path = self.path_for_today()
+        os.makedirs(self.directory, exist_ok=True)
+        quarantined_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(path, "a", encoding="utf-8") as f:
+            for entry in rejected:
+                record = {"quarantined_at": quarantined_at, **(context or {}), **entry}
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return path
+
+
+# Shared by the scraper hot path (schema compiled once per process)
+offer_validator = OfferBatchValidator()
@@ -0,0 +1,304 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import text
+
+# ==============================================================================
+# DISTRIBUTED CRAWL: POSTGRES WORK QUEUE
+# ==============================================================================
+# Each cycle's (price range, page) work items live in crawl_work_queue.
+# Workers claim them with FOR UPDATE SKIP LOCKED, so any number of containers
+# (one host or many) share a cycle without a broker: Postgres is the coordinator.
+# Pages are discovered lazily: the first page of every range is published with
+# the cycle, and a worker enqueues page N+1 only when page N returned cards.
+# Lease timestamps use the database clock (now()) to avoid worker clock skew.
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+CYCLE_RUNNING = "running"
+CYCLE_COMPLETED = "completed"
+
+# Serializes cycle publication between concurrent coordinators (pg_advisory_xact_lock key)
+_CYCLE_LOCK_KEY = 7_340_034
+
+
+# Idempotent: re-publishing a page that already exists is a no-op
+_INSERT_WORK_ITEM = text(
+    """
+    INSERT INTO crawl_work_queue
+        (cycle_id, min_price, max_price, page_offset, page_number, status, attempts, created_at)
+    VALUES (:cycle_id, :min_price, :max_price, :page_offset, :page_number, 'pending', 0, now())
+    ON CONFLICT (cycle_id, min_price, max_price, page_offset) DO NOTHING
+    """
+)
+
+
+class WorkItem:
+    """A leased (price range, page) unit of work"""
+
+    def __init__(self, work_id: int, cycle_id: int, min_price: int, max_price: int,
+                 page_offset: int, page_number: int, attempts: int):
+        self.work_id = work_id
+        self.cycle_id = cycle_id
+        self.min_price = min_price
+        self.max_price = max_price
+        self.page_offset = page_offset
+        self.page_number = page_number
+        self.attempts = attempts
+
+    @classmethod
+    def from_row(cls, row) -> "WorkItem":
+        return cls(row.work_id, row.cycle_id, row.min_price, row.max_price,
+                   row.page_offset, row.page_number, row.attempts)
+
+    def __repr__(self):
+        return (f"<WorkItem(id={self.work_id}, cycle={self.cycle_id}, "
+                f"range={self.min_price}-{self.max_price}, offset={self.page_offset})>")
+
+
+class PostgresWorkQueue:
+    """
+    Lease-based work queue on top of the existing Postgres schema.
+    - claim(): pending -> leased (attempts + 1, lease_expires_at = now() + lease)
+    - heartbeat(): extends the lease while the page is being processed
+    - complete(): leased -> done, optionally publishing the next page
+    - fail()/release(): back to pending (with a backoff) or failed after max_attempts
+    - reclaim_expired(): leases of dead workers go back to pending
+    Every transition checks lease_owner, so a worker that lost its lease
+    cannot overwrite the state written by the new owner.
+    """
+
+    def __init__(self, engine, worker_id: str, lease_seconds: int = 120, max_attempts: int = 3,
+                 retry_backoff_seconds: int = 30):
+        self.engine = engine
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    # =========== Coordinator side =========== #
+
+    def open_cycle(self, price_ranges: Iterable[Tuple[int, int]]) -> Tuple[int, bool]:
+        """
+        Returns (cycle_id, resumed). Resumes the cycle still marked as running
+        (coordinator restart), otherwise publishes a new one after the highest cycle_id.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CYCLE_LOCK_KEY})
+            running = conn.execute(text(
+                "SELECT cycle_id FROM dim_scraper_metadata "
+                "WHERE cycle_status = :running ORDER BY cycle_id DESC LIMIT 1"
+            ), {"running": CYCLE_RUNNING}).scalar()
+            if running is not None:
+                return running, True
+            cycle_id = conn.execute(text(
+                "SELECT COALESCE(MAX(cycle_id), 0) + 1 FROM dim_scraper_metadata"
+            )).scalar()
+            self._publish(conn, cycle_id, price_ranges)
+        return cycle_id, False
+
+    def publish_cycle(self, cycle_id: int, price_ranges: Iterable[Tuple[int, int]]):
+        """Registers the cycle in dim_scraper_metadata and enqueues page 1 of every range"""
+        with self.engine.begin() as conn:
+            self._publish(conn, cycle_id, price_ranges)
+
+    def _publish(self, conn, cycle_id: int, price_ranges: Iterable[Tuple[int, int]]):
+        conn.execute(text(
+            "INSERT INTO dim_scraper_metadata (cycle_id, price_range_searched, cycle_start, cycle_status) "
+            "VALUES (:cycle_id, 'distributed', now(), :running) "
+            "ON CONFLICT (cycle_id) DO UPDATE SET cycle_status = :running, cycle_end = NULL"
+        ), {"cycle_id": cycle_id, "running": CYCLE_RUNNING})
+        rows = [{"cycle_id": cycle_id, "min_price": lo, "max_price": hi, "page_offset": 1, "page_number": 1}
+                for lo, hi in price_ranges]
+        if rows:
+            conn.execute(_INSERT_WORK_ITEM, rows)
+
+    def reclaim_expired(self) -> int:
+        """Expired leases (crashed or stuck workers) go back to pending, or to failed after max_attempts"""
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET status = CASE WHEN attempts >= :max_attempts THEN :failed ELSE :pending END,
+                    last_error = 'lease expired (owner ' || COALESCE(lease_owner, '?') || ')',
+                    lease_expires_at = NULL
+                WHERE status = :leased AND lease_expires_at < now()
+                """
+            ), {"max_attempts": self.max_attempts, "failed": STATUS_FAILED,
+                "pending": STATUS_PENDING, "leased": STATUS_LEASED})
+            return result.rowcount
+
+    def finalize_cycle(self, cycle_id: int) -> bool:
+        """Marks the cycle completed in dim_scraper_metadata once no work is pending or leased"""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                """
+                UPDATE dim_scraper_metadata
+                SET cycle_status = :completed, cycle_end = now()
+                WHERE cycle_id = :cycle_id
+                  AND cycle_status = :running
+                  AND NOT EXISTS (
+                      SELECT 1 FROM crawl_work_queue
+                      WHERE cycle_id = :cycle_id AND status IN (:pending, :leased)
+                  )
+                """
+            ), {"cycle_id": cycle_id, "completed": CYCLE_COMPLETED, "running": CYCLE_RUNNING,
+                "pending": STATUS_PENDING, "leased": STATUS_LEASED})
+            status = conn.execute(text(
+                "SELECT cycle_status FROM dim_scraper_metadata WHERE cycle_id = :cycle_id"
+            ), {"cycle_id": cycle_id}).scalar()
+        return status == CYCLE_COMPLETED
+
+    def cycle_progress(self, cycle_id: int) -> Dict[str, int]:
+        """Work item counts per status plus the items written so far"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT status, COUNT(*) AS n, COALESCE(SUM(items_found), 0) AS items "
+                "FROM crawl_work_queue WHERE cycle_id = :cycle_id GROUP BY status"
+            ), {"cycle_id": cycle_id}).all()
+        progress = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+        progress["items"] = 0
+        for row in rows:
+            progress[row.status] = row.n
+            progress["items"] += int(row.items)
+        return progress
+
+    def has_open_work(self) -> bool:
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM crawl_work_queue WHERE status IN (:pending, :leased))"
+            ), {"pending": STATUS_PENDING, "leased": STATUS_LEASED}).scalar()
+
+    # =========== Worker side =========== #
+
+    def claim(self) -> Optional[WorkItem]:
+        """Leases the oldest available item; concurrent workers skip rows locked by others"""
+        with self.engine.begin() as conn:
+            row = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET status = :leased,
+                    lease_owner = :owner,
+                    attempts = attempts + 1,
+                    heartbeat_at = now(),
+                    lease_expires_at = now() + :lease_seconds * INTERVAL '1 second'
+                WHERE work_id = (
+                    SELECT work_id FROM crawl_work_queue
+                    WHERE status = :pending AND (not_before IS NULL OR not_before <= now())
+                    ORDER BY cycle_id, work_id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING work_id, cycle_id, min_price, max_price, page_offset, page_number, attempts
+                """
+            ), {"leased": STATUS_LEASED, "pending": STATUS_PENDING, "owner": self.worker_id,
+                "lease_seconds": self.lease_seconds}).first()
+        return WorkItem.from_row(row) if row else None
+
+    def heartbeat(self, item: WorkItem) -> bool:
+        """Extends the lease. False means the lease was lost (expired and reclaimed)"""
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET heartbeat_at = now(), lease_expires_at = now() + :lease_seconds * INTERVAL '1 second'
+                WHERE work_id = :work_id AND lease_owner = :owner AND status = :leased
+                """
+            ), {"work_id": item.work_id, "owner": self.worker_id, "leased": STATUS_LEASED,
+                "lease_seconds": self.lease_seconds})
+            return result.rowcount == 1
+
+    def complete(self, item: WorkItem, items_found: int, next_offset: Optional[int] = None) -> bool:
+        """
+        Marks the item done and, when the page had cards, publishes the next page
+        of the range in the same transaction. False means the lease was lost.
+        """
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET status = :done, items_found = :items, completed_at = now(), lease_expires_at = NULL
+                WHERE work_id = :work_id AND lease_owner = :owner AND status = :leased
+                """
+            ), {"done": STATUS_DONE, "items": items_found, "work_id": item.work_id,
+                "owner": self.worker_id, "leased": STATUS_LEASED})
+            if result.rowcount != 1:
+                return False
+            if next_offset is not None:
+                conn.execute(_INSERT_WORK_ITEM, {
+                    "cycle_id": item.cycle_id, "min_price": item.min_price, "max_price": item.max_price,
+                    "page_offset": next_offset, "page_number": item.page_number + 1,
+                })
+        return True
+
+    def fail(self, item: WorkItem, error: str) -> bool:
+        """Returns the item to the queue with a linear backoff, or fails it after max_attempts"""
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET status = CASE WHEN attempts >= :max_attempts THEN :failed ELSE :pending END,
+                    not_before = now() + attempts * :backoff * INTERVAL '1 second',
+                    last_error = :error,
+                    lease_expires_at = NULL
+                WHERE work_id = :work_id AND lease_owner = :owner AND status = :leased
+                """
+            ), {"max_attempts": self.max_attempts, "failed": STATUS_FAILED, "pending": STATUS_PENDING,
+                "backoff": self.retry_backoff_seconds, "error": error[:500], "work_id": item.work_id,
+                "owner": self.worker_id, "leased": STATUS_LEASED})
+            return result.rowcount == 1
+
+    def release(self, item: WorkItem, reason: str) -> bool:
+        """
+        Gives the item back without consuming an attempt (e.g. this worker's exit
+        got a captcha, another worker may still fetch the page).
+        """
+        with self.engine.begin() as conn:
+            result = conn.execute(text(
+                """
+                UPDATE crawl_work_queue
+                SET status = :pending, attempts = GREATEST(attempts - 1, 0),
+                    last_error = :reason, lease_expires_at = NULL
+                WHERE work_id = :work_id AND lease_owner = :owner AND status = :leased
+                """
+            ), {"pending": STATUS_PENDING, "reason": reason[:500], "work_id": item.work_id,
+                "owner": self.worker_id, "leased": STATUS_LEASED})
+            return result.rowcount == 1
+
+
+class LeaseHeartbeat:
+    """
+    Keeps a lease alive from a daemon thread while the page is processed
+    (politeness sleep + fetch + parse can outlast a short lease).
+    `lost` turns True if the database no longer recognizes us as the owner.
+    """
+
+    def __init__(self, queue: PostgresWorkQueue, item: WorkItem, interval: Optional[float] = None):
+        self.queue = queue
+        self.item = item
+        self.interval = interval if interval is not None else max(1.0, queue.lease_seconds / 3)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.item):
+                    self.lost = True
+                    return
+            except Exception:
+                # Transient DB error: keep trying until the lease really expires
+                continue
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread = threading.Thread(target=self._run, name=f"lease-{self.item.work_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
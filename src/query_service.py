@@ -0,0 +1,349 @@
+import csv
+import io
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.database.queries import QUERIES, data_version_sql, get_query
+from src.monitoring.logger import structured_logger
+from src.monitoring.metrics import metrics
+
+# ==============================================================================
+# READ-ONLY QUERY SERVICE (SCRAPER_ROLE=query)
+# ==============================================================================
+# Serves the canned queries of src/database/queries.py over HTTP:
+#   GET /queries                          -> endpoint catalogue
+#   GET /queries/<name>?param=...         -> JSON array (or ?format=csv)
+#   GET /search?q=s23 ultra&page=1        -> ranked products + latest offers (src/database/search.py)
+#   GET /health                           -> {"status": "ok", "data_version": [...]}
+# Rows are streamed with chunked transfer encoding straight from a server-side
+# cursor, on read-only transactions. Finished results are kept in an LRU cache
+# keyed by endpoint + parameters + format and tagged with the warehouse data
+# version (latest cycle_id, latest offer_id): the cache is flushed when it moves.
+
+STREAM_BATCH_ROWS = 500
+FORMATS = {"json": "application/json; charset=utf-8", "csv": "text/csv; charset=utf-8"}
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+class QueryCache:
+    """Thread-safe LRU of rendered bodies, emptied whenever the data version changes"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version: Optional[Tuple] = None
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple, body: bytes, version: Tuple):
+        """Stores `body` unless it was computed against an older data version"""
+        with self._lock:
+            if version != self.version or self.max_entries <= 0:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_version(self, version: Tuple) -> bool:
+        """Returns True when the version moved and the cache was flushed"""
+        with self._lock:
+            if version == self.version:
+                return False
+            changed = self.version is not None
+            self.version = version
+            self._entries.clear()
+            return changed
+
+
+class QueryService:
+    """Executes canned queries against `engine` and renders them as byte chunks"""
+
+    def __init__(self, engine, cache: Optional[QueryCache] = None, version_check_seconds: float = 5.0,
+                 max_entry_bytes: int = 2 * 1024 * 1024, clock: Callable[[], float] = time.monotonic):
+        self.engine = engine
+        self.cache = cache if cache is not None else QueryCache()
+        self.version_check_seconds = version_check_seconds
+        self.max_entry_bytes = max_entry_bytes
+        self._clock = clock
+        self._checked_at: Optional[float] = None
+        self._version_lock = threading.Lock()
+        self._version_sql: Optional[str] = None
+
+    def _read_only(self, connection):
+        # postgresql_readonly: SET TRANSACTION READ ONLY (ignored by other dialects)
+        return connection.execution_options(postgresql_readonly=True)
+
+    def data_version(self) -> Tuple:
+        """Current warehouse version, re-read at most every `version_check_seconds`"""
+        from sqlalchemy import inspect, text
+        with self._version_lock:
+            now = self._clock()
+            if self._checked_at is None or now - self._checked_at >= self.version_check_seconds:
+                with self.engine.connect() as connection:
+                    if self._version_sql is None:
+                        # Warehouses not yet upgraded have no retention manifest (checked once per process)
+                        self._version_sql = data_version_sql(inspect(connection).has_table("fact_offers_archive"))
+                    version = tuple(self._read_only(connection).execute(text(self._version_sql)).one())
+                self._checked_at = now
+                if self.cache.set_version(version):
+                    metrics.query_cache_invalidations_total.inc()
+                    structured_logger.log_business_event("query_cache_invalidated", data_version=list(version))
+            return self.cache.version
+
+    @staticmethod
+    def cache_key(name: str, params: Dict[str, Any], fmt: str) -> Tuple:
+        return (name, tuple(sorted(params.items())), fmt)
+
+    def _rows(self, sql: str, params: Dict[str, Any]) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """(columns, batch) pairs from a server-side cursor"""
+        from sqlalchemy import text
+        with self.engine.connect() as connection:
+            connection = self._read_only(connection).execution_options(stream_results=True, yield_per=STREAM_BATCH_ROWS)
+            result = connection.execute(text(sql), params)
+            columns = list(result.keys())
+            yield columns, [] # Lets the CSV header out even for an empty result
+            for batch in result.partitions():
+                yield columns, batch
+
+    def render(self, name: str, params: Dict[str, Any], fmt: str) -> Iterator[bytes]:
+        """Encoded body chunks: one per cursor batch (plus the JSON/CSV framing)"""
+        query = QUERIES[name]
+        if fmt == "csv":
+            header_written = False
+            for columns, batch in self._rows(query.sql, params):
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                if not header_written:
+                    writer.writerow(columns)
+                    header_written = True
+                writer.writerows(batch)
+                yield buffer.getvalue().encode("utf-8")
+            return
+
+        # Like the CSV branch, the SQL runs before the first byte (errors still become a 500)
+        rows = self._rows(query.sql, params)
+        head = next(rows)
+        yield b"["
+        first = True
+        for columns, batch in itertools.chain([head], rows):
+            parts = []
+            for row in batch:
+                record = {column: _jsonable(value) for column, value in zip(columns, row)}
+                parts.append(("" if first else ",") + json.dumps(record, ensure_ascii=False))
+                first = False
+            if parts:
+                yield "".join(parts).encode("utf-8")
+        yield b"]"
+
+    def execute(self, name: str, params: Dict[str, Any], fmt: str) -> Tuple[str, Iterator[bytes]]:
+        """
+        Returns ("hit" | "miss", chunks). Misses are cached on the fly when the
+        full body stays under `max_entry_bytes` and the data version did not move.
+        """
+        version = self.data_version()
+        key = self.cache_key(name, params, fmt)
+        body = self.cache.get(key)
+        if body is not None:
+            return "hit", iter([body])
+
+        def stream() -> Iterator[bytes]:
+            kept: Optional[List[bytes]] = []
+            size = 0
+            for chunk in self.render(name, params, fmt):
+                if kept is not None:
+                    size += len(chunk)
+                    if size <= self.max_entry_bytes:
+                        kept.append(chunk)
+                    else:
+                        kept = None # Too large to cache: keep streaming only
+                yield chunk
+            if kept is not None:
+                self.cache.put(key, b"".join(kept), version)
+
+        return "miss", stream()
+
+    def search(self, query: str, page: int, page_size: int, offers: int) -> Tuple[str, bytes]:
+        """("hit" | "miss", JSON body) of a title search, cached like the canned queries"""
+        from src.database.search import search_products
+        version = self.data_version()
+        key = self.cache_key("search", {"q": query, "page": page, "page_size": page_size, "offers": offers}, "json")
+        body = self.cache.get(key)
+        if body is not None:
+            return "hit", body
+        payload = search_products(self.engine, query, page=page, page_size=page_size, offers_per_product=offers)
+        body = json.dumps(payload, ensure_ascii=False, default=_jsonable).encode("utf-8")
+        if len(body) <= self.max_entry_bytes:
+            self.cache.put(key, body, version)
+        return "miss", body
+
+    @classmethod
+    def from_config(cls, engine) -> "QueryService":
+        from src.monitoring.settings import MonitoringConfig
+        return cls(
+            engine,
+            cache=QueryCache(MonitoringConfig.QUERY_CACHE_MAX_ENTRIES),
+            version_check_seconds=MonitoringConfig.QUERY_VERSION_CHECK_SECONDS,
+            max_entry_bytes=MonitoringConfig.QUERY_CACHE_MAX_ENTRY_BYTES,
+        )
+
+
+# =========== HTTP layer =========== #
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Needed for chunked transfer encoding
+    service: QueryService = None # Set by build_server()
+
+    def log_message(self, format, *args):
+        pass # Requests are reported through Prometheus instead of stderr
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", FORMATS["json"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self):
+        super().end_headers()
+        self._response_started = True
+
+    def _write_chunk(self, chunk: bytes):
+        if chunk:
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+
+    def do_GET(self):
+        start_time = time.perf_counter()
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        endpoint, status, cache = "unknown", 200, "none"
+        self._response_started = False
+        try:
+            if path == "/health":
+                endpoint = "health"
+                self._send_json(200, {"status": "ok", "data_version": list(self.service.data_version())})
+            elif path == "/search":
+                endpoint = "search"
+                status, cache = self._serve_search(dict(parse_qsl(url.query, keep_blank_values=True)))
+            elif path == "/queries":
+                endpoint = "catalogue"
+                self._send_json(200, {
+                    name: {"description": q.description, "params": sorted(q.params)} for name, q in QUERIES.items()
+                })
+            elif path.startswith("/queries/") and get_query(path[len("/queries/"):]):
+                endpoint = path[len("/queries/"):]
+                status, cache = self._serve_query(endpoint, dict(parse_qsl(url.query, keep_blank_values=True)))
+            else:
+                status = 404
+                self._send_json(404, {"error": f"unknown endpoint '{url.path}'", "endpoints": sorted(QUERIES)})
+        except Exception as e:
+            status = 500
+            structured_logger.log_error(error=e, context={"scope": "query_service", "path": self.path})
+            # Once the headers are out (mid-stream failure) the only signal left is closing the connection
+            if not self._response_started:
+                self._send_json(500, {"error": "internal error"})
+            self.close_connection = True
+        finally:
+            metrics.record_query(endpoint, status, cache, time.perf_counter() - start_time)
+
+    def _serve_search(self, raw_params: Dict[str, str]) -> Tuple[int, str]:
+        try:
+            page, page_size, offers = (int(raw_params.get(name, default)) for name, default in
+                                       (("page", 1), ("page_size", 20), ("offers", 3)))
+            cache, body = self.service.search(raw_params.get("q", ""), page, page_size, offers)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return 400, "none"
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS["json"])
+        self.send_header("X-Cache", cache.upper())
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return 200, cache
+
+    def _serve_query(self, name: str, raw_params: Dict[str, str]) -> Tuple[int, str]:
+        fmt = raw_params.get("format", "json")
+        try:
+            if fmt not in FORMATS:
+                raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+            params = QUERIES[name].bind(raw_params)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return 400, "none"
+
+        cache, chunks = self.service.execute(name, params, fmt)
+        # The first chunk is pulled before the headers, so SQL errors still get a proper 500
+        first = next(chunks, b"")
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[fmt])
+        self.send_header("X-Cache", cache.upper())
+        if cache == "hit":
+            self.send_header("Content-Length", str(len(first)))
+            self.end_headers()
+            self.wfile.write(first)
+            return 200, cache
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._write_chunk(first)
+            for chunk in chunks:
+                self._write_chunk(chunk)
+        except Exception:
+            # Headers are gone: dropping the connection without the final chunk
+            # is the only way to tell the client the body is incomplete
+            self.close_connection = True
+            raise
+        self.wfile.write(b"0\r\n\r\n")
+        return 200, cache
+
+
+def build_server(service: QueryService, host: str = "0.0.0.0", port: int = 8080) -> ThreadingHTTPServer:
+    """HTTP server bound to (host, port); port 0 picks a free one (server.server_address)"""
+    handler = type("BoundQueryRequestHandler", (QueryRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_query_service():
+    """Entry point of SCRAPER_ROLE=query: serves forever on QUERY_HOST:QUERY_PORT"""
+    from src.database.connection import engine
+    from src.monitoring.settings import MonitoringConfig
+
+    server = build_server(QueryService.from_config(engine), MonitoringConfig.QUERY_HOST, MonitoringConfig.QUERY_PORT)
+    structured_logger.log_business_event(
+        "query_service_started",
+        address=f"{MonitoringConfig.QUERY_HOST}:{MonitoringConfig.QUERY_PORT}",
+        endpoints=sorted(QUERIES),
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -3,144 +3,605 @@ import sys
 import time
 import random
 import logging
-import requests
-import pandas as pd
-from threading import Thread
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 
 # ==============================================================================
 # ENVIRONMENT AND DIRECTORY SETUP
 # ==============================================================================
+# Importing this module has NO side effects: no metrics server, no loguru
+# reconfiguration, no business events, and requests/BeautifulSoup/pandas are
+# only imported once a cycle actually runs. The process entry point that wires
+# logging, metrics and the loop lives in src/app.py.
+
 # Current Path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 if project_root not in sys.path:
     sys.path.append(project_root)
-    
-try:
-    # Importing Enterprise Monitoring Classes
-    from src.monitoring.logger import structured_logger
-    from src.monitoring.metrics import metrics, BusinessEventTracker
-    from src.monitoring.settings import MonitoringConfig
-    # Loguru for generic info logs to keep consistency
-    from loguru import logger
-except ImportError as e:
-    print(f"\n🚨 CRITICAL IMPORT ERROR: {e}")
-    # DEBUGGING STRATEGY:
-    # If running via Pytest, do NOT execute sys.exit().
-    # This allows the test framework to capture and display the actual missing file error
-    # instead of just dying silently with "SystemExit: 1".
-    if "pytest" not in sys.modules:
-        sys.exit(1)
 
-# ==============================================================================
-# PROMETHEUS SERVER SETUP
-# ==============================================================================
-from prometheus_client import start_http_server
+# Importing Enterprise Monitoring Classes
+from src.monitoring.logger import structured_logger
+from src.monitoring.metrics import metrics, BusinessEventTracker
+from src.monitoring.settings import MonitoringConfig
+from src.monitoring.stages import stage_timer
+from src.monitoring.profiler import CycleProfiler
+from src.monitoring.resources import resource_sampler
+from src.pipeline.checkpoint import CheckpointStore, CycleCheckpoint, resolve_starting_cycle
+from src.pipeline.dedup import ListingDedupIndex
+from src.pipeline.identifiers import extract_item_id, listing_key
+from src.pipeline.storage import append_batch, ensure_csv
+from src.pipeline.extraction import find_cards, extract_link, parse_card_fields
+from src.pipeline.egress import EgressPool
+from src.pipeline.retry import PageTask, RetryQueue, CycleCoverage
+from src.pipeline.validation import offer_validator, QuarantineWriter
+from src.pipeline.enrichment import EnrichmentBlocked, EnrichmentCache, EnrichmentStage
+from src.pipeline.price_alerts import PriceAlertStage
+from src.pipeline.targets import price_ranges, get_random_header, build_page_url, PAGE_SIZE, MAX_OFFSET
+# Loguru for generic info logs to keep consistency
+from loguru import logger
 
-def start_metrics_server():
-    """Start the Prometheus metrics server in a background thread"""
-    try:
-        metrics_port = 9090
-        logger.info(f"Starting Prometheus Metrics Server on Port {metrics_port}...")
-        start_http_server(metrics_port)
-    except Exception as e:
-        logger.error(f"Failed to start metrics server: {e}")
+# Raw data Collected from Mercado Livrea
+data_raw_dir = os.path.join(current_dir, "..", "data", "raw")
 
-# Start metrics in a background thread so it doesn't block the scraper
-metrics_thread = Thread(target=start_metrics_server, daemon=True)
-metrics_thread.start()
+# DEFAULT CONFIGURATION
+DEFAULT_CSV_PATH = os.path.join(data_raw_dir, "samsung_market_data.csv")
+
+# Rejected rows (schema validation) are kept aside with their reason codes
+quarantine = QuarantineWriter(MonitoringConfig.QUARANTINE_DIR)
 
 # ==============================================================================
-# ENVIRONMENT SETUP
+# MAIN LOGIC
 # ==============================================================================
 
-# Raw data Collected from Mercado Livrea
-data_raw_dir = os.path.join(current_dir, "..", "data", "raw")
+class PageOutcome:
+    """
+    What happened to one listing page. The standalone loop and the distributed
+    worker (src/distributed.py) decide pagination from it.
+    """
+    
+    OK = "ok"
+    EMPTY = "empty" # No cards: end of pagination for the range
+    HTTP_ERROR = "http_error"
+    NETWORK_ERROR = "network_error" # RequestException (timeouts, resets, DNS)
+    CAPTCHA = "captcha"
+    
+    def __init__(self, status: str, status_code: int = 200, cards: int = 0, items: int = 0, new_listings: int = 0,
+                 route: str = None, listings=None):
+        self.status = status
+        self.status_code = status_code
+        self.cards = cards
+        self.items = items
+        self.new_listings = new_listings
+        self.route = route # Egress route name (None without an egress pool)
+        self.listings = listings or [] # (item_id, link) of the rows written (enrichment candidates)
 
-# Setup log
-log_dir = os.path.join(current_dir, "..", "logs")
 
-# Log filename with timestamp
-log_filename = os.path.join(log_dir, f"scraper_samsung_{datetime.now().strftime('%Y%m%d')}.log")
+def apply_captcha_penalty():
+    """Soft ban detected: log it and back off for 15 minutes"""
+    # [MONITORING] Log Error Event
+    structured_logger.log_error(
+        error=Exception("Soft Ban Detected"),
+        context={"action": "sleeping_15_min", "trigger": "captcha_text"}
+    )
+    logging.critical("BLOCK DETECTED (CAPTCHA)! Sleeping for 15 MINUTES...")
+    with stage_timer.stage("captcha_penalty"):
+        time.sleep(900) # 15 minutes penalty
 
-# Final CSV file
-csv_file_path = os.path.join(data_raw_dir, "samsung_market_data.csv")
 
-# DEFAULT CONFIGURATION
-DEFAULT_CSV_PATH = os.path.join(data_raw_dir, "samsung_market_data.csv")
+def handle_captcha(outcome, egress=None):
+    """
+    Without an egress pool the whole process serves the 15 minute penalty.
+    With a pool only the blocked route cools down and the page is retried on another exit.
+    """
+    if egress is None:
+        apply_captcha_penalty()
+        return
+    structured_logger.log_error(
+        error=Exception("Soft Ban Detected"),
+        context={"action": "route_cooldown", "route": outcome.route, "trigger": "captcha_text"}
+    )
 
-# Logging Configuration
-structured_logger.log_business_event(
-    event_name="scraper_initialization",
-    context={
-        "csv_path": str(csv_file_path),
-        "log_dir": str(MonitoringConfig.LOG_FILE_PATH)
-    }
-)
 
-# ==============================================================================
-# SCRAPING CONFIGURATION
-# ==============================================================================
+def _report_route(egress, route, **outcome):
+    if route is None:
+        return
+    result = egress.report(route, **outcome)
+    metrics.record_egress(route.name, result, route.health)
 
-# Rotational User Agents (To avoid SOFT BANS!)
-user_agents = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0"
-]
 
-def get_random_header():
-    return {
-        "User-Agent" : random.choice(user_agents),
-        "Accept" : "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",    
-        "Referer": "https://www.google.com/"
-    }
+def fetch_page(target_url, egress=None, endpoint="mercadolivre_search"):
+    """
+    Waits for the request budget and GETs one page: the random politeness sleep,
+    or the egress pool's route budget when a pool is set. Listing and product
+    pages (enrichment) share this path, so both draw from the same budget.
+    Returns (response, route); network errors are reported to the route and re-raised.
+    """
+    import requests
     
-# Price Range Configuration (Granular strategy for 10k records)
-# Focus: Mobile Phones (Starting from 0 BRL to 20000 BRL)
-price_ranges = []
+    route = None
+    http = requests
+    if egress is None:
+        # Random Sleep (CRITICAL for 24/7 operation on VPS)
+        sleep_time = random.uniform(2.5, 5.0)
+        with stage_timer.stage("politeness_sleep"):
+            time.sleep(sleep_time)
+    else:
+        # Per-route token bucket (+ jitter) paces each exit
+        with stage_timer.stage("politeness_sleep"):
+            route, _ = egress.acquire()
+        http = route.session
+    
+    # [MONITORING] Track Request Latency using MetricsCollector
+    req_start = time.time()
+    try:
+        with stage_timer.stage("fetch"):
+            response = http.get(target_url, headers=get_random_header(), timeout=20)
+    except requests.exceptions.RequestException:
+        _report_route(egress, route, error=True)
+        raise
+    req_duration = time.time() - req_start
+    
+    # Log request metrics to Prometheus
+    metrics.record_http_request(
+        method="GET",
+        endpoint=endpoint,
+        status_code=response.status_code,
+        duration=req_duration
+    )
+    
+    # Log request to JSON log
+    structured_logger.log_http_request(  # <--- CORRECTING _http_
+        method="GET",
+        url=target_url, 
+        status_code=response.status_code,
+        duration=req_duration
+    )
+    return response, route
 
-# Low/Mid Range (High density of products) - STEP 50
-for p in range(0, 2500, 50): 
-    price_ranges.append((p, p + 49))
 
-# High Range (e.g: S22, S23, S24) - STEP 100
-# CORREÇÃO CRÍTICA: Removida a vírgula extra que causava o erro "too many values to unpack"
-for p in range(2500, 6000, 100): 
-    price_ranges.append((p, p + 99))
+def scrape_page(min_price, max_price, offset, page_number, cycle_id, dedup_index, output_file,
+                egress=None, alerts=None) -> PageOutcome:
+    """
+    Fetches one listing page, parses its cards and appends the new rows to the CSV.
+    With an EgressPool the request leaves through the healthiest route with
+    budget left, and the pool's wait replaces the fixed politeness sleep.
+    With a PriceAlertStage the validated rows are checked for price moves right away.
+    Network errors (requests.exceptions.RequestException) propagate to the caller.
+    """
+    from bs4 import BeautifulSoup
+    
+    # Pagination URL Construction
+    target_url = build_page_url(min_price, max_price, offset)
+    
+    response, route = fetch_page(target_url, egress)
+    fetched_at = time.time()
+    route_name = route.name if route else None
+    
+    # Check Status Code
+    if response.status_code != 200:
+        _report_route(egress, route, status_code=response.status_code)
+        return PageOutcome(PageOutcome.HTTP_ERROR, status_code=response.status_code, route=route_name)
+    
+    with stage_timer.stage("parse_html"):
+        soup = BeautifulSoup(response.content, "html.parser")
+    
+    # Anti-Bot Detection Check (Captcha)
+    with stage_timer.stage("captcha_check"):
+        page_text = soup.get_text().lower()
+    if "human" in page_text or "captcha" in page_text:
+        _report_route(egress, route, captcha=True)
+        return PageOutcome(PageOutcome.CAPTCHA, route=route_name)
+    _report_route(egress, route, status_code=response.status_code)
+    
+    # Hybrid Selector Strategy (Grid vs List Layouts)
+    with stage_timer.stage("find_cards"):
+        cards, layout_type = find_cards(soup)
+    
+    # [MONITORING] Page shape: payload size and cards per page
+    metrics.record_page_shape(response_bytes=len(response.content), cards=len(cards))
+    
+    if not cards:
+        return PageOutcome(PageOutcome.EMPTY, route=route_name)
+    
+    # Batch Data Processing
+    batch_data = []
+    new_listings_page = 0
+    extraction_started = stage_timer.start()
+    
+    for card in cards:
+        try:
+            # ==========================
+            # DATA EXTRACTION
+            # ==========================
+            
+            # 1. Link (Primary Key)
+            link_clean = extract_link(card)
+            
+            # Marketplace ID (e.g. /p/MLB32174378 -> 32174378): compact natural key
+            item_id = extract_item_id(link_clean)
+            
+            is_duplicate, is_new_listing = dedup_index.observe(listing_key(link_clean, item_id))
+            if is_duplicate:
+                continue
+            if is_new_listing:
+                new_listings_page += 1
+            
+            # 2..9 Title, seller, price, installments, shipping, highlights
+            card_fields = parse_card_fields(card)
+            
+            # Timestamp
+            extraction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Dictionary
+            item_data = {
+                "extraction_date": extraction_date,
+                "cycle_id": cycle_id,
+                **card_fields,
+                "link": link_clean,
+                "layout_type": layout_type,
+                "price_range_searched": f"{min_price}-{max_price}",
+                "item_id": item_id if item_id is not None else ""
+            }
+            
+            batch_data.append(item_data)
+            
+        except Exception as e_inner:
+            # [Monitoring] log inner Loop error
+            structured_logger.log_error(error=e_inner, context={"scope": "card_extraction"})
+            continue
+    
+    stage_timer.stop("card_extraction", extraction_started)
+    
+    # [GARBAGE REJECTION] Whole page validated in one call against the offer schema
+    with stage_timer.stage("validation"):
+        batch_data, rejected = offer_validator.validate_batch(batch_data)
+    if rejected:
+        metrics.record_rejections(rejected)
+        quarantine.write(rejected, context={"cycle_id": cycle_id, "page_offset": offset})
+        structured_logger.log_aggregated_event("rows_rejected", rows=len(rejected), page=page_number)
+    
+    # [PRICE ALERTS] Drops/rises against each SKU's last known price, seconds after the fetch
+    if alerts is not None and batch_data:
+        try:
+            with stage_timer.stage("price_alerts"):
+                events = alerts.process(batch_data, fetched_at)
+            if events:
+                metrics.record_price_alerts(events)
+        except Exception as e_alerts:
+            structured_logger.log_error(error=e_alerts, context={"scope": "price_alerts"})
+    
+    # ################################
+    # INCREMENTAL SAVING (APPEND MODE)
+    # ################################
+    
+    items_count = 0
+    if batch_data:
+        try:
+            # CORRECTION: mode="a" to append (persistency)
+            items_count = append_batch(batch_data, output_file)
+            
+            #[MONITORING] track items and Page Progress
+            BusinessEventTracker.track_items(items_count)
+            
+            # Track Page
+            BusinessEventTracker.track_scraping_progress(
+                page_number=page_number,
+                items_found=items_count,
+                total_pages=40,
+                new_listings=new_listings_page
+            )
+            
+        except Exception as e_csv:
+            structured_logger.log_error(error=e_csv, context={"scope": "csv_saving", "file": output_file})
+    
+    listings = [(row["item_id"], row["link"]) for row in batch_data if items_count and row["item_id"] != ""]
+    return PageOutcome(PageOutcome.OK, cards=len(cards), items=items_count, new_listings=new_listings_page,
+                       route=route_name, listings=listings)
 
-# Premium/Foldables - STEP 500
-for p in range(6000, 20000, 500): 
-    price_ranges.append((p, p + 499))
 
-logging.info(f"Scraping Configuration Loaded. Total Price Ranges: {len(price_ranges)}")
+def fetch_product_page(link, egress=None):
+    """
+    Enrichment fetch of one product page, drawing from the listing pages' budget.
+    Returns the parsed page, None for a non-200 answer; raises EnrichmentBlocked on a captcha.
+    """
+    from bs4 import BeautifulSoup
+    
+    response, route = fetch_page(link, egress, endpoint="mercadolivre_product")
+    if response.status_code != 200:
+        _report_route(egress, route, status_code=response.status_code)
+        return None
+    soup = BeautifulSoup(response.content, "html.parser")
+    # Product descriptions are free text: only a page without a title can be a block page
+    page_text = soup.get_text().lower()
+    if soup.find("h1") is None and ("human" in page_text or "captcha" in page_text):
+        _report_route(egress, route, captcha=True)
+        raise EnrichmentBlocked(link)
+    _report_route(egress, route, status_code=response.status_code)
+    return soup
 
-# ==============================================================================
-# MAIN LOGIC
-# ==============================================================================
 
-def main_loop(single_run=False, output_file=DEFAULT_CSV_PATH):
+def build_price_alerts():
+    """PriceAlertStage (SCRAPER_PRICE_ALERTS=1), warm-started from the warehouse when DB_* is set, or None"""
+    if not MonitoringConfig.PRICE_ALERTS_ENABLED:
+        return None
+    try:
+        engine = None
+        if MonitoringConfig.get_db_url():
+            from src.database.connection import engine
+        alerts = PriceAlertStage.from_config(engine)
+    except Exception as e:
+        # Cold start: the index fills up as the crawl sees each SKU
+        structured_logger.log_error(error=e, context={"scope": "price_index_warm_start"})
+        alerts = PriceAlertStage.from_config()
+    structured_logger.log_business_event("price_index_loaded", skus=len(alerts.index))
+    return alerts
+
+
+def build_enrichment_stage(egress=None):
+    """EnrichmentStage over product_enrichment (SCRAPER_ENRICHMENT=1), or None"""
+    if not MonitoringConfig.ENRICHMENT_ENABLED:
+        return None
+    # The engine is created on import, so the DB module is loaded only when enrichment is on
+    from src.database.connection import engine
+    cache = EnrichmentCache(engine)
+    cache.ensure_table()
+    return EnrichmentStage.from_config(cache, fetch=lambda link: fetch_product_page(link, egress))
+
+
+class CycleRun:
+    """
+    Mutable state of one standalone cycle, shared by the range crawler, the
+    retry queue and the checkpoint: where pages go, coverage counters and totals.
+    """
+    
+    def __init__(self, cycle_id, output_file, dedup_index, checkpoint, checkpoint_store=None,
+                 profiler=None, egress=None, retry_queue=None, single_run=False, alerts=None, dedup_index_path=None):
+        self.cycle_id = cycle_id
+        self.output_file = output_file
+        self.dedup_index = dedup_index
+        self.dedup_index_path = dedup_index_path
+        self.checkpoint = checkpoint
+        self.checkpoint_store = checkpoint_store
+        self.profiler = profiler
+        self.egress = egress
+        self.alerts = alerts
+        self.retry_queue = retry_queue if retry_queue is not None else RetryQueue()
+        self.single_run = single_run
+        self.coverage = CycleCoverage(**checkpoint.coverage)
+        self.total_items = checkpoint.total_items
+        self.enrichment_candidates = {} # item_id -> link of every SKU written this cycle
+        # [CHECKPOINT] Pages still owed from before a restart
+        self.retry_queue.restore(checkpoint.pending_retries)
+    
+    def count(self, result: str):
+        """Bumps a CycleCoverage counter ("attempted", "succeeded", "retried", "lost")"""
+        setattr(self.coverage, result, getattr(self.coverage, result) + 1)
+        metrics.record_page_result(result)
+    
+    def attempt(self, task: PageTask) -> PageOutcome:
+        """One fetch of a page (captchas are served and retried in place)"""
+        import requests
+        while True:
+            try:
+                outcome = scrape_page(
+                    task.min_price, task.max_price, task.offset, task.page_number,
+                    self.cycle_id, self.dedup_index, self.output_file, egress=self.egress, alerts=self.alerts
+                )
+            except requests.exceptions.RequestException as e_net:
+                structured_logger.log_error(error=e_net, context={"scope": "network_request", "offset": task.offset})
+                return PageOutcome(PageOutcome.NETWORK_ERROR, status_code=None)
+            if outcome.status != PageOutcome.CAPTCHA:
+                return outcome
+            handle_captcha(outcome, self.egress)
+    
+    @staticmethod
+    def is_transient(outcome: PageOutcome) -> bool:
+        """Network errors and non-200 answers are retried; 404 means the range has no such page"""
+        if outcome.status == PageOutcome.NETWORK_ERROR:
+            return True
+        return outcome.status == PageOutcome.HTTP_ERROR and outcome.status_code != 404
+    
+    def record_success(self, task: PageTask, outcome: PageOutcome, advance_range: bool):
+        self.count("succeeded")
+        if outcome.status != PageOutcome.OK:
+            return
+        self.total_items += outcome.items
+        self.enrichment_candidates.update(outcome.listings)
+        if advance_range:
+            # [CHECKPOINT] Persist progress atomically once the page is on disk
+            self.checkpoint.mark_page_done(
+                task.min_price, task.max_price,
+                next_offset=task.offset + PAGE_SIZE,
+                next_page_number=task.page_number + 1,
+                items=outcome.items
+            )
+        else:
+            self.checkpoint.total_items += outcome.items
+        self.save()
+        if self.profiler:
+            self.profiler.on_page()
+    
+    def defer(self, task: PageTask, outcome: PageOutcome, resume_range: bool = False):
+        """Pushes a failed page to the retry queue (or counts it as lost when out of attempts)"""
+        task.resume_range = task.resume_range or resume_range
+        reason = "network_error" if outcome.status == PageOutcome.NETWORK_ERROR else f"http_{outcome.status_code}"
+        if self.retry_queue.push(task, reason):
+            structured_logger.log_aggregated_event(
+                "page_deferred", offset=task.offset, range=f"{task.min_price}-{task.max_price}",
+                attempts=task.attempts, reason=reason
+            )
+        else:
+            self.count("lost")
+            structured_logger.log_business_event(
+                "page_lost", cycle_id=self.cycle_id, offset=task.offset,
+                range=f"{task.min_price}-{task.max_price}", attempts=task.attempts, reason=reason
+            )
+            # Nothing left to resume the range from: it ends here
+            if task.resume_range:
+                self.close_range(task.min_price, task.max_price)
+        metrics.retry_queue_depth.set(len(self.retry_queue))
+        self.save()
+    
+    def close_range(self, min_price, max_price):
+        """
+        Marks a range done once its pagination is over. A range stopped by the circuit
+        breaker stays open until its deferred page resumes it, so a restart in between
+        neither skips the rest of the range nor fetches it twice.
+        """
+        if not self.retry_queue.resumes_range(min_price, max_price):
+            self.checkpoint.mark_range_done(min_price, max_price)
+    
+    def save(self):
+        # [DEDUP] The all-time index is written first, so after a crash it never knows
+        # less than the checkpointed cycle view (first-seen listings are not re-counted)
+        if self.dedup_index_path and self.dedup_index.unsaved:
+            with stage_timer.stage("checkpoint"):
+                self.dedup_index.save(self.dedup_index_path)
+        if not self.checkpoint_store:
+            return
+        with stage_timer.stage("checkpoint"):
+            self.checkpoint.dedup_state = self.dedup_index.cycle_state()
+            self.checkpoint.pending_retries = self.retry_queue.to_list()
+            self.checkpoint.coverage = self.coverage.counters()
+            self.checkpoint_store.save(self.checkpoint)
+    
+    # =========== Retry queue =========== #
+    
+    def serve_retry(self, task: PageTask):
+        self.count("retried")
+        outcome = self.attempt(task)
+        metrics.retry_queue_depth.set(len(self.retry_queue))
+        if self.is_transient(outcome):
+            self.defer(task, outcome)
+            return
+        # A resumed range restarts after this page
+        self.record_success(task, outcome, advance_range=task.resume_range)
+        if task.resume_range:
+            # The range stopped at this page (circuit breaker): pick pagination back up
+            if outcome.status == PageOutcome.OK and not self.single_run:
+                crawl_range(self, task.min_price, task.max_price, task.offset + PAGE_SIZE, task.page_number + 1)
+            self.close_range(task.min_price, task.max_price)
+            self.save()
+    
+    def serve_due_retry(self):
+        """Between pages: serve one overdue retry if the limiter has spare budget"""
+        if self.egress is not None and not self.egress.has_spare_budget():
+            return
+        task = self.retry_queue.pop_due()
+        if task is not None:
+            self.serve_retry(task)
+    
+    # =========== Enrichment =========== #
+    
+    def enrich(self, stage):
+        """End of cycle: product pages for the cycle's new or stale SKUs (bounded by the stage quota)"""
+        if stage is None or not self.enrichment_candidates:
+            return None
+        try:
+            with stage_timer.stage("enrichment"):
+                summary = stage.run(self.enrichment_candidates)
+        except Exception as e:
+            structured_logger.log_error(error=e, context={"scope": "enrichment", "cycle_id": self.cycle_id})
+            return None
+        metrics.record_enrichment(summary)
+        structured_logger.log_business_event("enrichment_completed", cycle_id=self.cycle_id, **summary)
+        return summary
+    
+    def drain_retries(self):
+        """End of cycle: wait for each backoff and serve every remaining retry"""
+        while len(self.retry_queue):
+            with stage_timer.stage("retry_backoff"):
+                task = self.retry_queue.wait_next()
+            self.serve_retry(task)
+
+
+def crawl_range(run: CycleRun, min_price, max_price, offset, page_number):
+    """
+    Paginates one price range. Transient failures are deferred to the retry
+    queue and pagination moves straight on; after more than 3 consecutive
+    failures the range stops and the deferred page resumes it once it succeeds.
+    """
+    consecutive_errors = 0
+    
+    # Pagination Loop
+    while True:
+        task = PageTask(min_price, max_price, offset, page_number)
+        run.count("attempted")
+        try:
+            outcome = run.attempt(task)
+        except Exception as e_gen:
+            structured_logger.log_error(error=e_gen, context={"scope": "pagination_loop_generic"})
+            run.count("lost")
+            break
+        
+        if run.is_transient(outcome):
+            consecutive_errors += 1
+            stop_range = consecutive_errors > 3
+            logging.warning(f"Page index {offset} failed ({outcome.status} {outcome.status_code}). Deferred to retry queue.")
+            run.defer(task, outcome, resume_range=stop_range)
+            if stop_range:
+                break
+        elif outcome.status == PageOutcome.OK:
+            consecutive_errors = 0
+            run.record_success(task, outcome, advance_range=True)
+        else:
+            # If no cards found (or 404), assume end of pagination for this range
+            run.record_success(task, outcome, advance_range=True)
+            logging.info(f"End of Items for Range R$ {min_price} - {max_price}. Pages Scraped: {offset // PAGE_SIZE}")
+            break
+        
+        # [CHANGE 2] Circuit Breaker for Testing
+        # If testing, force stop after processing the first page (48 items max)
+        if run.single_run:
+            logging.info(f"TEST MODE: Breaking pagination loop after 1st page.")
+            break 
+               
+        # Pagination Increment
+        offset += PAGE_SIZE
+        page_number +=1
+        
+        # Technical Safety Limit (ML usually stops serving after ~2000 items)
+        if offset > MAX_OFFSET:
+            logging.info(f"ML Pagination Limit Reached for this Range.")
+            break
+        
+        # [RETRY QUEUE] Interleave overdue retries when there is budget for them
+        run.serve_due_retry()
+
+
+def main_loop(single_run=False, output_file=DEFAULT_CSV_PATH, checkpoint_path=None, dedup_index_path=None):
     """
     Main function:
     :param single_run: If True, runs only one cycle and stops (Used for testing).
     : param output_file: Path where the CSV will be saved.
+    :param checkpoint_path: Where the cycle checkpoint lives. Defaults to
+        MonitoringConfig.CHECKPOINT_PATH in production; disabled in single_run mode.
+    :param dedup_index_path: Where the all-time seen-listings index lives (same defaults).
     """
     # [CI SAFETY ADJUSTMENT]
     # Ensures the output file exists even if no items are found.
     # This prevents integration tests from failing due to a missing CSV file.
-    if not os.path.exists(output_file):
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        pd.DataFrame (columns=["extraction_date", "title", "price", "link"]).to_csv(
-            output_file, index=False, sep=";"
-        )
+    ensure_csv(output_file)
+    
+    # [CHECKPOINT] Resume the in-flight cycle (or continue after the last one)
+    if checkpoint_path is None and not single_run:
+        checkpoint_path = MonitoringConfig.CHECKPOINT_PATH
+    checkpoint_store = CheckpointStore(checkpoint_path) if checkpoint_path else None
+    
+    if checkpoint_store:
+        checkpoint = resolve_starting_cycle(checkpoint_store, output_file)
+    else:
+        checkpoint = CycleCheckpoint(cycle_id=1)
+    cycle_count = checkpoint.cycle_id
     
-    cycle_count = 1
-    # Maintain "seen_links" per cycle to allow capturing price changes over time
-    seen_links_in_cycle = set()
+    # [DEDUP] Hashed listing index: per-cycle view resets each cycle (to capture
+    # price changes over time), the all-time view flags first-seen SKUs.
+    if dedup_index_path is None and not single_run:
+        dedup_index_path = MonitoringConfig.DEDUP_INDEX_PATH
+    dedup_index = ListingDedupIndex.load(dedup_index_path, use_bloom=MonitoringConfig.DEDUP_BLOOM_ENABLED)
+    dedup_index.restore_cycle_state(checkpoint.dedup_state)
+    is_resumed_cycle = bool(checkpoint.completed_ranges or checkpoint.range_progress or checkpoint.pending_retries)
     
     # Defining price ranges based on the mode
     if single_run:
@@ -150,315 +611,103 @@ def main_loop(single_run=False, output_file=DEFAULT_CSV_PATH):
     else:
         current_price_ranges = price_ranges # Global full ranges
     
+    # [PROFILING] Opt-in cProfile/tracemalloc captures (SCRAPER_PROFILE)
+    profiler = CycleProfiler.from_config()
+    
+    # [EGRESS] Optional pool of exits with per-route budgets (SCRAPER_EGRESS_ROUTES)
+    egress = EgressPool.from_config()
+    
+    # [ENRICHMENT] Optional product-page details for new/stale SKUs (SCRAPER_ENRICHMENT)
+    enrichment = build_enrichment_stage(egress)
+    
+    # [PRICE ALERTS] Optional drop/rise stream emitted during the crawl (SCRAPER_PRICE_ALERTS)
+    alerts = build_price_alerts()
+    
     while True:
         # [MONITORING] Track Cycle Start
         structured_logger.log_business_event(
             event_name="cycle_started",
-            context={"cycle_id": cycle_count}
+            context={"cycle_id": cycle_count, "resumed": is_resumed_cycle}
         )
         
         BusinessEventTracker.track_scraping_start()
         
         start_time = time.time()
-        total_items_cycle = 0 
-        seen_links_in_cycle.clear()
+        profiler.start_cycle(cycle_count)
+        resource_sampler.start_cycle(cycle_count)
+        if not is_resumed_cycle:
+            dedup_index.start_cycle()
+        
+        # [RETRY QUEUE] Failed pages are deferred with exponential backoff + jitter
+        run = CycleRun(
+            cycle_count, output_file, dedup_index, checkpoint, checkpoint_store,
+            profiler=profiler, egress=egress, single_run=single_run, alerts=alerts, dedup_index_path=dedup_index_path,
+            retry_queue=RetryQueue(
+                base_delay=MonitoringConfig.RETRY_BASE_DELAY,
+                max_delay=MonitoringConfig.RETRY_MAX_DELAY,
+                max_attempts=MonitoringConfig.RETRY_MAX_ATTEMPTS
+            )
+        )
         
         for min_price, max_price in current_price_ranges:
+            # [CHECKPOINT] Ranges finished before a restart are not fetched again, nor
+            # ranges that a pending retry will resume (see CycleRun.close_range)
+            if checkpoint.is_range_completed(min_price, max_price) or run.retry_queue.resumes_range(min_price, max_price):
+                continue
+            
             logging.info(f"Processing range: R$ {min_price} to R$ {max_price}")
-        
-            # Base url construction
-            url_base = (
-                f"https://lista.mercadolivre.com.br/"
-                f"celulares-telefones/"
-                f"celulares-smartphones/"
-                f"samsung/"
-                f"samsung_PriceRange_{min_price}-{max_price}_Desde_"
-            )
             
-            counter_starter = 1
-            consecutive_errors = 0
-            page_number= 1
+            counter_starter, page_number = checkpoint.resume_position(min_price, max_price)
+            crawl_range(run, min_price, max_price, counter_starter, page_number)
             
-            # Pagination Loop
-            while True:
-                # Pagination URL Construction
-                if counter_starter == 1:
-                    target_url = (
-                        f"https://lista.mercadolivre.com.br/"
-                        f"celulares-telefones/"
-                        f"celulares-smartphones/"
-                        f"samsung/"
-                        f"samsung_PriceRange_{min_price}-{max_price}_NoIndex_True"
-                    )
-                else:
-                    target_url = f"{url_base}{counter_starter}_NoIndex_True" 
-                
-                try:
-                    # Random Sleep (CRITICAL for 24/7 operation on VPS)
-                    sleep_time = random.uniform(2.5, 5.0)
-                    time.sleep(sleep_time)
-                    
-                    # [MONITORING] Track Request Latency using MetricsCollector
-                    req_start = time.time()
-                    response = requests.get(target_url, headers=get_random_header(), timeout=20)
-                    req_duration = time.time() - req_start
-                    
-                    # Log request metrics to Prometheus
-                    metrics.record_http_request(
-                        method="GET",
-                        endpoint="mercadolivre_search",
-                        status_code=response.status_code,
-                        duration=req_duration
-                    )
-                    
-                    # Log request to JSON log
-                    structured_logger.log_http_request(  # <--- CORRECTING _http_
-                        method="GET",
-                        url=target_url, 
-                        status_code=response.status_code,
-                        duration=req_duration
-                    )
-                    
-                    # Check Status Code
-                    if response.status_code != 200:
-                        logging.warning(f"Status Code {response.status_code} at page index {counter_starter}. Skipping Range.")
-                        break
-                    
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    
-                    # Anti-Bot Detection Check (Captcha)
-                    page_text = soup.get_text().lower()
-                    if "human" in page_text or "captcha" in page_text:
-                        # [MONITORING] Log Error Event
-                        structured_logger.log_error(
-                            error=Exception("Soft Ban Detected"),
-                            context={"action": "sleeping_15_min", "trigger": "captcha_text"}
-                        )
-                        logging.critical("BLOCK DETECTED (CAPTCHA)! Sleeping for 15 MINUTES...")
-                        time.sleep(900) # 15 minutes penalty
-                        continue # Retry same page
-                    
-                    # Hybrid Selector Strategy (Grid vs List Layouts)
-                    cards = soup.find_all("div", class_="poly-card__content")
-                    layout_type = "grid"
-                    
-                    if not cards:
-                        cards = soup.find_all("li", class_="ui-search-layout__item")
-                        layout_type = "list"
-                    
-                    # If no cards found, assume end of pagination for this range
-                    if not cards:
-                        logging.info(f"End of Items for Range R$ {min_price} - {max_price}. Pages Scraped: {counter_starter // 48}")
-                        break
-                    
-                    # Batch Data Processing
-                    batch_data = []
-                    
-                    for card in cards:
-                        try:
-                            # ==========================
-                            # DATA EXTRACTION
-                            # ==========================
-                            
-                            # 1. Link (Primary Key)
-                            link_tag = card.find("a", class_="poly-component__title") or card.find("a", class_="ui-search-link") or card.find("a")
-                            link_raw = link_tag.get("href", "") if link_tag else "N/A"
-                            link_clean = link_raw.split("?")[0].split("#")[0]
-                            
-                            if link_clean in seen_links_in_cycle:
-                                continue
-                            seen_links_in_cycle.add(link_clean)
-                            
-                            # 2. Title
-                            title_tag = card.find("h3", class_="poly-component__title-wrapper") or card.find("h2", class_="ui-search-item__title")
-                            title_text = title_tag.get_text(strip=True) if title_tag else "N/A"
-                            
-                            # 3. Seller 
-                            seller_tag = card.find("span", class_="poly-component__seller") or card.find("span", class_="poly-component__brand") or card.find("p", class_="ui-search-official-store-label")
-                            seller_text = seller_tag.get_text(strip=True) if seller_tag else "N/A"
-                            
-                            # 4. Price 
-                            price_tag = card.find("span", class_="andes-money-amount__fraction")    
-                            cents_tag = card.find("span", class_="andes-money-amount__cents")
-                            
-                            price_value = price_tag.get_text(strip=True) if price_tag else "0"
-                            # Correction: cents_tag em vez de cents_text
-                            cents_value = cents_tag.get_text(strip=True) if cents_tag else "00"
-                            price_full = f"{price_value}.{cents_value}"
-                            
-                            # 5. Discount 
-                            discount_tag = card.find("span", class_="andes-money-amount__discount")
-                            discount_text = discount_tag.get_text(strip=True).split(" ")[0] if discount_tag else "N/A"
-                            
-                            # 6. Installments & Interest 
-                            installment_tag = card.find("span", class_="poly-price__installments") or card.find("span", class_="ui-search-item__group__element ui-search-installments") 
-                            installment_qty = "N/A"
-                            interest_free = "N/A"
-                            
-                            if installment_tag:
-                                # Correction: separator=" " (evita texto colado) e strip=True (typo 'stripe')
-                                full_installments_text = installment_tag.get_text(separator=" ", strip=True)
-                                
-                                interest_free = "Sem Juros" if "sem juros" in full_installments_text.lower() else "Com Juros" 
-                                
-                                if "x" in full_installments_text.lower():
-                                    # Split by "x" and gets the last word of the first part
-                                    installment_qty = full_installments_text.lower().split("x")[0].split()[-1]
-                                else:
-                                    installment_qty = "1"
-                                
-                            # 7. Total Sold
-                            sold_text = "N/A"    
-                            for span in card.find_all("span"):
-                                if "vendidos" in span.get_text().lower():
-                                    sold_text = span.get_text(strip=True)
-                                    break
-                                
-                            
-                            # 8. Delivery & Shipping
-                            
-                            # 8.1 Free Delivery
-                            free_delivery = "No"
-                            shipping_tag = card.find("div", class_="poly-component-shipping") or card.find("p", class_="ui-search-item__shipping")
-                            if shipping_tag:
-                                if "grátis" in shipping_tag.get_text(strip=True).lower():
-                                    free_delivery = "Yes"
-                            
-                            # (8.2 & 8.3 & 8.4) === Delivered === (Today, Tomorrow, or Days of Week)
-                            # unified variable to makes the analysis easier leater on: "shipping_arrival_estimation"
-                            arrival_estimation = "Standard"
-                            
-                            # Today Check
-                            if card.find("span", class_="poly-shipping--same_day"):
-                                arrival_estimation = "Today"
-                            # Tomorrow Check
-                            elif card.find("span", class_="poly-shipping--next_day"):
-                                arrival_estimation = "Tomorrow"
-                            else:
-                                # Day of Week Check 
-                                # The "Mercardo Livre" use classes as poly-shipping--monday, poly-shipping--tuesday, etc.
-                                week_days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-                                for day in week_days:
-                                    day_tag = card.find("span", class_=f"poly-shipping--{day}")
-                                    if day_tag:
-                                        # Get text of which day in a week
-                                        arrival_text = day_tag.get_text(strip=True)
-                                        arrival_estimation = f"DayWeek {day} ({arrival_text})"
-                                        break
-                            
-                            # 9. Highlights (Checking Text Content)
-                            # The class "poly-component__highlight" is generic. We must check the text inside.
-                            highlight_tag = card.find("span", class_="poly-component__highlight")
-                            highlight_text = highlight_tag.get_text(strip=True).upper() if highlight_tag else ""
-                            
-                            is_great_deal = "Yes" if "IMPERDÍVEL" in highlight_text or "OFERTA" in highlight_text else "No"
-                            is_bestseller = "Yes" if "MAIS VENDIDO" in highlight_text else "No"
-                            is_recommended = "Yes" if "RECOMENDADO" in highlight_text else "No " 
-
-                            # Timestamp
-                            extraction_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            
-                            # Dictionary
-                            item_data = {
-                                "extraction_date": extraction_date,
-                                "cycle_id": cycle_count,
-                                "title" : title_text,
-                                "seller": seller_text,
-                                "price": price_full,
-                                "discount": discount_text,
-                                "installments": installment_qty,
-                                "interest_free": interest_free,
-                                "total_sold_raw": sold_text,
-                                "free_delivery": free_delivery,
-                                "arrival_estimation": arrival_estimation,
-                                "is_great_deal": is_great_deal,
-                                "is_bestseller": is_bestseller,
-                                "is_recommended": is_recommended,
-                                "link": link_clean,
-                                "layout_type": layout_type,
-                                "price_range_searched": f"{min_price}-{max_price}"
-                            }
-                            
-                            batch_data.append(item_data)
-                            
-                        except Exception as e_inner:
-                            # [Monitoring] log inner Loop error
-                            structured_logger.log_error(error=e_inner, context={"scope": "card_extraction"})
-                            continue
-                    
-                    # ################################
-                    # INCREMENTAL SAVING (APPEND MODE)
-                    # ################################
-                    
-                    if batch_data:
-                        df = pd.DataFrame(batch_data)                        
-                        header_mode = not os.path.exists(output_file)
-                        
-                        try:
-                            # CORRECTION: mode="a" to append (persistency)
-                            df.to_csv(output_file, mode="a", index=False, sep=";", encoding="utf-8-sig", header=header_mode)
-                            items_count = len(batch_data)
-                            total_items_cycle += items_count
-                            
-                            #[MONITORING] track items and Page Progress
-                            BusinessEventTracker.track_items(items_count)
-                            
-                            # Track Page
-                            BusinessEventTracker.track_scraping_progress(
-                                page_number=page_number,
-                                items_found=items_count,
-                                total_pages=40
-                            )
-                            
-                        except Exception as e_csv:
-                            structured_logger.log_error(error=e_csv, context={"scope": "csv_saving", "file": csv_file_path})
-                     
-                    # [CHANGE 2] Circuit Breaker for Testing
-                    # If testing, force stop after processing the first page (48 items max)
-                    if single_run:
-                        logging.info(f"TEST MODE: Breaking pagination loop after 1st page.")
-                        break 
-                           
-                    # Pagination Increment
-                    counter_starter += 48
-                    page_number +=1
-                    
-                    # Technical Safety Limit (ML usually stops serving after ~2000 items)
-                    if counter_starter > 2000:
-                        logging.info(f"ML Pagination Limit Reached for this Range.")
-                        break
-                
-                except requests.exceptions.RequestException as e_net:
-                    structured_logger.log_error(error=e_net, context={"scope": "network_request"} )
-                    consecutive_errors += 1
-                    time.sleep(30)
-                    if consecutive_errors > 3:
-                        break
-                
-                except Exception as e_gen:
-                    structured_logger.log_error(error=e_gen, context={"scope": "pagination_loop_generic"})
-                    break
+            # [CHECKPOINT] Range finished (end of items or limit); one stopped with a
+            # deferred page is closed when that retry has resumed it
+            run.close_range(min_price, max_price)
+            run.save()
+        
+        # [RETRY QUEUE] Serve what is still owed before closing the cycle
+        run.drain_retries()
+        run.save()
+        
+        # [ENRICHMENT] Extra traffic bounded by the per-cycle quota
+        enrichment_summary = run.enrich(enrichment)
     
         # END OF CYCLE 
         duration_minutes = (time.time() - start_time) / 60
+        profile_capture = profiler.end_cycle()
+        # [RESOURCES] Peaks of the cycle, checked against the budgets
+        resource_usage = resource_sampler.end_cycle()
         
         # [MONITORING] Track Cycle Completion
         structured_logger.log_business_event(
             event_name="cycle_completed",
             context={
                 "cycle_id": cycle_count,
-                "total_items": total_items_cycle,
-                "duration_minutes": round(duration_minutes, 2)
+                "total_items": run.total_items,
+                "duration_minutes": round(duration_minutes, 2),
+                "coverage": run.coverage.as_dict(),
+                "stage_seconds": stage_timer.summary(reset=True),
+                "egress": egress.stats() if egress else None,
+                "enrichment": enrichment_summary,
+                "profile": profile_capture,
+                "resources": resource_usage
             }
         )
 
         # Tracker Method
         BusinessEventTracker.track_scraping_complete(
-            total_items=total_items_cycle,
+            total_items=run.total_items,
             duration_seconds=time.time() - start_time
         )
         
+        # [CHECKPOINT] Close the cycle so the next start does not reuse its id
+        checkpoint.mark_cycle_done()
+        if checkpoint_store:
+            checkpoint_store.save(checkpoint)
+        
         cycle_count += 1
+        checkpoint = CycleCheckpoint(cycle_id=cycle_count)
+        is_resumed_cycle = False
         
         # [THE INTEGRATION MAGIC]
         if single_run:
@@ -472,21 +721,6 @@ def main_loop(single_run=False, output_file=DEFAULT_CSV_PATH):
         
 
 if __name__ == "__main__":
-    # Checks enviroment variable ONLY to decide how to call the function
-    is_test_env = os.getenv("SCRAPER_MODE") == "TEST"
-    try:
-        if is_test_env:
-            # Test Mode: Save to junk file and run once
-            # This is the "Key" to getting the Green Checkmark.
-            test_csv = os.path.join(data_raw_dir, "integration_test_data.csv")
-            main_loop(single_run=True, output_file=test_csv)
-        else:
-            # Production Mode: Runs forever on the official file (VPS)
-            main_loop(single_run=False)
-            
-    
-    except KeyboardInterrupt:
-        logger.info("Script Interrupted by User.")
-    except Exception as e:
-        structured_logger.log_error(error=e, context={"scope": "main_execution", "fatal": True})
-        sys.exit(1)
\ No newline at end of file
+    # Backwards compatible "python src/scraper.py": delegates to the real entry point
+    from src.app import main
+    main()
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from src.database.connection import engine, init_db
+import src.database.search as search
+from src.database.search import search_products
+
+# Far above any real ids so the test never touches production rows
+TEST_CYCLE_ID = 990_000_101
+TEST_PRODUCT_IDS = [990_000_101, 990_000_102, 990_000_103]
+EXTRA_PRODUCT_ID = 990_000_104
+TEST_SELLER = "test-search-seller"
+# Made-up model names keep the matches limited to the test rows
+TITLES = [
+    "Smartphone Samsung Galaxy Zq97 Ultra 256GB Câmera Lilás",
+    "Samsung Galaxy ZQ97 Ultra 5G 512 GB lilas",
+    "Samsung Galaxy Zq97 Fe 128GB Preto",
+]
+
+
+def _cleanup():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM fact_offers WHERE cycle_id = :c"), {"c": TEST_CYCLE_ID})
+        conn.execute(text("DELETE FROM dim_products WHERE product_id = ANY(:ids)"), {"ids": TEST_PRODUCT_IDS + [EXTRA_PRODUCT_ID]})
+        conn.execute(text("DELETE FROM dim_sellers WHERE seller_name = :s"), {"s": TEST_SELLER})
+        conn.execute(text("DELETE FROM dim_scraper_metadata WHERE cycle_id = :c"), {"c": TEST_CYCLE_ID})
+
+
+@pytest.fixture
+def catalogue():
+    init_db()
+    _cleanup()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO dim_scraper_metadata (cycle_id) VALUES (:c)"), {"c": TEST_CYCLE_ID})
+        seller_id = conn.execute(text("INSERT INTO dim_sellers (seller_name) VALUES (:s) RETURNING seller_id"),
+                                 {"s": TEST_SELLER}).scalar()
+        for product_id, title in zip(TEST_PRODUCT_IDS, TITLES):
+            conn.execute(text("INSERT INTO dim_products (product_id, sku_link, title) VALUES (:p, 'https://x', :t)"),
+                         {"p": product_id, "t": title})
+            for hour, price in [(6, 3000.0), (12, 2900.0)]:
+                conn.execute(text(
+                    "INSERT INTO fact_offers (product_id, seller_id, cycle_id, price, extraction_date) "
+                    "VALUES (:p, :s, :c, :price, :d)"
+                ), {"p": product_id, "s": seller_id, "c": TEST_CYCLE_ID, "price": price,
+                    "d": datetime(2026, 2, 1, hour)})
+    yield
+    _cleanup()
+
+
+def test_search_is_accent_insensitive_ranked_and_paginated(catalogue):
+    result = search_products(engine, "ZQ97 ULTRA LILÁS", page_size=1, offers_per_product=1)
+    assert result["total"] == 2 and len(result["results"]) == 1
+    first = result["results"][0]
+    assert first["product_id"] in TEST_PRODUCT_IDS[:2]
+    # Latest offer first
+    assert first["latest_offers"] == [
+        {"cycle_id": TEST_CYCLE_ID, "price": 2900.0, "seller_name": TEST_SELLER,
+         "extraction_date": datetime(2026, 2, 1, 12)}
+    ]
+    second_page = search_products(engine, "zq97 ultra lilas", page=2, page_size=1)
+    assert second_page["results"][0]["product_id"] != first["product_id"]
+
+
+def test_prefix_terms_match_partial_words(catalogue):
+    ids = {product["product_id"] for product in search_products(engine, "zq9 ult")["results"]}
+    assert ids == set(TEST_PRODUCT_IDS[:2])
+    assert search_products(engine, "zq97 camera")["results"][0]["product_id"] == TEST_PRODUCT_IDS[0]
+
+
+def test_capped_candidates_are_the_best_ranked_matches(catalogue, monkeypatch):
+    # Inserted last, ranked first: an unordered cap would keep an earlier row
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO dim_products (product_id, sku_link, title) VALUES (:p, 'https://x', :t)"),
+                     {"p": EXTRA_PRODUCT_ID, "t": "Zq97 Ultra capa Zq97 Ultra película Zq97 Ultra"})
+    monkeypatch.setattr(search, "MAX_RANKED_CANDIDATES", 1)
+    result = search_products(engine, "zq97 ultra")
+    assert [product["product_id"] for product in result["results"]] == [EXTRA_PRODUCT_ID]
+    assert result["total"] == 1 and result["total_capped"]
+    monkeypatch.setattr(search, "MAX_RANKED_CANDIDATES", 10)
+    assert search_products(engine, "zq97 ultra")["total_capped"] is False
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from src.database.connection import engine, init_db
+from src.pipeline.work_queue import PostgresWorkQueue
+
+# Far above any real cycle so the test never touches production rows
+TEST_CYCLE_ID = 990_000_001
+RANGES = [(1200, 1249), (1250, 1299)]
+
+
+def _cleanup():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM crawl_work_queue WHERE cycle_id = :c"), {"c": TEST_CYCLE_ID})
+        conn.execute(text("DELETE FROM dim_scraper_metadata WHERE cycle_id = :c"), {"c": TEST_CYCLE_ID})
+
+
+@pytest.fixture
+def queues():
+    init_db()
+    _cleanup()
+    worker_a = PostgresWorkQueue(engine, worker_id="test-a", lease_seconds=60, max_attempts=2, retry_backoff_seconds=0)
+    worker_b = PostgresWorkQueue(engine, worker_id="test-b", lease_seconds=60, max_attempts=2, retry_backoff_seconds=0)
+    worker_a.publish_cycle(TEST_CYCLE_ID, RANGES)
+    yield worker_a, worker_b
+    _cleanup()
+
+
+def test_skip_locked_claims_are_disjoint_and_cycle_closes(queues):
+    worker_a, worker_b = queues
+    first, second = worker_a.claim(), worker_b.claim()
+    assert first.work_id != second.work_id
+    assert worker_a.claim() is None
+
+    # Full page -> next page is published in the same transaction
+    assert worker_a.complete(first, items_found=48, next_offset=49)
+    assert worker_b.complete(second, items_found=3)
+    assert not worker_a.finalize_cycle(TEST_CYCLE_ID)
+
+    third = worker_b.claim()
+    assert third.page_offset == 49 and third.page_number == 2
+    assert worker_b.complete(third, items_found=0)
+
+    assert worker_a.finalize_cycle(TEST_CYCLE_ID)
+    assert worker_a.cycle_progress(TEST_CYCLE_ID)["items"] == 51
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(queues):
+    worker_a, worker_b = queues
+    item = worker_a.claim()
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE crawl_work_queue SET lease_expires_at = now() - INTERVAL '1 minute' "
+                          "WHERE work_id = :id"), {"id": item.work_id})
+
+    assert worker_b.reclaim_expired() >= 1
+    stolen = next(i for i in iter(worker_b.claim, None) if i.work_id == item.work_id)
+    assert stolen.attempts == 2
+
+    assert not worker_a.heartbeat(item)
+    assert not worker_a.complete(item, items_found=10)
+    assert worker_b.fail(stolen, "HTTP 503")
+    assert worker_b.cycle_progress(TEST_CYCLE_ID)["failed"] == 1
@@ -0,0 +1,36 @@
+import pandas as pd
+from src.pipeline.attributes import extract_attributes, extract_attributes_frame
+
+
+def test_extracts_attributes_from_typical_title():
+    attrs = extract_attributes("Smartphone Samsung Galaxy A15 5G 128GB 4GB RAM Dual SIM Azul Claro 6,5''")
+    assert attrs == {
+        "model_family": "A15", "storage_gb": 128, "ram_gb": 4,
+        "is_5g": True, "is_refurbished": False, "color": "azul",
+    }
+
+
+def test_model_families_and_refurbished_flags():
+    """Variants, foldables, TB storage and refurbished markers (accents included)"""
+    titles = pd.Series([
+        "Samsung Galaxy S23 Ultra 256GB 12GB RAM Preto",
+        "Galaxy Z Flip5 512 GB 8 GB RAM Lavanda",
+        "Samsung Galaxy S24+ 5G 1TB",
+        "Smartphone Samsung Galaxy S21 5g 128gb 8gb Ram Cor Violeta - Bom (Recondicionado)",
+        "Samsung Galaxy A54 5g 128gb 8gb Branco",
+        "Celular Samsung Galaxy A16 128gb 4gb Ram Câmera de Até 50mp Tela 6.7",
+    ])
+    frame = extract_attributes_frame(titles)
+
+    assert list(frame["model_family"]) == ["S23 Ultra", "Z Flip 5", "S24 Plus", "S21", "A54", "A16"]
+    assert list(frame["storage_gb"]) == [256, 512, 1024, 128, 128, 128]
+    # "128gb 8gb Branco": the unlabeled small value is RAM
+    assert list(frame["ram_gb"].fillna(0)) == [12, 8, 0, 8, 8, 4]
+    assert list(frame["is_refurbished"]) == [False, False, False, True, False, False]
+    assert frame.index.equals(titles.index)
+
+
+def test_unparseable_title_yields_nulls():
+    attrs = extract_attributes("N/A")
+    assert attrs["model_family"] is None and attrs["storage_gb"] is None
+    assert attrs["is_5g"] is False
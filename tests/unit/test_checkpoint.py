@@ -0,0 +1,53 @@
+import json
+from src.pipeline.checkpoint import CheckpointStore, CycleCheckpoint, resolve_starting_cycle
+
+
+def test_checkpoint_roundtrip_resumes_in_flight_range(tmp_path):
+    """A saved mid-range checkpoint must resume at the next page of that range"""
+    store = CheckpointStore(tmp_path / "state" / "checkpoint.json")
+
+    checkpoint = CycleCheckpoint(cycle_id=7)
+    checkpoint.mark_range_done(0, 49)
+    checkpoint.mark_page_done(50, 99, next_offset=97, next_page_number=3, items=48)
+    checkpoint.dedup_state = ["https://www.mercadolivre.com.br/a/p/MLB1"]
+    store.save(checkpoint)
+
+    resumed = resolve_starting_cycle(store, str(tmp_path / "missing.csv"))
+
+    assert resumed.cycle_id == 7
+    assert resumed.is_range_completed(0, 49)
+    assert resumed.resume_position(50, 99) == (97, 3)
+    assert resumed.resume_position(100, 149) == (1, 1)
+    assert resumed.total_items == 48
+    assert resumed.dedup_state == ["https://www.mercadolivre.com.br/a/p/MLB1"]
+    # Atomic write leaves no temp files behind
+    assert [p.name for p in (tmp_path / "state").iterdir()] == ["checkpoint.json"]
+
+
+def test_completed_checkpoint_starts_next_cycle(tmp_path):
+    """Once a cycle is closed the next start must use a fresh cycle id"""
+    store = CheckpointStore(tmp_path / "checkpoint.json")
+    checkpoint = CycleCheckpoint(cycle_id=3)
+    checkpoint.mark_cycle_done()
+    store.save(checkpoint)
+
+    assert resolve_starting_cycle(store, str(tmp_path / "missing.csv")).cycle_id == 4
+
+
+def test_without_checkpoint_cycle_ids_continue_after_csv(tmp_path):
+    """No checkpoint yet: never reuse a cycle_id already present in the CSV"""
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("extraction_date;cycle_id;title\n2025-12-21 08:35:20;5;A\n2025-12-21 14:35:20;6;B\n",
+                        encoding="utf-8-sig")
+    corrupt = tmp_path / "checkpoint.json"
+    corrupt.write_text("{not json")
+
+    store = CheckpointStore(corrupt)
+    resumed = resolve_starting_cycle(store, str(csv_path))
+    assert resumed.cycle_id == 7
+
+    # Once saved, the fresh cycle replaces the corrupt file and is what a restart loads
+    store.save(resumed)
+    assert json.loads(corrupt.read_text())["status"] == "running"
+    reloaded = store.load()
+    assert (reloaded.cycle_id, reloaded.status) == (7, CycleCheckpoint.STATUS_RUNNING)
@@ -0,0 +1,75 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.pool import InstrumentedQueuePool, instrument_engine, pool_settings
+from src.database.sessions import unit_of_work
+
+
+def _sample(name):
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+def _engine(tmp_path, max_overflow=0, **kwargs):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=max_overflow, pool_timeout=0.2, pool_pre_ping=True, **kwargs
+    )
+    return instrument_engine(engine)
+
+
+def test_pool_size_follows_writer_concurrency():
+    assert pool_settings(8) == {"pool_size": 10, "max_overflow": 8}
+    assert pool_settings(0, reserved=0) == {"pool_size": 1, "max_overflow": 1}
+
+
+def test_exhausted_pool_is_visible_in_metrics(tmp_path):
+    engine = _engine(tmp_path, max_overflow=1)
+    waits, timeouts = _sample("db_pool_checkout_wait_seconds_count"), _sample("db_pool_checkout_timeouts_total")
+
+    held = [engine.connect(), engine.connect()]
+    assert (_sample("db_pool_checked_out"), _sample("db_pool_overflow")) == (2, 1)
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    for connection in held:
+        connection.close()
+
+    # The burst is over: the overflow gauge does not stay at its peak
+    assert (_sample("db_pool_checked_out"), _sample("db_pool_overflow")) == (0, 0)
+    assert _sample("db_pool_checkout_timeouts_total") == timeouts + 1
+    assert _sample("db_pool_checkout_wait_seconds_count") == waits + 3
+    engine.dispose()
+
+
+def test_preping_failure_is_counted_and_reconnected(tmp_path):
+    engine = _engine(tmp_path)
+    failures = _sample("db_pool_preping_failures_total")
+
+    with engine.connect() as connection:
+        raw = connection.connection.dbapi_connection
+    raw.close() # The pooled connection dies while idle (server restart, idle timeout)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+    assert _sample("db_pool_preping_failures_total") == failures + 1
+    engine.dispose()
+
+
+def test_unit_of_work_commits_or_rolls_back(tmp_path):
+    engine = _engine(tmp_path)
+    factory = sessionmaker(bind=engine)
+    with unit_of_work(factory) as session:
+        session.execute(text("CREATE TABLE t (x INTEGER)"))
+        session.execute(text("INSERT INTO t VALUES (1)"))
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(factory) as session:
+            session.execute(text("INSERT INTO t VALUES (2)"))
+            raise RuntimeError("batch failed")
+
+    with unit_of_work(factory) as session:
+        assert session.execute(text("SELECT x FROM t")).scalars().all() == [1]
+    # Every session went back to the pool
+    assert _sample("db_pool_checked_out") == 0
+    engine.dispose()
@@ -0,0 +1,78 @@
+from src.pipeline.dedup import HashSet64, ListingDedupIndex, BloomFilter, hash_link, normalize_link
+from src.pipeline.identifiers import listing_key
+
+LINK = "https://www.mercadolivre.com.br/samsung-galaxy-a06/p/MLB40822891"
+
+
+def test_normalize_link_ignores_tracking_and_case():
+    """URL variants of the same listing must collapse into one key"""
+    assert normalize_link(LINK + "?searchVariation=123#polycard") == LINK
+    assert normalize_link("HTTPS://WWW.MercadoLivre.com.br/samsung-galaxy-a06/p/MLB40822891/") == LINK
+    assert hash_link(LINK + "?x=1") == hash_link(LINK)
+
+
+def test_hashset_grows_and_keeps_members():
+    """Open addressing must survive several resizes without losing entries"""
+    hs = HashSet64(capacity=4)
+    hashes = [hash_link(f"{LINK}-{i}") for i in range(5000)]
+    for h in hashes:
+        assert hs.add(h)
+    assert len(hs) == 5000
+    assert all(h in hs for h in hashes)
+    assert not hs.add(hashes[0])
+    assert hash_link("https://other.example/p/MLB1") not in hs
+
+
+def test_cycle_and_all_time_views(tmp_path):
+    """Per-cycle duplicates reset each cycle, first-seen survives a save/load"""
+    index = ListingDedupIndex()
+    assert index.observe(LINK) == (False, True)
+    assert index.observe(LINK) == (True, False)
+
+    index.start_cycle()
+    assert index.observe(LINK) == (False, False)
+
+    path = tmp_path / "seen.idx"
+    index.save(path)
+    reloaded = ListingDedupIndex.load(path)
+    assert reloaded.observe(LINK) == (False, False)
+    assert reloaded.observe(LINK + "-new") == (False, True)
+
+
+def test_cycle_state_roundtrip_for_checkpoint():
+    """The compact cycle snapshot restores the same duplicate decisions"""
+    index = ListingDedupIndex(use_bloom=False)
+    index.observe(LINK)
+    restored = ListingDedupIndex(use_bloom=False)
+    restored.restore_cycle_state(index.cycle_state())
+    assert restored.observe(LINK)[0] is True
+
+    # Legacy checkpoints hold raw links; the scraper observes listing keys
+    legacy = ListingDedupIndex(use_bloom=False)
+    legacy.restore_cycle_state([LINK + "?searchVariation=1"])
+    assert listing_key(LINK) == "MLB40822891"
+    assert legacy.observe(listing_key(LINK))[0] is True
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    hashes = [hash_link(f"{LINK}-{i}") for i in range(1000)]
+    for h in hashes:
+        bloom.add(h)
+    assert all(bloom.might_contain(h) for h in hashes)
+    false_positives = sum(bloom.might_contain(hash_link(f"x-{i}")) for i in range(1000))
+    assert false_positives < 50
+
+
+def test_bloom_misses_skip_the_exact_index_until_saved(tmp_path):
+    index = ListingDedupIndex(bloom_capacity=1000)
+    keys = [f"{LINK}-{i}" for i in range(500)]
+    assert all(index.observe(key) == (False, True) for key in keys)
+    # Proven new by the filter: buffered, not probed in the exact index
+    assert (len(index.all_time), index.unsaved) == (0, 500)
+
+    index.start_cycle()
+    assert not any(index.observe(key)[1] for key in keys)
+    index.save(tmp_path / "seen.idx")
+    assert (len(index.all_time), index.unsaved) == (500, 0)
+    assert len(ListingDedupIndex.load(tmp_path / "seen.idx").all_time) == 500
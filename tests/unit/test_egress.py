@@ -0,0 +1,111 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import src.pipeline.egress as egress
+from src.pipeline.egress import EgressPool, EgressRoute, parse_route_spec
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _pool(n_routes, clock, rate_per_minute=12):
+    routes = [EgressRoute(f"exit{i}", rate_per_minute=rate_per_minute, clock=clock) for i in range(n_routes)]
+    return EgressPool(routes, jitter_seconds=0, clock=clock, sleep=clock.sleep)
+
+
+@pytest.mark.parametrize("n_routes", [1, 2, 4])
+def test_throughput_scales_linearly_with_exits(n_routes):
+    clock = FakeClock()
+    pool = _pool(n_routes, clock)
+    granted = 0
+    while clock.now < 600:  # 10 simulated minutes
+        pool.acquire()
+        granted += 1
+    # 12 req/min per exit, +1 initial token per exit
+    assert abs(granted - n_routes * 12 * 10) <= n_routes + 1
+
+
+def test_captcha_route_cools_down_and_loses_traffic():
+    clock = FakeClock()
+    pool = _pool(2, clock, rate_per_minute=60)
+    blocked, healthy = pool.routes
+    pool.report(blocked, captcha=True)
+
+    picks = [pool.acquire()[0].name for _ in range(20)]
+    assert set(picks) == {"exit1"}
+    assert blocked.cooldown_remaining() > 0 and blocked.health < healthy.health
+
+    # A second consecutive block doubles the cooldown
+    clock.sleep(blocked.cooldown_remaining())
+    pool.report(blocked, status_code=429)
+    assert blocked.cooldown_remaining() == pytest.approx(2 * blocked.ban_cooldown)
+
+
+def test_route_specs_hide_credentials():
+    assert parse_route_spec("direct") == ("direct", None, None)
+    assert parse_route_spec("source:10.0.0.5") == ("source:10.0.0.5", None, "10.0.0.5")
+    assert parse_route_spec("http://user:pw@127.0.0.1:3128")[0] == "127.0.0.1:3128"
+    with pytest.raises(ValueError):
+        parse_route_spec("ftp://nope")
+
+
+def test_socks_routes_need_pysocks(monkeypatch):
+    monkeypatch.setattr(egress, "_socks_available", lambda: True)
+    spec = "socks5h://user:pw@10.0.0.9:1080"
+    assert parse_route_spec(spec) == ("10.0.0.9:1080", spec, None)
+    monkeypatch.setattr(egress, "_socks_available", lambda: False)
+    with pytest.raises(ValueError, match="PySocks"):
+        parse_route_spec("socks5://10.0.0.9:1080")
+
+
+def _stand_in_proxy(name, hits, captcha=False):
+    """Local forward proxy: answers every absolute-URI GET itself"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append((name, self.path))
+            body = b"<html>Are you human? captcha</html>" if captcha else b"<html><ol></ol></html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_requests_flow_through_local_stand_in_proxies():
+    hits = []
+    servers = [_stand_in_proxy("a", hits), _stand_in_proxy("b", hits), _stand_in_proxy("c", hits, captcha=True)]
+    try:
+        routes = [
+            EgressRoute(*parse_route_spec(f"http://127.0.0.1:{s.server_address[1]}")[:2], rate_per_minute=6000, burst=5)
+            for s in servers
+        ]
+        pool = EgressPool(routes, jitter_seconds=0)
+        for _ in range(30):
+            route, _ = pool.acquire()
+            response = route.session.get("http://lista.example/samsung", timeout=5)
+            pool.report(route, captcha="captcha" in response.text)
+
+        per_proxy = {name: sum(1 for n, _ in hits if n == name) for name in "abc"}
+        assert all(path == "http://lista.example/samsung" for _, path in hits)
+        assert per_proxy["c"] == 1  # cooled down after its first captcha
+        assert abs(per_proxy["a"] - per_proxy["b"]) <= 1
+    finally:
+        for s in servers:
+            s.shutdown()
+            s.server_close()
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from src.pipeline.enrichment import (
+    DEFAULT_TTLS, EnrichmentBlocked, EnrichmentCache, EnrichmentStage,
+    parse_product_page, select_due, stale_fields,
+)
+
+PRODUCT_PAGE = """
+<html><body>
+  <h1 class="ui-pdp-title">Samsung Galaxy S23 Ultra 256GB</h1>
+  <p class="ui-seller-data-status__title">MercadoLíder Platinum</p>
+  <span class="ui-pdp-buybox__quantity__available">(+1.250 disponíveis)</span>
+  <table class="andes-table">
+    <tr class="andes-table__row"><th>Memória interna</th><td> 256 GB </td></tr>
+    <tr class="andes-table__row"><th>Memória RAM</th><td>12 GB</td></tr>
+  </table>
+</body></html>
+"""
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def test_parse_product_page_offline():
+    details = parse_product_page(PRODUCT_PAGE)
+    assert details == {
+        "specs": {"Memória interna": "256 GB", "Memória RAM": "12 GB"},
+        "seller_reputation": "MercadoLíder Platinum",
+        "stock_available": 1250,
+    }
+    last_unit = parse_product_page('<span class="ui-pdp-stock-information__title">Último disponível!</span>')
+    assert last_unit == {"specs": None, "seller_reputation": None, "stock_available": 1}
+
+
+def test_each_field_expires_on_its_own_ttl():
+    record = {f"{field}_fetched_at": NOW - timedelta(hours=30) for field in DEFAULT_TTLS}
+    assert stale_fields(None, NOW) == list(DEFAULT_TTLS)
+    assert stale_fields(record, NOW) == ["stock_available"]
+    assert stale_fields(record, NOW + timedelta(days=7)) == ["seller_reputation", "stock_available"]
+
+    # A dead page is not retried before the shortest TTL
+    failed = {"last_status": "http_error", "last_attempt_at": NOW - timedelta(hours=1)}
+    assert stale_fields(failed, NOW) == []
+    assert stale_fields(failed, NOW + timedelta(days=1)) == list(DEFAULT_TTLS)
+
+
+def test_new_skus_come_first_and_quota_is_bounded():
+    fresh = {f"{f}_fetched_at": NOW for f in DEFAULT_TTLS}
+    old = {f"{f}_fetched_at": NOW - timedelta(days=2) for f in DEFAULT_TTLS}
+    older = {f"{f}_fetched_at": NOW - timedelta(days=3) for f in DEFAULT_TTLS}
+    records = {1: fresh, 2: old, 3: older}
+    candidates = [(1, "l1"), (2, "l2"), (3, "l3"), (4, "l4"), (5, "l5")]
+    assert select_due(candidates, records, NOW, quota=10) == [(4, "l4"), (5, "l5"), (3, "l3"), (2, "l2")]
+    assert select_due(candidates, records, NOW, quota=2) == [(4, "l4"), (5, "l5")]
+
+
+def test_stage_fetches_only_new_or_stale_skus():
+    engine = create_engine("sqlite://")
+    cache = EnrichmentCache(engine)
+    cache.ensure_table()
+    clock = {"now": NOW}
+    fetched = []
+
+    def fetch(link):
+        fetched.append(link)
+        if link.endswith("404"):
+            return None
+        if link.endswith("blocked"):
+            raise EnrichmentBlocked(link)
+        return PRODUCT_PAGE
+
+    stage = EnrichmentStage(cache, fetch, quota=2, clock=lambda: clock["now"])
+    candidates = {10: "https://p/10", 20: "https://p/20", 30: "https://p/404"}
+
+    summary = stage.run(candidates)
+    assert summary["due"] == 2 and summary["fetched"] == 2 and len(fetched) == 2
+
+    # Next cycle: only the SKU left out by the quota is fetched (and fails)
+    summary = stage.run(candidates)
+    assert fetched[2:] == ["https://p/404"] and summary["failed"] == 1
+
+    # Within every TTL nothing is fetched again
+    assert stage.run(candidates)["due"] == 0
+    assert len(fetched) == 3
+
+    # Stock expires first: everything is due again, a captcha stops the stage
+    clock["now"] = NOW + timedelta(days=2)
+    summary = stage.run({**candidates, 40: "https://p/blocked"})
+    assert summary["blocked"] and fetched[3] == "https://p/blocked"
+
+    row = cache.load([10])[10]
+    assert json.loads(row["specs"])["Memória RAM"] == "12 GB"
+    assert row["stock_available"] == 1250 and row["last_status"] == "ok"
+    assert cache.load([30])[30]["specs_fetched_at"] is None
@@ -0,0 +1,59 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, DimProduct
+from src.database.sessions import unit_of_work
+from src.pipeline.attributes import extract_attributes
+from src.pipeline.entity_resolution import CanonicalIndex, resolve_canonical_products, title_tokens
+
+A06_VARIANTS = [
+    "Samsung Galaxy A06 Dual SIM 128 GB branco 4 GB RAM",
+    "Smartphone Samsung Galaxy A06 128GB 4GB Ram Azul Escuro Tela 6.7\"",
+    "Celular Samsung Galaxy A06 128gb 4gb Ram Preto Dual Chip Nf",
+]
+
+
+def _assign(index, product_id, title):
+    return index.assign(product_id, title, extract_attributes(title))[0]
+
+
+def test_title_tokens_keep_only_identity():
+    assert title_tokens(A06_VARIANTS[0]) == {"a06", "128gb", "ram4gb"}
+    assert title_tokens(A06_VARIANTS[1]) == title_tokens(A06_VARIANTS[2]) == {"a06", "128gb", "ram4gb"}
+    assert "5g" in title_tokens("Smartphone Samsung Galaxy A15 5G 128GB 4GB RAM Azul Claro 6,5''")
+
+
+def test_variants_merge_but_conflicting_attributes_do_not():
+    index = CanonicalIndex()
+    assert [_assign(index, i, t) for i, t in enumerate(A06_VARIANTS, 1)] == [1, 1, 1]
+    # Same words, other storage / 5G / refurbished state: separate products
+    assert _assign(index, 4, "Samsung Galaxy A06 64GB 4GB RAM Preto") == 4
+    assert _assign(index, 5, "Samsung Galaxy A06 128GB 4GB RAM Recondicionado") == 5
+    assert _assign(index, 6, "Samsung Galaxy A15 5G 128GB 4GB RAM") == 6
+    assert _assign(index, 7, "Samsung Galaxy A15 128GB 4GB RAM") == 7
+    assert len(index) == 5
+
+
+def test_incremental_resolution_against_stored_clusters(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    def add(product_id, title):
+        with unit_of_work(factory) as session:
+            session.add(DimProduct(product_id=product_id, sku_link=f"https://x/{product_id}", title=title))
+
+    add(1, A06_VARIANTS[0])
+    add(2, "Samsung Galaxy S24 Ultra 256GB 12GB RAM")
+    assert resolve_canonical_products(engine)["new_clusters"] == 2
+
+    # A later run only loads the representatives and resolves the new rows
+    add(3, A06_VARIANTS[1])
+    add(4, "Smartphone Samsung Galaxy S24 Ultra 5G 512GB 12GB RAM")
+    summary = resolve_canonical_products(engine, batch_size=1)
+    assert (summary["assigned"], summary["merged"], summary["clusters"]) == (2, 1, 3)
+
+    with engine.connect() as connection:
+        canonical = dict(connection.execute(select(DimProduct.product_id, DimProduct.canonical_product_id)).all())
+    assert canonical == {1: 1, 2: 2, 3: 1, 4: 4}
+    assert resolve_canonical_products(engine, rebuild=True)["assigned"] == 4
@@ -0,0 +1,58 @@
+import csv
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.export import EXPORT_COLUMN_NAMES, build_export_query, export_offers
+from src.database.models import Base, DimProduct, DimScraperMetadata, DimSeller, FactOffer
+from src.database.sessions import unit_of_work
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    with unit_of_work(sessionmaker(bind=engine)) as session:
+        session.add_all([DimScraperMetadata(cycle_id=1, layout_type="grid"), DimSeller(seller_id=1, seller_name="A")])
+        session.add_all([
+            DimProduct(product_id=1, item_id=11, sku_link="https://x/1", title="Galaxy A15", model_family="A15"),
+            DimProduct(product_id=2, item_id=22, sku_link="https://x/2", title="Galaxy S24", model_family="S24"),
+        ])
+        for day in range(1, 6):
+            for product_id in (1, 2):
+                session.add(FactOffer(product_id=product_id, seller_id=1, cycle_id=1, price=100.0 * day + product_id,
+                                      is_great_deal=day % 2 == 0, extraction_date=datetime(2026, 3, day, 12)))
+    return engine
+
+
+def test_filters_are_pushed_into_sql():
+    sql = str(build_export_query(datetime(2026, 3, 1), datetime(2026, 4, 1), ["A15"]))
+    assert "fact_offers.extraction_date >=" in sql and "fact_offers.extraction_date <" in sql
+    assert "dim_products.model_family IN" in sql
+
+
+def test_parquet_export_in_fixed_batches(engine, tmp_path):
+    path = tmp_path / "offers.parquet"
+    progress = []
+    report = export_offers(engine, str(path), start=datetime(2026, 3, 2), end=datetime(2026, 3, 5),
+                           models=["A15", "S24"], batch_size=4, on_batch=progress.append)
+
+    assert (report["rows"], report["batches"]) == (6, 2) and [p["rows"] for p in progress] == [4, 6]
+    frame = pd.read_parquet(path)
+    assert list(frame.columns) == EXPORT_COLUMN_NAMES
+    assert frame["extraction_date"].dt.day.unique().tolist() == [2, 3, 4]
+    assert frame["is_great_deal"].dtype == bool and frame["price"].tolist()[:2] == [201.0, 202.0]
+
+
+def test_csv_export_with_model_filter(engine, tmp_path):
+    path = tmp_path / "offers.csv"
+    report = export_offers(engine, str(path), models=["S24"], batch_size=2)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f, delimiter=";"))
+    assert report["rows"] == len(rows) == 5 and {row["model_family"] for row in rows} == {"S24"}
+    assert not (tmp_path / "offers.csv.tmp").exists()
+    with pytest.raises(ValueError):
+        export_offers(engine, str(tmp_path / "offers.xlsx"))
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.features import FEATURE_COLUMNS, FeatureStore, compute_features
+
+
+def _observations(n_products=5, n_cycles=60, seed=7):
+    """Synthetic (product, cycle) prices: 6h cycles, sticky prices with occasional changes"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    start = pd.Timestamp("2026-01-01")
+    for product_id in range(1, n_products + 1):
+        price = 1000.0 + 100 * product_id
+        # Products start listing at different cycles
+        for cycle_id in range(1 + product_id, n_cycles + 1):
+            if rng.random() < 0.3:
+                price = round(price * rng.uniform(0.9, 1.1), 2)
+            rows.append((product_id, cycle_id, start + pd.Timedelta(hours=6 * cycle_id), price))
+    return pd.DataFrame(rows, columns=["product_id", "cycle_id", "observed_at", "price"])
+
+
+def test_incremental_updates_match_full_recompute(tmp_path):
+    observations = _observations()
+    store = FeatureStore(tmp_path / "features")
+    for first, last in [(1, 10), (11, 11), (12, 40), (41, 60)]:
+        batch = observations[observations["cycle_id"].between(first, last)]
+        assert store.update(batch) == len(batch)
+    assert store.last_cycle_id == 60
+    # Already ingested cycles are ignored
+    assert store.update(observations) == 0
+
+    full, _ = compute_features(observations)
+    full = full.sort_values(["product_id", "observed_at"], ignore_index=True)
+    incremental = store.read_features()
+    pd.testing.assert_frame_equal(incremental[full.columns], full, check_dtype=False, atol=1e-9)
+
+
+def test_crash_before_the_manifest_commit_keeps_the_previous_state(tmp_path, monkeypatch):
+    observations = _observations()
+    store = FeatureStore(tmp_path / "features")
+    store.update(observations[observations["cycle_id"] <= 30])
+
+    # Part and state are written, the manifest is not: the update never happened
+    def crash(manifest):
+        raise OSError("disk full")
+    with monkeypatch.context() as patch:
+        patch.setattr(store, "_commit", crash)
+        with pytest.raises(OSError):
+            store.update(observations[observations["cycle_id"].between(31, 45)])
+    assert store.last_cycle_id == 30
+
+    store.update(observations[observations["cycle_id"] > 30])
+    full, _ = compute_features(observations)
+    full = full.sort_values(["product_id", "observed_at"], ignore_index=True)
+    pd.testing.assert_frame_equal(store.read_features()[full.columns], full, check_dtype=False, atol=1e-9)
+    # Only the committed state is kept (the orphan of the crashed update stays unreferenced)
+    assert store.manifest()["state"] == "state_0000060.parquet"
+    assert not (tmp_path / "features" / "state_0000030.parquet").exists()
+
+
+def test_days_since_change_survives_the_tail(tmp_path):
+    # Flat price for 40 cycles (longer than any window), then one change
+    start = pd.Timestamp("2026-01-01")
+    prices = [500.0] * 40 + [450.0]
+    observations = pd.DataFrame({
+        "product_id": 1, "cycle_id": range(1, 42),
+        "observed_at": [start + pd.Timedelta(hours=6 * i) for i in range(41)], "price": prices,
+    })
+    store = FeatureStore(tmp_path / "features")
+    store.update(observations[observations["cycle_id"] <= 35])
+    store.update(observations[observations["cycle_id"] > 35])
+    features = store.read_features().set_index("cycle_id")
+    assert features.loc[40, "days_since_change"] == pytest.approx(39 * 0.25)
+    assert features.loc[41, "days_since_change"] == 0
+    assert features.loc[41, "price_lag_1"] == 500.0
+    assert set(FEATURE_COLUMNS) <= set(features.columns)
+
+
+def test_training_frame_is_point_in_time_correct(tmp_path):
+    observations = _observations(n_products=2, n_cycles=20)
+    store = FeatureStore(tmp_path / "features")
+    store.update(observations)
+
+    as_of = pd.Timestamp("2026-01-04")
+    frame = store.training_frame(as_of=as_of, horizon=4)
+    assert not frame.empty
+    assert (frame["observed_at"] <= as_of).all()
+    # Labels come only from observations already known at the cut-off
+    assert (frame["target_observed_at"] <= as_of).all()
+    assert (frame["target_observed_at"] > frame["observed_at"]).all()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+
+from src.database.models import FactForecast
+from src.pipeline.forecasting import (
+    ForecastRunner, ForecastWriter, holt_forecast, moving_average_forecast,
+    naive_forecast, price_matrix, seasonal_naive_forecast, ses_forecast,
+)
+
+
+def _observations(skus=30, cycles=24, seed=3):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for product_id in range(1, skus + 1):
+        price = rng.uniform(500, 5000)
+        for cycle_id in range(1 + product_id % 5, cycles + 1):
+            if cycle_id % 7 == product_id % 7: # Product missing from this cycle
+                continue
+            price *= rng.choice([1.0, 0.97, 1.02])
+            rows.append((product_id, cycle_id, round(price, 2)))
+    return pd.DataFrame(rows, columns=["product_id", "cycle_id", "price"])
+
+
+def test_price_matrix_carries_gaps_forward():
+    observations = pd.DataFrame({"product_id": [1, 1, 2, 2], "cycle_id": [1, 3, 2, 3], "price": [10.0, 12.0, 5.0, 6.0]})
+    product_ids, cycle_ids, values = price_matrix(observations)
+    assert list(product_ids) == [1, 2] and list(cycle_ids) == [1, 2, 3]
+    np.testing.assert_array_equal(values, [[10, 10, 12], [np.nan, 5, 6]])
+
+
+def test_vectorized_baselines():
+    values = np.array([
+        [np.nan, 100.0, 110.0, 120.0, 130.0],
+        [50.0, 40.0, 50.0, 40.0, 50.0],
+    ])
+    np.testing.assert_array_equal(naive_forecast(values, 2), [[130, 130], [50, 50]])
+    np.testing.assert_array_equal(moving_average_forecast(values, 1, window=2), [[125], [45]])
+    np.testing.assert_array_equal(seasonal_naive_forecast(values, 3, period=2), [[120, 130, 120], [40, 50, 40]])
+    # SES starts from each SKU's first listing
+    assert ses_forecast(values, 1, alpha=1.0)[0, 0] == 130
+    assert 100 < ses_forecast(values, 1, alpha=0.5)[0, 0] < 130
+
+
+def test_holt_follows_a_trend():
+    series = 1000.0 + 5 * np.arange(40)
+    np.testing.assert_allclose(holt_forecast(series, 3), [1200, 1205, 1210], rtol=1e-6)
+    assert list(holt_forecast(np.array([99.0]), 2)) == [99.0, 99.0]
+
+
+def test_process_pool_matches_in_process_and_reports_batches():
+    observations = _observations()
+    sequential = []
+    report = ForecastRunner(horizon=3, workers=1, batch_size=12).run(observations, sink=sequential.append)
+    pooled = []
+    ForecastRunner(horizon=3, workers=2, batch_size=12, chunk_size=4).run(observations, sink=pooled.append)
+
+    assert [b["skus"] for b in report["batches"]] == [12, 12, 6]
+    assert report["origin_cycle_id"] == 24 and report["skus_per_second"] > 0
+    pd.testing.assert_frame_equal(pd.concat(sequential), pd.concat(pooled))
+    # 5 models x 30 SKUs x 3 steps
+    assert len(pd.concat(sequential)) == 5 * 30 * 3
+
+
+def test_forecast_writer_replaces_an_origin_cycle(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'forecasts.db'}")
+    FactForecast.__table__.create(engine)
+    observations = _observations(skus=4)
+    runner = ForecastRunner(horizon=2, per_sku_models=())
+
+    for _ in range(2):
+        runner.run(observations, sink=ForecastWriter(engine, origin_cycle_id=24))
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(FactForecast.__table__)).scalar() == 4 * 4 * 2
@@ -0,0 +1,48 @@
+from src.pipeline.identifiers import UNIFIED_ID_OFFSET, extract_item_id, format_item_id, listing_key
+from src.pipeline.storage import append_batch, read_csv_header, CSV_COLUMNS
+
+CATALOG_LINK = "https://www.mercadolivre.com.br/smartphone-samsung-galaxy-a15-5g-128gb/p/MLB32174378"
+
+
+def test_extracts_catalog_and_listing_ids():
+    """MLB prefix is stripped; listing ids live in a separate (negated) id space"""
+    assert extract_item_id(CATALOG_LINK) == 32174378
+    assert extract_item_id(CATALOG_LINK + "?pdp_filters=item_id#polycard") == 32174378
+    assert extract_item_id("https://produto.mercadolivre.com.br/MLB-3456789012-samsung-galaxy-s23-_JM") == -3456789012
+    assert extract_item_id("N/A") is None
+    assert extract_item_id(None) is None
+    assert format_item_id(32174378) == "MLB32174378"
+
+
+def test_unified_listing_ids_have_their_own_space():
+    """/up/MLBU... pages (one per product, several sellers) never collide with MLB ids"""
+    unified = "https://www.mercadolivre.com.br/samsung-galaxy-a55-5g-128-gb/up/MLBU3686334040"
+    assert extract_item_id(unified) == UNIFIED_ID_OFFSET + 3686334040
+    assert extract_item_id(unified.upper() + "?pdp_filters=item_id") == extract_item_id(unified)
+    assert extract_item_id("https://www.mercadolivre.com.br/x/p/MLB3686334040") == 3686334040
+    assert extract_item_id("https://produto.mercadolivre.com.br/mlb-3686334040-x-_JM") == -3686334040
+    assert format_item_id(extract_item_id(unified)) == "MLBU3686334040"
+    variant = "https://www.mercadolivre.com.br/outro-titulo/up/MLBU3686334040#polycard"
+    assert listing_key(unified) == listing_key(variant) == "MLBU3686334040"
+
+
+def test_url_variants_share_the_same_listing_key():
+    variant = "https://www.mercadolivre.com.br/outro-titulo-qualquer/p/MLB32174378?searchVariation=1"
+    assert listing_key(CATALOG_LINK) == listing_key(variant) == "MLB32174378"
+    assert listing_key("https://example.com/no-id/") == "https://example.com/no-id"
+
+
+def test_append_batch_extends_legacy_header(tmp_path):
+    """Rows written under an older, shorter header must stay aligned after new columns appear"""
+    csv_path = tmp_path / "market.csv"
+    csv_path.write_text("extraction_date;title;price;link\n2025-12-21 08:35:20;A15;1.329.46;x\n", encoding="utf-8-sig")
+
+    written = append_batch([{"title": "A06", "price": "1.200.49", "item_id": 40822891}], str(csv_path))
+
+    header = read_csv_header(str(csv_path))
+    assert written == 1
+    assert header[:4] == ["extraction_date", "title", "price", "link"]
+    assert set(CSV_COLUMNS) <= set(header)
+    lines = csv_path.read_text(encoding="utf-8-sig").splitlines()
+    assert lines[2].split(";")[header.index("item_id")] == "40822891"
+    assert lines[1].split(";")[header.index("title")] == "A15"
@@ -0,0 +1,27 @@
+import os
+import sys
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+PROBE = """
+import sys, threading, socket
+import src.scraper
+from loguru import logger
+heavy = [m for m in ("pandas", "numpy", "bs4", "requests", "sqlalchemy") if m in sys.modules]
+print(heavy, threading.active_count(), len(logger._core.handlers))
+"""
+
+
+def test_importing_scraper_has_no_side_effects():
+    """
+    Importing src.scraper must not start threads (metrics server), reconfigure
+    loguru or eagerly load heavy dependencies.
+    """
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    heavy, threads, handlers = result.stdout.strip().rsplit(" ", 2)
+    assert heavy == "[]"
+    assert threads == "1"
+    # loguru keeps only its default stderr handler
+    assert handlers == "1"
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.loader import iter_market_data, load_market_data
+from src.pipeline.prices import sanitize_price, sanitize_prices
+
+HEADER = ("extraction_date;cycle_id;title;seller;price;discount;installments;interest_free;total_sold_raw;"
+          "free_delivery;arrival_estimation;is_great_deal;is_bestseller;is_recommended;link;layout_type;"
+          "price_range_searched")
+ROWS = [
+    "2026-02-01 06:00:00;1;Galaxy A15;Loja A;1.329.46;8%;12;Com Juros;N/A;No;Standard;Yes;No ;No;https://x/1;grid;1300-1310",
+    "2026-02-01 06:00:01;1;Galaxy A25;N/A;1.200,50;N/A;N/A;Sem Juros;N/A;Yes;Full;No;No;No;https://x/2;grid;1200-1210",
+    "2026-02-01 12:00:00;2;Galaxy S24;Loja B;R$ 999;5%;10.0;sem juros ;N/A;No;Standard;No;Yes;No;https://x/3;list;990-1000",
+]
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    # Written like storage.ensure_csv: BOM + a header from before the item_id column
+    path = tmp_path / "samsung_market_data.csv"
+    path.write_text("\n".join([HEADER] + ROWS) + "\n", encoding="utf-8-sig")
+    return path
+
+
+def test_vectorized_prices_match_sanitize_price():
+    raw = ["1.099.99", "1.200,50", "R$ 1000", "N/A", None, "", "abc", "999.9", "2.999"]
+    expected = [sanitize_price(value) for value in raw]
+    assert sanitize_prices(pd.Series(raw, dtype="object")).tolist() == expected
+
+
+def test_typed_load(raw_csv):
+    df = load_market_data(raw_csv)
+    assert df["price"].tolist() == [1329.46, 1200.50, 999.0]
+    assert df["installments"].tolist()[::2] == [12, 10] and df["installments"].isna().tolist()[1]
+    assert df["interest_free"].tolist() == [False, True, True]
+    assert df["is_great_deal"].tolist() == [True, False, False] and df["is_bestseller"].tolist() == [False, False, True]
+    assert df["extraction_date"].iloc[2] == pd.Timestamp("2026-02-01 12:00:00")
+    assert df["seller"].dtype == "category" and df["seller"].isna().tolist() == [False, True, False]
+    # Column missing from older files comes back empty instead of raising
+    assert df["item_id"].dtype == "Int64" and df["item_id"].isna().all()
+
+
+def test_column_pruning_date_filter_and_streaming(raw_csv):
+    df = load_market_data(raw_csv, columns=["seller", "price"], start="2026-02-01 06:00:01", chunksize=1)
+    assert list(df.columns) == ["seller", "price"] and df["price"].tolist() == [1200.50, 999.0]
+    # Chunks saw different sellers: the concatenated column stays categorical
+    assert df["seller"].dtype == "category"
+
+    chunks = list(iter_market_data(raw_csv, columns=["cycle_id"], end="2026-02-01 12:00:00", chunksize=2))
+    assert [chunk["cycle_id"].tolist() for chunk in chunks] == [[1, 1]]
+    with pytest.raises(ValueError):
+        load_market_data(raw_csv, columns=["bogus"])
+
+
+def test_empty_load_keeps_the_typed_dtypes(raw_csv, tmp_path):
+    # Header only, as ensure_csv leaves it at scraper start
+    header_only = tmp_path / "header_only.csv"
+    header_only.write_text(HEADER + "\n", encoding="utf-8-sig")
+    empty = load_market_data(header_only)
+    assert len(empty) == 0
+    assert empty.dtypes.astype(str).tolist() == load_market_data(raw_csv).dtypes.astype(str).tolist()
+    assert empty["extraction_date"].dt.date.tolist() == []
+    # Same when a date range filters every row out
+    assert load_market_data(raw_csv, start="2030-01-01")["price"].dtype == "float64"
@@ -0,0 +1,88 @@
+import random
+
+from loguru import logger
+
+from src.monitoring.logger import RequestLogAggregator, StructuredLogger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_window_summary_reports_counts_and_percentiles():
+    """Latency percentiles per status and sampled/suppressed counts per window"""
+    clock = FakeClock()
+    aggregator = RequestLogAggregator(window_seconds=60, rng=random.Random(0), clock=clock)
+
+    for i in range(1, 101):
+        aggregator.record_request(200, i / 100.0, logged=(i % 20 == 0))
+    aggregator.record_request(503, 2.5, logged=True)
+    aggregator.record_event("page_processed", page=1, items=48, new_listings=3, estimated_total_pages=40)
+    aggregator.record_event("page_processed", page=2, items=40, new_listings=0, estimated_total_pages=40)
+    aggregator.add_overhead(0.002)
+
+    assert not aggregator.is_due()
+    clock.now = 61
+    assert aggregator.is_due()
+
+    summary = aggregator.flush()
+    assert summary["requests_total"] == 101
+    assert summary["requests_logged"] == 6
+    assert summary["requests_suppressed"] == 95
+    assert summary["per_status"]["200"]["p50_seconds"] == 0.5
+    assert summary["per_status"]["200"]["p99_seconds"] == 0.99
+    assert summary["per_status"]["503"]["count"] == 1
+    # Quantities are summed, descriptive fields keep the last value
+    assert summary["events"]["page_processed"] == {"occurrences": 2, "items": 88, "new_listings": 3,
+                                                   "last_page": 2, "last_estimated_total_pages": 40}
+    assert summary["logging_overhead_ms"] == 2.0
+
+    # A new window starts empty
+    assert aggregator.flush()["requests_total"] == 0
+
+
+def test_reservoir_stays_bounded():
+    aggregator = RequestLogAggregator(window_seconds=60, rng=random.Random(1))
+    for _ in range(RequestLogAggregator.RESERVOIR_SIZE * 3):
+        aggregator.record_request(200, 1.0, logged=False)
+    assert len(aggregator.latencies[200]) == RequestLogAggregator.RESERVOIR_SIZE
+    assert aggregator.status_counts[200] == RequestLogAggregator.RESERVOIR_SIZE * 3
+
+
+def test_http_requests_are_sampled_but_errors_and_slow_ones_always_logged():
+    structured = StructuredLogger()
+    structured.high_throughput = True
+    structured.config.LOG_SAMPLE_RATE = 0.1
+    structured.config.SLOW_REQUEST_THRESHOLD = 10.0
+    structured._rng = random.Random(42)
+    structured._aggregator = RequestLogAggregator(window_seconds=60, rng=structured._rng, clock=FakeClock())
+    # Same seed: errors and slow requests short-circuit the draw, only the 200s consume it
+    replay = random.Random(42)
+    expected_sampled = sum(replay.random() < 0.1 for _ in range(1000))
+
+    written = []
+    sink = logger.add(lambda message: written.append(message.record["extra"]), level="INFO")
+    try:
+        for _ in range(1000):
+            structured.log_http_request("GET", "https://x/ok", 200, 0.2)
+        structured.log_http_request("GET", "https://x/missing", 404, 0.2)
+        structured.log_http_request("GET", "https://x/down", 503, 0.2)
+        structured.log_http_request("GET", "https://x/slow", 200, 12.0)
+    finally:
+        logger.remove(sink)
+
+    requests = [extra for extra in written if extra.get("event_type") == "http_client_request"]
+    assert 50 < expected_sampled < 150
+    assert len(requests) == expected_sampled + 3
+    assert [r["status_code"] for r in requests[-3:]] == [404, 503, 200] and requests[-1]["slow"]
+    # The window still counts every request, logged or not
+    summary = structured._aggregator.flush()
+    assert summary["requests_total"] == 1003
+    assert summary["requests_logged"] == expected_sampled + 3
+    assert summary["requests_suppressed"] == 1000 - expected_sampled
+    assert {status: counts["count"] for status, counts in summary["per_status"].items()} == \
+        {"200": 1001, "404": 1, "503": 1}
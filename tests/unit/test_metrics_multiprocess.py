@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# prometheus_client picks its value class at import, so the probe needs a fresh interpreter
+PROBE = """
+import glob, json, os
+from concurrent.futures import ProcessPoolExecutor
+from prometheus_client import generate_latest
+from src.monitoring.metrics import metrics
+
+def work(n):
+    metrics.record_item_scraped(n)
+    metrics.stage_duration.labels(stage="parse_html").observe(0.002)
+    metrics.db_pool_checked_out.inc()
+    return os.getpid()
+
+def scrape():
+    lines = generate_latest(metrics.registry).decode().splitlines()
+    return {l.rsplit(" ", 1)[0]: float(l.rsplit(" ", 1)[1]) for l in lines if not l.startswith("#")}
+
+metrics.record_item_scraped(1)
+with ProcessPoolExecutor(max_workers=2) as pool:
+    pids = set(pool.map(work, [10, 20, 30]))
+    live = scrape()
+first = scrape()
+files = sorted(os.path.basename(f) for f in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")))
+# Values written after the compaction keep adding up
+with ProcessPoolExecutor(max_workers=1) as pool:
+    pool.submit(work, 5).result()
+second = scrape()
+print(json.dumps({"workers": len(pids), "live": live, "first": first, "second": second, "files": files}))
+"""
+
+
+def test_worker_metrics_are_merged_and_dead_files_archived(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout)
+    items = 'samsung_items_scraped_total{category="smartphone"}'
+    parse_count = 'scraper_stage_duration_seconds_count{stage="parse_html"}'
+
+    assert report["workers"] >= 1
+    # Counters and histograms of the parent and every worker are added up
+    assert report["live"][items] == report["first"][items] == 61.0
+    assert report["live"][parse_count] == report["first"][parse_count] == 3.0
+    assert report["first"]['scraper_stage_duration_seconds_bucket{le="0.005",stage="parse_html"}'] == 3.0
+    # livesum gauges only count running processes
+    assert report["live"]["db_pool_checked_out"] == 3.0
+    assert report["first"].get("db_pool_checked_out", 0.0) == 0.0
+    # Only the parent's files and the archives survive the scrape
+    parent_files = {name for name in report["files"] if not name.endswith("_archive.db")}
+    assert {"counter_archive.db", "histogram_archive.db"} <= set(report["files"])
+    assert len({name.rsplit("_", 1)[-1] for name in parent_files}) == 1
+    assert report["second"][items] == 66.0
+    assert report["second"][parse_count] == 4.0
@@ -0,0 +1,65 @@
+import json
+import queue
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, DimProduct, DimScraperMetadata, DimSeller, FactOffer
+from src.database.sessions import unit_of_work
+from src.pipeline.price_alerts import JsonlAlertSink, PriceAlertStage, PriceIndex, QueueAlertSink
+from src.pipeline.prices import sanitize_price
+
+
+def _row(item_id, price, title="Samsung Galaxy A15 128GB"):
+    return {"item_id": item_id, "price": price, "title": title, "seller": "Loja", "cycle_id": 7,
+            "link": f"https://www.mercadolivre.com.br/p/MLB{item_id}", "extraction_date": "2026-02-01 10:00:00"}
+
+
+def test_sanitize_price_formats():
+    assert sanitize_price("1.099.99") == 1099.99
+    assert sanitize_price("1.200,50") == 1200.50
+    assert sanitize_price("R$ 1000") == 1000.0
+    assert sanitize_price(float("nan")) == 0.0 and sanitize_price(None) == 0.0 and sanitize_price("N/A") == 0.0
+
+
+def test_drops_and_rises_past_thresholds_are_emitted_with_latency():
+    events_queue = queue.Queue()
+    index = PriceIndex({1: (1000.0, "2026-01-31 22:00:00"), 2: (1000.0, None), 3: (1000.0, None)})
+    stage = PriceAlertStage(index, QueueAlertSink(events_queue), drop_threshold=0.05, rise_threshold=0.10,
+                            clock=lambda: 100.25)
+
+    rows = [_row(1, "899.90"), _row(2, "1.090.00"), _row(3, "1.150.00"), _row(4, "500.00"), _row("", "10.00")]
+    events = stage.process(rows, fetched_at=100.0)
+
+    assert [(e["event"], e["item_id"]) for e in events] == [("price_drop", 1), ("price_rise", 3)]
+    assert events[0]["change_pct"] == -10.01 and events[0]["previous_seen_at"] == "2026-01-31 22:00:00"
+    assert all(e["alert_latency_seconds"] == 0.25 for e in events)
+    assert events_queue.qsize() == 2
+    # The index follows the crawl: new SKUs are learned, known ones updated
+    assert index.get(4) == (500.0, "2026-02-01 10:00:00") and index.get(1)[0] == 899.90
+    assert stage.process([_row(1, "899.90")], fetched_at=100.0) == []
+
+
+def test_jsonl_sink_appends_one_line_per_alert(tmp_path):
+    stage = PriceAlertStage(PriceIndex({1: (2000.0, None)}), JsonlAlertSink(tmp_path))
+    stage.process([_row(1, "1.500.00")], fetched_at=0)
+    stage.process([_row(1, "1.800.00")], fetched_at=0)
+    lines = open(stage.sink.path_for_today(), encoding="utf-8").read().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["price_drop", "price_rise"]
+
+
+def test_index_warm_start_uses_each_skus_last_cycle(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    with unit_of_work(sessionmaker(bind=engine)) as session:
+        session.add_all([DimScraperMetadata(cycle_id=1), DimScraperMetadata(cycle_id=2)])
+        session.add_all([DimSeller(seller_id=1, seller_name="A"), DimSeller(seller_id=2, seller_name="B")])
+        session.add(DimProduct(product_id=1, item_id=555, sku_link="https://x", title="Galaxy S24"))
+        for cycle_id, seller_id, price, hour in [(1, 1, 3000.0, 0), (2, 1, 2900.0, 6), (2, 2, 2850.0, 7)]:
+            session.add(FactOffer(product_id=1, seller_id=seller_id, cycle_id=cycle_id, price=price,
+                                  extraction_date=datetime(2026, 2, 1, hour)))
+
+    index = PriceIndex.load_from_warehouse(engine)
+    assert len(index) == 1
+    assert index.get(555) == (2850.0, "2026-02-01 07:00:00")
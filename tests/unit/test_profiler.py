@@ -0,0 +1,52 @@
+import os
+import sys
+import subprocess
+
+import pytest
+from src.monitoring.profiler import CycleProfiler
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _allocate(n):
+    return [str(i) * 10 for i in range(n)]
+
+
+def test_pages_mode_writes_profiles_and_memory_diff(tmp_path):
+    """Every N pages a .prof/.txt pair is written; the second one diffs memory against the first"""
+    profiler = CycleProfiler(mode="pages", every_n_pages=2, top_n=5, output_dir=tmp_path)
+    kept = []
+    try:
+        profiler.start_cycle(1)
+        for _ in range(4):
+            kept.append(_allocate(2000))
+            profiler.on_page()
+        result = profiler.end_cycle()
+    finally:
+        profiler.stop()
+
+    assert len(list(tmp_path.glob("*.prof"))) == 3
+    summaries = sorted(tmp_path.glob("cycle1_page*.txt"))
+    assert len(summaries) == 2
+    assert "first capture" in summaries[0].read_text()
+    assert "Top 5 functions" in summaries[1].read_text()
+    assert result["label"] == "cycle1_end"
+
+
+def test_off_mode_is_inert(tmp_path):
+    profiler = CycleProfiler(mode="off", output_dir=tmp_path)
+    profiler.start_cycle(1)
+    profiler.on_page()
+    assert profiler.end_cycle() is None
+    assert not list(tmp_path.iterdir())
+
+    with pytest.raises(ValueError):
+        CycleProfiler(mode="always")
+
+
+def test_invalid_profile_mode_fails_when_the_config_loads():
+    env = dict(os.environ, SCRAPER_PROFILE="cycles")
+    result = subprocess.run([sys.executable, "-c", "import src.monitoring.settings"], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "Invalid SCRAPER_PROFILE='cycles'" in result.stderr
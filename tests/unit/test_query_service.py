@@ -0,0 +1,149 @@
+import json
+import threading
+from contextlib import contextmanager
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, DimProduct, DimScraperMetadata, DimSeller, FactOffer
+from src.database.queries import QUERIES
+from src.database.sessions import unit_of_work
+from src.query_service import QueryCache, QueryService, build_server
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _add_cycle(factory, cycle_id, offers):
+    with unit_of_work(factory) as session:
+        session.add(DimScraperMetadata(cycle_id=cycle_id))
+        for product_id, seller_id, price, great_deal in offers:
+            session.add(FactOffer(product_id=product_id, seller_id=seller_id, cycle_id=cycle_id, price=price,
+                                  is_great_deal=great_deal, extraction_date=datetime(2026, 2, cycle_id, 10)))
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with unit_of_work(factory) as session:
+        session.add_all([DimSeller(seller_id=1, seller_name="Loja A"), DimSeller(seller_id=2, seller_name="Loja B")])
+        session.add_all([
+            DimProduct(product_id=1, item_id=101, sku_link="https://x/1", title="Galaxy S23 Ultra 256GB",
+                       model_family="S23 Ultra", storage_gb=256, is_refurbished=False),
+            DimProduct(product_id=2, item_id=102, sku_link="https://x/2", title="Galaxy S23 Ultra 512GB",
+                       model_family="S23 Ultra", storage_gb=512, is_refurbished=False),
+        ])
+    _add_cycle(factory, 1, [(1, 1, 5000.0, False), (2, 2, 6000.0, True)])
+    return engine, factory
+
+
+@contextmanager
+def _serving(service):
+    server = build_server(service, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path):
+        url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, response.headers, response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read().decode("utf-8")
+
+    try:
+        yield get
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def served(warehouse):
+    engine, factory = warehouse
+    clock = _Clock()
+    service = QueryService(engine, cache=QueryCache(8), version_check_seconds=5, clock=clock)
+    with _serving(service) as get:
+        yield get, factory, clock, service
+
+
+def test_bind_validates_and_caps_parameters():
+    query = QUERIES["cheapest_offers"]
+    assert query.bind({"model_family": "A15", "limit": "99999", "refurbished": "no"})["limit"] == 1000
+    for bad in ({}, {"model_family": "A15", "storage_gb": "lots"}, {"model_family": "A15", "sort": "x"}):
+        with pytest.raises(ValueError):
+            query.bind(bad)
+
+
+def test_endpoints_stream_json_and_csv(served):
+    get, *_ = served
+    status, headers, body = get("/queries/cheapest_offers?model_family=S23%20Ultra")
+    assert status == 200 and headers["Transfer-Encoding"] == "chunked"
+    assert [(row["item_id"], row["price"]) for row in json.loads(body)] == [(101, 5000.0), (102, 6000.0)]
+
+    status, headers, body = get("/queries/seller_share?format=csv")
+    assert headers["Content-Type"].startswith("text/csv")
+    assert body.splitlines() == ["seller_name,offers,share_pct", "Loja A,1,50.0", "Loja B,1,50.0"]
+
+    assert json.loads(get("/queries/badge_rates")[2])[0]["great_deal_rate"] == 0.5
+    assert [row["min_price"] for row in json.loads(get("/queries/price_history?item_id=101")[2])] == [5000.0]
+    assert get("/queries/price_history")[0] == 400
+    assert get("/queries/nope")[0] == 404
+
+
+def test_cache_hits_until_a_new_cycle_lands(served):
+    get, factory, clock, service = served
+    path = "/queries/cheapest_offers?model_family=S23%20Ultra&limit=1"
+    assert get(path)[1]["X-Cache"] == "MISS"
+    assert get(path)[1]["X-Cache"] == "HIT"
+
+    _add_cycle(factory, 2, [(1, 2, 4500.0, True)])
+    # Within the version check interval the cached answer is still served...
+    assert json.loads(get(path)[2])[0]["price"] == 5000.0
+    # ...and the next check sees cycle 2, flushes the cache and re-runs the query
+    clock.now += 5
+    status, headers, body = get(path)
+    assert headers["X-Cache"] == "MISS" and json.loads(body)[0]["price"] == 4500.0
+    assert service.cache.version == (2, 3, None)
+
+
+def test_failures_before_the_headers_get_a_500(tmp_path):
+    # No tables: the data version check itself fails
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    with _serving(QueryService(engine, cache=QueryCache(8))) as get:
+        for path in ("/health", "/queries/seller_share", "/search?q=s23"):
+            status, _, body = get(path)
+            assert status == 500 and json.loads(body) == {"error": "internal error"}
+
+
+def test_failing_query_gets_a_500_in_every_format(warehouse):
+    engine, factory = warehouse
+    # The data version still reads, the canned query's SQL fails
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE dim_sellers")
+    with _serving(QueryService(engine, cache=QueryCache(8))) as get:
+        for fmt in ("json", "csv"):
+            status, _, body = get(f"/queries/seller_share?format={fmt}")
+            assert status == 500 and json.loads(body) == {"error": "internal error"}
+
+
+def test_warehouse_without_the_retention_manifest(warehouse):
+    engine, factory = warehouse
+    # Database created before the retention tables existed
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE fact_offers_archive")
+    service = QueryService(engine, cache=QueryCache(8))
+    assert service.data_version() == (1, 2, None)
+    with _serving(service) as get:
+        assert get("/queries/seller_share")[0] == 200
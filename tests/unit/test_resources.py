@@ -0,0 +1,45 @@
+import gc
+import threading
+
+from src.monitoring.metrics import metrics
+from src.monitoring.resources import ResourceSampler
+
+
+def _violations(resource):
+    return metrics.resource_budget_violations_total.labels(resource=resource)._value.get()
+
+
+def test_cycle_usage_peaks_and_budget_violations():
+    sampler = ResourceSampler(rss_budget_mb=1, cpu_budget_seconds=1000)
+    before = _violations("rss"), _violations("cpu")
+    try:
+        sampler.start_cycle(7)
+        ballast = bytearray(64 * 1024 * 1024)
+        sampler.sample()
+        del ballast
+        gc.collect()
+        usage = sampler.end_cycle()
+    finally:
+        sampler.stop()
+
+    # The peak was sampled while the ballast was alive
+    assert usage["peak_rss_mb"] >= usage["end_rss_mb"] + 32
+    assert usage["peak_threads"] >= 1 and usage["peak_open_fds"] >= 3
+    assert usage["gc_collections"][2] >= 1
+    # An RSS budget of 1 MB is always exceeded, 1000 CPU seconds never
+    assert usage["budget_violations"] == ["rss"]
+    assert (_violations("rss"), _violations("cpu")) == (before[0] + 1, before[1])
+    assert sampler.end_cycle() is None
+
+
+def test_sampler_thread_publishes_and_stops():
+    sampler = ResourceSampler(interval=0.1)
+    sampler.start()
+    try:
+        assert any(thread.name == "resource-sampler" for thread in threading.enumerate())
+        assert metrics.process_rss_bytes._value.get() > 0
+        assert metrics.process_threads._value.get() >= 1
+    finally:
+        sampler.stop()
+    assert not any(thread.name == "resource-sampler" for thread in threading.enumerate())
+    assert sampler.gc_tracker._callback not in gc.callbacks
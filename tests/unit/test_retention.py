@@ -0,0 +1,136 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import (Base, DimProduct, DimScraperMetadata, DimSeller, FactOffer, FactOfferArchive,
+                                 FactOfferDaily)
+from scripts.migrate_csv_to_sql import migrate_data
+from src.database.retention import ARCHIVE_COLUMN_NAMES, apply_retention, archived_days, read_offers
+from src.database.sessions import unit_of_work
+from src.pipeline.storage import CSV_COLUMNS
+
+TODAY = date(2026, 6, 30)
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with unit_of_work(factory) as session:
+        session.add_all([DimScraperMetadata(cycle_id=1), DimSeller(seller_id=1, seller_name="A"),
+                         DimSeller(seller_id=2, seller_name="B"),
+                         DimProduct(product_id=1, item_id=11, sku_link="https://x/1", title="Galaxy A15")])
+        # Two old days (4 snapshots each, two sellers) and one hot day
+        for day in (date(2026, 1, 10), date(2026, 1, 12), date(2026, 6, 20)):
+            for hour in (0, 6, 12, 18):
+                for seller_id in (1, 2):
+                    session.add(FactOffer(product_id=1, seller_id=seller_id, cycle_id=1,
+                                          price=1000.0 + hour * seller_id, is_great_deal=hour == 12,
+                                          extraction_date=datetime(day.year, day.month, day.day, hour)))
+    return engine, factory, tmp_path / "archive"
+
+
+def _hot_rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(FactOffer)).scalar()
+
+
+def test_old_days_are_summarized_archived_and_deleted(warehouse):
+    engine, factory, archive_dir = warehouse
+    before = read_offers(engine)
+
+    summary = apply_retention(engine, hot_days=90, archive_dir=archive_dir, today=TODAY)
+    assert (summary["days"], summary["rows"], summary["skipped"]) == (2, 16, 0)
+    assert _hot_rows(engine) == 8
+
+    with engine.connect() as connection:
+        manifest = connection.execute(select(FactOfferArchive.day, FactOfferArchive.path, FactOfferArchive.rows)).all()
+        daily = {(row.day, row.seller_id): row for row in connection.execute(select(FactOfferDaily)).all()}
+    assert manifest == [(date(2026, 1, 10), "2026/01/fact_offers_2026-01-10_part0.parquet", 8),
+                        (date(2026, 1, 12), "2026/01/fact_offers_2026-01-12_part0.parquet", 8)]
+    seller_2 = daily[(date(2026, 1, 10), 2)]
+    assert (seller_2.offers, seller_2.min_price, seller_2.max_price, seller_2.great_deal_offers) == \
+        (4, 1000.0, 1036.0, 1)
+    assert seller_2.price_sum / seller_2.offers == 1018.0
+
+    # The archive brings back exactly what left the hot table
+    after = read_offers(engine, include_archive=True, archive_dir=archive_dir)
+    assert list(after.columns) == ARCHIVE_COLUMN_NAMES
+    columns = ["offer_id", "product_id", "seller_id", "cycle_id", "price", "is_great_deal", "extraction_date"]
+    pd.testing.assert_frame_equal(after[columns].sort_values("offer_id", ignore_index=True),
+                                  before[columns].sort_values("offer_id", ignore_index=True), check_dtype=False)
+    window = read_offers(engine, start=datetime(2026, 1, 12, 6), end=datetime(2026, 1, 12, 18),
+                         include_archive=True, archive_dir=archive_dir)
+    assert window["extraction_date"].dt.hour.tolist() == [6, 6, 12, 12]
+    assert len(read_offers(engine, end=datetime(2026, 2, 1))) == 0
+
+
+def test_late_rows_of_an_archived_day_become_a_new_part(warehouse):
+    engine, factory, archive_dir = warehouse
+    apply_retention(engine, hot_days=90, archive_dir=archive_dir, today=TODAY, max_days=1)
+    assert _hot_rows(engine) == 16
+
+    # e.g. a late writer inserting straight into the hot table
+    with unit_of_work(factory) as session:
+        session.add(FactOffer(product_id=1, seller_id=1, cycle_id=1, price=900.0,
+                              extraction_date=datetime(2026, 1, 10, 23)))
+    summary = apply_retention(engine, hot_days=90, archive_dir=archive_dir, today=TODAY)
+    assert (summary["days"], summary["rows"]) == (2, 9)
+
+    with engine.connect() as connection:
+        parts = connection.execute(
+            select(FactOfferArchive.part).where(FactOfferArchive.day == date(2026, 1, 10))
+        ).scalars().all()
+        merged = connection.execute(select(FactOfferDaily).where(FactOfferDaily.day == date(2026, 1, 10),
+                                                                 FactOfferDaily.seller_id == 1)).one()
+    assert parts == [0, 1]
+    assert (merged.offers, merged.min_price, merged.last_seen) == (5, 900.0, datetime(2026, 1, 10, 23))
+    assert len(read_offers(engine, start=datetime(2026, 1, 10), end=datetime(2026, 1, 11),
+                           include_archive=True, archive_dir=archive_dir)) == 9
+
+
+def test_migrating_the_csv_again_does_not_double_archived_days(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    Base.metadata.create_all(engine)
+    csv_path = tmp_path / "samsung_market_data.csv"
+    lines = ["extraction_date;cycle_id;title;seller;price;discount;installments;interest_free;total_sold_raw;"
+             "free_delivery;arrival_estimation;is_great_deal;is_bestseller;is_recommended;link;layout_type;"
+             "price_range_searched"]
+    for cycle_id, day in ((1, "2026-01-10"), (2, "2026-01-10"), (3, "2026-06-20")):
+        for seller in ("Loja A", "Loja B"):
+            lines.append(f"{day} {cycle_id * 6:02d}:00:00;{cycle_id};Samsung Galaxy A15 128GB;{seller};1.299,00;N/A;"
+                         f"10;Sem Juros;N/A;Yes;Full;No;No;No;https://x/MLB-1;grid;1290-1300")
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def daily_offers():
+        with engine.connect() as connection:
+            return connection.execute(select(FactOfferDaily.day, FactOfferDaily.seller_id, FactOfferDaily.offers)
+                                      .order_by(FactOfferDaily.day, FactOfferDaily.seller_id)).all()
+
+    migrate_data([str(csv_path)], db_engine=engine)
+    apply_retention(engine, hot_days=90, archive_dir=tmp_path / "archive", today=TODAY)
+    first = daily_offers()
+    assert [offers for _, _, offers in first] == [2, 2]
+    assert archived_days(engine) == {date(2026, 1, 10)}
+
+    migrate_data([str(csv_path)], db_engine=engine)
+    summary = apply_retention(engine, hot_days=90, archive_dir=tmp_path / "archive", today=TODAY)
+    assert (summary["days"], daily_offers()) == (0, first)
+    assert _hot_rows(engine) == 2
+
+
+def test_migrating_a_header_only_csv_with_archived_days(warehouse, capsys):
+    engine, factory, archive_dir = warehouse
+    apply_retention(engine, hot_days=90, archive_dir=archive_dir, today=TODAY, max_days=1)
+    # What ensure_csv leaves behind at scraper start
+    csv_path = archive_dir.parent / "samsung_market_data.csv"
+    csv_path.write_text(";".join(CSV_COLUMNS) + "\n", encoding="utf-8-sig")
+
+    migrate_data([str(csv_path)], db_engine=engine)
+    output = capsys.readouterr().out
+    assert "Starting migration of 0 rows" in output and "Critical error" not in output
+    assert _hot_rows(engine) == 16
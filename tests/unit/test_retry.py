@@ -0,0 +1,150 @@
+import random
+import pytest
+import requests
+import src.scraper as scraper
+from src.pipeline.checkpoint import CheckpointStore, CycleCheckpoint
+from src.pipeline.dedup import ListingDedupIndex
+from src.pipeline.retry import PageTask, RetryQueue
+from src.scraper import CycleRun, PageOutcome, crawl_range
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_backoff_is_exponential_with_full_jitter():
+    clock = FakeClock()
+    queue = RetryQueue(base_delay=10, max_delay=60, max_attempts=5, clock=clock, sleep=clock.sleep,
+                       rng=random.Random(1))
+    delays = [queue.backoff(attempt) for attempt in range(1, 6) for _ in range(200)]
+    assert all(0 <= d <= 60 for d in delays)
+    assert max(queue.backoff(1) for _ in range(200)) <= 20
+
+    task = PageTask(1200, 1249, 49, 2)
+    assert queue.push(task, "http_503")
+    assert task.attempts == 1 and queue.pop_due() is None
+    assert queue.wait_next() is task
+    assert 0 <= clock.now <= 20
+
+
+def test_exhausted_page_is_not_requeued_and_state_roundtrips():
+    queue = RetryQueue(max_attempts=2, clock=FakeClock())
+    task = PageTask(1200, 1249, 49, 2)
+    assert queue.push(task, "network_error")
+    restored = RetryQueue(clock=FakeClock())
+    restored.restore(queue.to_list())
+    again = restored.pop_due()
+    assert (again.offset, again.attempts, again.reason) == (49, 1, "network_error")
+    assert not queue.push(again, "network_error")
+
+
+def _fake_site(pages, calls):
+    """Scripted site for scrape_page: offset -> list of outcomes/exceptions"""
+    def fake_scrape_page(min_price, max_price, offset, page_number, cycle_id, dedup_index, output_file, egress=None,
+                         alerts=None):
+        calls.append(offset)
+        result = pages[offset].pop(0) if len(pages[offset]) > 1 else pages[offset][0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+    return fake_scrape_page
+
+
+def _cycle_run(tmp_path, max_attempts=3):
+    clock = FakeClock()
+    retry_queue = RetryQueue(base_delay=10, max_attempts=max_attempts, clock=clock, sleep=clock.sleep)
+    return CycleRun(1, str(tmp_path / "out.csv"), ListingDedupIndex(use_bloom=False), CycleCheckpoint(cycle_id=1),
+                    retry_queue=retry_queue)
+
+
+def _run(pages, tmp_path, max_attempts=3):
+    """Drives crawl_range (then the end-of-cycle drain) over a scripted site"""
+    calls = []
+    run = _cycle_run(tmp_path, max_attempts)
+    original = scraper.scrape_page
+    scraper.scrape_page = _fake_site(pages, calls)
+    try:
+        crawl_range(run, 1200, 1249, 1, 1)
+        run.close_range(1200, 1249)
+        before_drain = list(calls)
+        run.drain_retries()
+    finally:
+        scraper.scrape_page = original
+    return run, before_drain, calls
+
+
+def test_failed_page_is_deferred_and_pagination_moves_on(tmp_path):
+    ok = PageOutcome(PageOutcome.OK, cards=48, items=48)
+    pages = {
+        1: [ok],
+        49: [requests.exceptions.ConnectionError("reset"), ok],
+        97: [PageOutcome(PageOutcome.EMPTY)],
+    }
+    run, before_drain, calls = _run(pages, tmp_path)
+
+    # Page 49 failed but the loop went straight on; the retry ran at the end
+    assert before_drain == [1, 49, 97]
+    assert calls.count(49) == 2
+    assert run.coverage.as_dict() == {"pages_attempted": 3, "pages_succeeded": 3, "pages_retried": 1,
+                                      "pages_lost": 0, "coverage_ratio": 1.0}
+    assert run.total_items == 96
+
+
+def test_404_ends_range_and_persistent_errors_are_lost(tmp_path):
+    pages = {
+        1: [PageOutcome(PageOutcome.HTTP_ERROR, status_code=503)],
+        49: [PageOutcome(PageOutcome.HTTP_ERROR, status_code=404)],
+    }
+    run, _, calls = _run(pages, tmp_path, max_attempts=2)
+    assert calls == [1, 49, 1]
+    assert run.coverage.counters() == {"attempted": 2, "succeeded": 1, "retried": 1, "lost": 1}
+
+
+def test_stopped_range_stays_open_until_its_retry_resumes_it(tmp_path, monkeypatch):
+    ok = PageOutcome(PageOutcome.OK, cards=48, items=48)
+    down = PageOutcome(PageOutcome.HTTP_ERROR, status_code=503)
+    pages = {1: [ok], 49: [down, ok], 97: [down, ok], 145: [down, ok], 193: [down, ok], 241: [KeyboardInterrupt()]}
+    calls = []
+    monkeypatch.setattr(scraper, "scrape_page", _fake_site(pages, calls))
+    run = _cycle_run(tmp_path, max_attempts=5)
+
+    # 4 failures in a row stop the range at 193, which the retry queue resumes later
+    crawl_range(run, 1200, 1249, 1, 1)
+    run.close_range(1200, 1249)
+    assert calls == [1, 49, 97, 145, 193]
+    assert not run.checkpoint.is_range_completed(1200, 1249)
+    assert run.retry_queue.resumes_range(1200, 1249)
+
+    # Restart while the resumed pagination is in flight: the range continues after 193
+    task = run.retry_queue.wait_next()
+    while not task.resume_range:
+        run.serve_retry(task)
+        task = run.retry_queue.wait_next()
+    with pytest.raises(KeyboardInterrupt):
+        run.serve_retry(task)
+    assert not run.checkpoint.is_range_completed(1200, 1249)
+    assert run.checkpoint.resume_position(1200, 1249) == (241, 6)
+
+    pages[241] = [PageOutcome(PageOutcome.EMPTY)]
+    crawl_range(run, 1200, 1249, *run.checkpoint.resume_position(1200, 1249))
+    run.close_range(1200, 1249)
+    assert run.checkpoint.is_range_completed(1200, 1249)
+    run.drain_retries()
+    assert calls.count(49) == 2 and calls.count(193) == 2 and run.total_items == 5 * 48
+
+
+def test_checkpoints_persist_the_all_time_index_with_them(tmp_path):
+    index_path = tmp_path / "seen.idx"
+    run = CycleRun(1, str(tmp_path / "out.csv"), ListingDedupIndex(), CycleCheckpoint(cycle_id=1),
+                   CheckpointStore(tmp_path / "checkpoint.json"), dedup_index_path=index_path)
+    run.dedup_index.observe("MLB40822891")
+    run.save()
+    # A restart right after this checkpoint must not count the listing as new again
+    assert ListingDedupIndex.load(index_path).observe("MLB40822891") == (False, False)
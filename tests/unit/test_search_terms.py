@@ -0,0 +1,15 @@
+import pytest
+
+from src.database.search import prefix_tsquery, search_terms
+
+
+def test_search_terms_fold_accents_and_punctuation():
+    assert search_terms("Câmera LILÁS, S23-Ultra!") == ["camera", "lilas", "s23", "ultra"]
+    assert prefix_tsquery(search_terms("s23 ult")) == "s23:* & ult:*"
+
+
+def test_search_terms_reject_queries_without_terms():
+    # tsquery syntax never reaches Postgres: only [a-z0-9] terms are kept
+    assert search_terms("s23 & !ultra | (x):*") == ["s23", "ultra", "x"]
+    with pytest.raises(ValueError):
+        search_terms(" %&! ")
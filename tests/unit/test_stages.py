@@ -0,0 +1,39 @@
+import time
+from src.monitoring.stages import StageTimer
+
+
+def test_stage_context_and_decorator_record_totals():
+    timer = StageTimer(enabled=True)
+
+    with timer.stage("unit_test_sleep"):
+        time.sleep(0.01)
+
+    @timer.timed("unit_test_call")
+    def work(x):
+        return x * 2
+
+    assert work(21) == 42
+    assert work(1) == 2
+
+    summary = timer.summary(reset=True)
+    assert summary["unit_test_sleep"]["calls"] == 1
+    assert summary["unit_test_sleep"]["seconds"] >= 0.01
+    assert summary["unit_test_call"]["calls"] == 2
+    assert timer.summary() == {}
+
+
+def test_disabled_timer_is_a_shared_noop():
+    """Disabled timing must not allocate nor record anything"""
+    timer = StageTimer(enabled=False)
+    assert timer.stage("a") is timer.stage("b")
+
+    with timer.stage("a"):
+        pass
+    timer.stop("manual", timer.start())
+
+    @timer.timed("decorated")
+    def work():
+        return "ok"
+
+    assert work() == "ok"
+    assert timer.summary() == {}
@@ -0,0 +1,51 @@
+import json
+import time
+from src.pipeline.validation import OfferBatchValidator, QuarantineWriter
+
+VALID_ROW = {
+    "extraction_date": "2026-01-10 08:35:20", "cycle_id": 3, "title": "Samsung Galaxy A15 128GB 4GB RAM",
+    "seller": "Samsung", "price": "1.329.46", "discount": "10%", "installments": "10",
+    "interest_free": "Sem Juros", "total_sold_raw": "+1000 vendidos", "free_delivery": "Yes",
+    "arrival_estimation": "Standard", "is_great_deal": "No", "is_bestseller": "No", "is_recommended": "No",
+    "link": "https://www.mercadolivre.com.br/samsung-galaxy-a15/p/MLB32174378", "layout_type": "grid",
+    "price_range_searched": "1200-1249", "item_id": 32174378,
+}
+
+
+def test_garbage_rows_are_rejected_with_reason_codes(tmp_path):
+    page = [dict(VALID_ROW) for _ in range(48)]
+    page[3]["price"] = "0.00"  # missing price tag
+    page[7]["link"] = "N/A"
+    page[9]["is_recommended"] = "maybe"
+    del page[11]["title"]
+    page[12]["item_id"] = ""  # listing without a marketplace id is fine
+
+    valid, rejected = OfferBatchValidator().validate_batch(page)
+
+    # Raw rows are kept as-is (CSV conventions untouched)
+    assert len(valid) == 44 and valid[0] is page[0]
+    reasons = {(r["field"], r["reason"]) for entry in rejected for r in entry["reasons"]}
+    assert reasons == {
+        ("price", "string_pattern_mismatch"),
+        ("link", "string_pattern_mismatch"),
+        ("is_recommended", "literal_error"),
+        ("title", "missing"),
+    }
+
+    path = QuarantineWriter(str(tmp_path)).write(rejected, context={"cycle_id": 3})
+    lines = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert len(lines) == 4 and lines[0]["cycle_id"] == 3 and lines[0]["row"]["price"] == "0.00"
+
+
+def test_page_validation_stays_under_one_millisecond():
+    validator = OfferBatchValidator()
+    page = [dict(VALID_ROW) for _ in range(48)]
+    validator.validate_batch(page)  # schema build is a one-off
+    best = min(_timed(validator, page) for _ in range(50))
+    assert best < 0.001
+
+
+def _timed(validator, page):
+    start = time.perf_counter()
+    validator.validate_batch(page)
+    return time.perf_counter() - start
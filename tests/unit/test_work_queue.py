@@ -0,0 +1,43 @@
+import time
+from src.pipeline.work_queue import LeaseHeartbeat, WorkItem
+
+
+class _RecordingQueue:
+    """Stand-in for PostgresWorkQueue.heartbeat(): owns the lease for `beats_until_lost` calls"""
+
+    lease_seconds = 120
+
+    def __init__(self, beats_until_lost=None):
+        self.beats = 0
+        self.beats_until_lost = beats_until_lost
+
+    def heartbeat(self, item):
+        self.beats += 1
+        return self.beats_until_lost is None or self.beats < self.beats_until_lost
+
+
+def _item():
+    return WorkItem(work_id=1, cycle_id=7, min_price=1200, max_price=1249, page_offset=49, page_number=2, attempts=1)
+
+
+def test_heartbeat_extends_lease_while_page_is_processed():
+    queue = _RecordingQueue()
+    with LeaseHeartbeat(queue, _item(), interval=0.01) as lease:
+        time.sleep(0.1)
+    beats = queue.beats
+    time.sleep(0.05)
+    assert beats >= 3
+    assert queue.beats == beats  # thread stopped on exit
+    assert not lease.lost
+
+
+def test_heartbeat_flags_lost_lease():
+    queue = _RecordingQueue(beats_until_lost=2)
+    with LeaseHeartbeat(queue, _item(), interval=0.01) as lease:
+        time.sleep(0.1)
+    assert lease.lost
+    assert queue.beats == 2
+
+
+def test_default_interval_is_a_third_of_the_lease():
+    assert LeaseHeartbeat(_RecordingQueue(), _item()).interval == 40